@@ -47,11 +47,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'events.middleware.AsyncWhiteNoiseMiddleware',
+    'django.middleware.gzip.GZipMiddleware',  # pages, JSON, feeds; files above come precompressed
+    'events.middleware.AdmissionControlMiddleware',
+    'events.middleware.RequestProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',  # ✅ sessions first
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'events.middleware.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',  # ✅ messages after sessions
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -59,9 +63,15 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'config.urls'
 
+# Native async read views (events/async_views.py). config/asgi.py turns this
+# on; under WSGI the sync views are cheaper.
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, plus render timing for RequestProfilingMiddleware.
+        'BACKEND': 'events.templating.ProfiledDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -69,6 +79,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'events.context_processors.roles',
             ],
         },
     },
@@ -106,6 +117,85 @@ DATABASES = {
     )
 }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Test on a file rather than the default shared-cache memory database,
+    # where a writer blocked by another thread fails at once instead of
+    # waiting: the concurrent booking tests need SQLite's busy timeout.
+    DATABASES['default']['TEST'] = {'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3')}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Role flags and other cross-request data live here, so production needs a
+# cache shared by every worker (REDIS_URL); local development falls back to
+# per-process memory.
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+ROLE_CACHE_TIMEOUT = 60 * 60
+
+
+# Rate limiting and load shedding (events.throttling)
+# URL name -> {"ip" / "user": (limit, period in seconds)}, applied to POSTs:
+# (10, 60) allows 10 requests in any 60 seconds.
+
+RATE_LIMITS = {
+    'login': {'ip': (10, 60)},
+    'signup': {'ip': (5, 60 * 60)},
+    'password_reset': {'ip': (5, 60 * 60)},
+    'rsvp_event': {'user': (20, 60), 'ip': (60, 60)},
+}
+RATE_LIMIT_CLIENT_IP_HEADER = config('RATE_LIMIT_CLIENT_IP_HEADER', default='')
+# Per worker process; keep it below the database connections one worker may
+# hold. 0 turns shedding off.
+MAX_CONCURRENT_REQUESTS = config('MAX_CONCURRENT_REQUESTS', default=64, cast=int)
+
+
+# Request profiling (events.middleware.RequestProfilingMiddleware)
+# Sampled requests get a Server-Timing header and one JSON line on the
+# "events.profiling" logger: at WARNING for slow requests, DEBUG otherwise
+# (set REQUEST_PROFILING_LOG_LEVEL=DEBUG to see every sampled request).
+
+REQUEST_PROFILING = {
+    'SAMPLE_RATE': config('REQUEST_PROFILING_SAMPLE_RATE', default=1.0 if DEBUG else 0.01, cast=float),
+    'SLOW_REQUEST_MS': config('REQUEST_PROFILING_SLOW_REQUEST_MS', default=500, cast=int),
+    'SLOW_QUERY_MS': config('REQUEST_PROFILING_SLOW_QUERY_MS', default=100, cast=int),
+    'TOP_QUERIES': 3,
+    'DUPLICATE_THRESHOLD': 3,
+    'SERVER_TIMING': True,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'events.profiling': {
+            'handlers': ['console'],
+            'level': config('REQUEST_PROFILING_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -170,10 +260,25 @@ AUTH_USER_MODEL = 'users.CustomUser'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Served by events.middleware.AsyncWhiteNoiseMiddleware; turn off when a CDN
+# or web server in front takes MEDIA_URL. Uploads with a content hash in the
+# name are cached as immutable, anything else (e.g. the default images) for
+# MEDIA_MAX_AGE seconds.
+SERVE_MEDIA = config('SERVE_MEDIA', default=True, cast=bool)
+MEDIA_MAX_AGE = 60 * 60
 
 
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-# Optional for better static handling
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
\ No newline at end of file
+# collectstatic writes content-hashed copies ("output.3f2a9c1b7d4e.css")
+# with .gz and .br variants next to them; WhiteNoise serves those as
+# immutable.
+STORAGES = {
+    'default': {
+        'BACKEND': 'events.storage.FingerprintedFileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
@@ -16,16 +16,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from events.views import index
-from django.conf import settings
-from django.conf.urls.static import static
+from events.urls import home_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', index),
+    path('', home_view),
     path('events/', include("events.urls")),
     path('users/', include("users.urls")),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,7 +1,8 @@
 from django.contrib import admin
-from events.models import Category, Event, Participant
+from events.models import Category, Event, Participant, OutboxEmail
 
 # Register your models here.
 admin.site.register(Category)
 admin.site.register(Event)
-admin.site.register(Participant)
\ No newline at end of file
+admin.site.register(Participant)
+admin.site.register(OutboxEmail)
\ No newline at end of file
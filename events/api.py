@@ -0,0 +1,132 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .filters import InvalidFilter, filter_events, event_ordering
+from .models import Event
+from .pagination import InvalidCursor, KeysetPaginator
+
+API_DEFAULT_LIMIT = 25
+API_MAX_LIMIT = 500
+STREAM_CHUNK_SIZE = 100
+
+# ----------------------------------------
+# Event fields exposed by the API
+# ----------------------------------------
+# public name -> (columns passed to .only(), value from an Event instance)
+API_FIELDS = {
+    'id': (['id'], lambda event: event.id),
+    'name': (['name'], lambda event: event.name),
+    'description': (['description'], lambda event: event.description),
+    'date': (['date'], lambda event: event.date),
+    'time': (['time'], lambda event: event.time),
+    'starts_at': (['starts_at'], lambda event: event.starts_at),
+    'location': (['location'], lambda event: event.location),
+    'category': (['category__id', 'category__name'], lambda event: event.category.get_name_display()),
+    'rsvp_count': (['rsvp_count'], lambda event: event.rsvp_count),
+    'image': (['image'], lambda event: event.image.url if event.image else None),
+    'latitude': (['latitude'], lambda event: event.latitude),
+    'longitude': (['longitude'], lambda event: event.longitude),
+    # Only set when searching near a place.
+    'distance_km': ([], lambda event: round(event.distance_km, 2) if hasattr(event, 'distance_km') else None),
+}
+API_DEFAULT_FIELDS = ['id', 'name', 'date', 'time', 'location', 'category', 'rsvp_count']
+
+
+def api_error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def parse_fields(value):
+    if not value:
+        return list(API_DEFAULT_FIELDS)
+    fields = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in API_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(API_FIELDS)}")
+    return fields
+
+
+def parse_limit(value):
+    if not value:
+        return API_DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= API_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {API_MAX_LIMIT}")
+    return limit
+
+
+# ----------------------------------------
+# GET /events/api/events/
+# ----------------------------------------
+@require_GET
+def events_api(request):
+    """
+    Events as JSON, filtered like the All Events page (q, category,
+    start_date + end_date, upcoming, near or lat + lng with radius). ``fields=`` picks the columns loaded,
+    ``limit=`` the page size and ``cursor=`` continues from ``next``.
+    """
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+        limit = parse_limit(request.GET.get('limit'))
+    except ValueError as exc:
+        return api_error(str(exc))
+
+    # The sort keys are always loaded, the cursor is built from them.
+    columns = {'id', 'date', 'starts_at'}
+    for name in fields:
+        columns.update(API_FIELDS[name][0])
+    queryset = Event.objects.only(*columns)
+    if 'category' in fields:
+        queryset = queryset.select_related('category')
+    try:
+        queryset = filter_events(queryset, request.GET)
+    except InvalidFilter as exc:
+        return api_error(str(exc))
+
+    paginator = KeysetPaginator(queryset, limit, ordering=event_ordering(queryset, request.GET))
+    # Validated up front: once streaming starts the status is already sent.
+    # Only forward cursors are handed out, so 'p' ones are rejected too.
+    cursor = request.GET.get('cursor')
+    try:
+        if cursor and paginator.decode_cursor(cursor)[0] != 'n':
+            raise InvalidCursor(cursor)
+    except InvalidCursor:
+        return api_error("Invalid cursor")
+
+    response = StreamingHttpResponse(
+        stream_events(paginator, cursor, fields, request),
+        content_type='application/json',
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def stream_events(paginator, cursor, fields, request):
+    # {"results":[...],"next":...} written a chunk of rows at a time: one
+    # query however large the page, and never more than a chunk in memory.
+    encoder = DjangoJSONEncoder(separators=(',', ':'), ensure_ascii=False)
+    getters = [(name, API_FIELDS[name][1]) for name in fields]
+
+    yield '{"results":['
+    buffer = []
+    for index, event in enumerate(paginator.stream(cursor, chunk_size=STREAM_CHUNK_SIZE)):
+        row = encoder.encode({name: get(event) for name, get in getters})
+        buffer.append(row if index == 0 else ',' + row)
+        if len(buffer) >= STREAM_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+    next_url = None
+    if paginator.next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = paginator.next_cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+    yield '],"next":' + json.dumps(next_url) + ',"cursor":' + json.dumps(paginator.next_cursor) + '}'
@@ -5,6 +5,5 @@ class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events'
 
-
-def ready(self):
-    import events.signals
\ No newline at end of file
+    def ready(self):
+        import events.signals
@@ -0,0 +1,78 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.http import Http404
+from django.template.response import TemplateResponse
+
+from .conditional import conditional_page, event_last_modified, events_last_modified
+from .filters import filter_events, filter_context, event_ordering, upcoming_cutoff
+from .models import Event, Category
+from .page_cache import cache_anonymous_page
+from .pagination import KeysetPaginator
+from .stats import total_attendance
+from .views import EVENTS_PER_PAGE
+
+# ----------------------------------------
+# Async read views (served under ASGI)
+# ----------------------------------------
+# Same templates and context as their sync twins in events/views.py. Queries
+# go through the async ORM; TemplateResponse is rendered by Django in a sync
+# thread afterwards, where context processors and lazy lookups may touch the
+# database. events/urls.py picks these when settings.ASYNC_READ_VIEWS is on.
+
+
+@cache_anonymous_page('home')
+async def home(request):
+    return TemplateResponse(request, "events/home.html")
+
+
+@conditional_page(events_last_modified)
+@cache_anonymous_page('all_events', 'events', 'categories', vary_on=upcoming_cutoff)
+async def all_events(request):
+    params = request.GET
+    queryset = Event.objects.select_related('category').only(
+        'id', 'name', 'date', 'time', 'starts_at', 'location', 'rsvp_count', 'category__id', 'category__name',
+    )
+    if params.get('q'):
+        # The search backend queries its index right away.
+        queryset = await sync_to_async(filter_events)(queryset, params)
+    else:
+        queryset = filter_events(queryset, params)
+
+    paginator = KeysetPaginator(queryset, EVENTS_PER_PAGE, ordering=event_ordering(queryset, params))
+    page = await paginator.apage_or_first(params.get('cursor'))
+
+    context = filter_context(params)
+    context.update({
+        'events': page.object_list,
+        'object_list': page.object_list,
+        'page_obj': page,
+        'is_paginated': page.has_other_pages(),
+        'categories': [category async for category in Category.objects.all()],
+        'total_attendees': await sync_to_async(total_attendance)(),
+    })
+    return TemplateResponse(request, "events/all_events.html", context)
+
+
+@conditional_page(event_last_modified)
+@cache_anonymous_page('event_detail', 'categories', 'event:{event_id}')
+async def event_detail(request, event_id):
+    try:
+        event = await Event.objects.select_related('category').aget(pk=event_id)
+    except Event.DoesNotExist:
+        raise Http404("No event found matching the query")
+
+    user = await request.auser()
+    has_rsvp = user.is_authenticated and await event.rsvps.filter(pk=user.pk).aexists()
+    return TemplateResponse(request, "events/event_detail.html", {
+        'event': event,
+        'object': event,
+        'has_rsvp': has_rsvp,
+    })
+
+
+@login_required
+async def attended_events(request):
+    user = await request.auser()
+    return TemplateResponse(request, "events/attended_events.html", {
+        'events': [event async for event in Event.objects.attended_by(user)],
+    })
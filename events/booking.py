@@ -0,0 +1,66 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .feeds import invalidate_feeds
+from .models import Attendance, Event
+from .page_cache import bump_page_versions
+from .stats import record_attendance
+
+
+# ----------------------------------------
+# Booking a seat
+# ----------------------------------------
+# An RSVP is one transaction: claim a seat with a conditional UPDATE of the
+# event row, then insert the (event, user) Attendance row. The UPDATE
+# row-locks the event (SQLite: the database), so concurrent bookings queue
+# there and each one sees the count the previous one committed.
+# attendance_unique_user turns a second booking by the same user into an
+# IntegrityError that rolls the claimed seat back with it.
+
+BOOKED = 'booked'
+ALREADY_BOOKED = 'already_booked'
+FULL = 'full'
+
+
+class _NoSeat(Exception):
+    pass
+
+
+def has_rsvp(event_id, user_id):
+    return Attendance.objects.filter(event_id=event_id, user_id=user_id).exists()
+
+
+def book_seat(event_id, user_id):
+    """RSVP a user to an event; returns BOOKED, ALREADY_BOOKED or FULL. Safe to retry."""
+    # Repeat clicks are answered without taking the lock.
+    if has_rsvp(event_id, user_id):
+        return ALREADY_BOOKED
+
+    try:
+        with transaction.atomic():
+            claimed = (
+                Event.objects.filter(pk=event_id)
+                .filter(Q(capacity__isnull=True) | Q(rsvp_count__lt=F('capacity')))
+                .update(rsvp_count=F('rsvp_count') + 1, updated_at=timezone.now())
+            )
+            if not claimed:
+                raise _NoSeat
+            # A plain insert: going through event.rsvps.add() would fire
+            # m2m_changed and count the seat a second time.
+            event_date = Event.objects.filter(pk=event_id).values_list('date', flat=True).get()
+            attendance = Attendance.objects.create(event_id=event_id, user_id=user_id, event_date=event_date)
+    except IntegrityError:
+        return ALREADY_BOOKED
+    except _NoSeat:
+        # Full, unless this user's own booking is what filled it.
+        return ALREADY_BOOKED if has_rsvp(event_id, user_id) else FULL
+
+    # After the claim rather than inside it, so the event row lock covers
+    # only the UPDATE and INSERT. Callers shouldn't wrap this in a
+    # transaction of their own, which would hold the lock until it ends;
+    # rebuild_stats repairs the rollup if this never runs.
+    record_attendance({timezone.localdate(attendance.created_at): 1})
+    bump_page_versions('events', f'event:{event_id}')
+    invalidate_feeds(user_ids=[user_id])
+    return BOOKED
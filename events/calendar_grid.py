@@ -0,0 +1,118 @@
+import calendar
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Event
+from .page_cache import scope_version
+
+
+# ----------------------------------------
+# Month / week calendar grid
+# ----------------------------------------
+# A visible window costs two queries whatever its size: the first few events
+# of every day (ROW_NUMBER() per day, so a busy day can't flood the page)
+# and one GROUP BY (day, category) for the counts. The result is cached per
+# (window, category) under the "calendar" page-cache scope, which every
+# event write bumps.
+
+CALENDAR_CACHE_TIMEOUT = getattr(settings, 'CALENDAR_CACHE_TIMEOUT', 60 * 60)
+# Events listed per day cell; the rest show up as "+N more".
+EVENTS_PER_DAY = {'month': 3, 'week': 12}
+FIRST_WEEKDAY = calendar.MONDAY
+
+
+# Anchors are kept far enough from date.min / date.max that the visible
+# window and the previous / next links can still be built.
+FIRST_ANCHOR = date(1, 2, 1)
+LAST_ANCHOR = date(9999, 11, 30)
+
+
+def clamp_anchor(day):
+    return min(max(day, FIRST_ANCHOR), LAST_ANCHOR)
+
+
+def month_window(day):
+    weeks = calendar.Calendar(FIRST_WEEKDAY).monthdatescalendar(day.year, day.month)
+    return weeks[0][0], weeks[-1][-1]
+
+
+def week_window(day):
+    start = day - timedelta(days=(day.weekday() - FIRST_WEEKDAY) % 7)
+    return start, start + timedelta(days=6)
+
+
+def window(kind, day):
+    return month_window(day) if kind == 'month' else week_window(day)
+
+
+def shift(kind, day, step):
+    """The anchor day one month / week before (step=-1) or after (step=1)."""
+    if kind == 'week':
+        return day + timedelta(weeks=step)
+    year, month = divmod(day.month - 1 + step, 12)
+    return date(day.year + year, month + 1, 1)
+
+
+def _grid_data(start, end, category_id, per_day):
+    events = Event.objects.filter(date__range=(start, end))
+    if category_id:
+        events = events.filter(category_id=category_id)
+
+    listed = (
+        events.annotate(day_rank=Window(
+            RowNumber(), partition_by=[F('date')], order_by=[F('time').asc(), F('id').asc()],
+        ))
+        .filter(day_rank__lte=per_day)
+        .order_by('date', 'time', 'id')
+        .values_list('date', 'id', 'name', 'time', 'category_id')
+    )
+    counts = events.values('date', 'category_id').annotate(n=Count('id')).order_by()
+
+    days = {}
+    for day, category, n in counts.values_list('date', 'category_id', 'n'):
+        entry = days.setdefault(day, {'events': [], 'total': 0, 'by_category': {}})
+        entry['total'] += n
+        entry['by_category'][category] = n
+    for day, pk, name, time, category in listed:
+        days[day]['events'].append((pk, name, time, category))
+    return days
+
+
+def grid_data(kind, start, end, category_id=None):
+    """{day: {'events': [(id, name, time, category_id)], 'total': n, 'by_category': {id: n}}}"""
+    key = f'calendar_grid:{scope_version("calendar")}:{kind}:{start}:{end}:{category_id or "all"}'
+    days = cache.get(key)
+    if days is None:
+        days = _grid_data(start, end, category_id, EVENTS_PER_DAY[kind])
+        cache.set(key, days, CALENDAR_CACHE_TIMEOUT)
+    return days
+
+
+def build_weeks(kind, anchor, category_id=None, labels=None):
+    """Rows of 7 day cells for the window around ``anchor``; ``labels`` names categories by id."""
+    labels = labels or {}
+    start, end = window(kind, anchor)
+    days = grid_data(kind, start, end, category_id)
+    empty = {'events': [], 'total': 0, 'by_category': {}}
+    cells = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        data = days.get(day, empty)
+        cells.append({
+            'date': day,
+            'in_month': kind == 'week' or day.month == anchor.month,
+            'events': [
+                {'id': pk, 'name': name, 'time': time, 'category_id': category}
+                for pk, name, time, category in data['events']
+            ],
+            'total': data['total'],
+            'by_category': sorted(
+                (labels.get(category, category), n) for category, n in data['by_category'].items()
+            ),
+            'more': data['total'] - len(data['events']),
+        })
+    return [cells[index:index + 7] for index in range(0, len(cells), 7)]
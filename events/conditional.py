@@ -0,0 +1,115 @@
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .filters import upcoming_cutoff
+from .models import Event, Category
+from .page_cache import normalized_query
+from .roles import get_roles
+
+# ----------------------------------------
+# Conditional GET (ETag / Last-Modified / 304)
+# ----------------------------------------
+# Validators come from updated_at alone, never from the rendered page, so a
+# client that already holds the current version gets its 304 after one or two
+# indexed lookups instead of a full render.
+
+ANONYMOUS_PAGE_MAX_AGE = getattr(settings, 'ANONYMOUS_PAGE_MAX_AGE', 60)
+
+
+def _memoized(request, name, compute):
+    # condition() asks for the ETag and Last-Modified separately; both come
+    # from the same timestamp, so look it up once per request.
+    cache = request.__dict__.setdefault('_conditional', {})
+    if name not in cache:
+        cache[name] = compute()
+    return cache[name]
+
+
+def event_last_modified(request, event_id):
+    row = Event.objects.filter(pk=event_id).values_list('updated_at', 'category__updated_at').first()
+    return max(row) if row else None
+
+
+def events_last_modified(request, *args, **kwargs):
+    stamps = [
+        Event.objects.aggregate(latest=Max('updated_at'))['latest'],
+        Category.objects.aggregate(latest=Max('updated_at'))['latest'],
+        # An upcoming listing also changes, unwritten, when an event starts.
+        upcoming_cutoff(request),
+    ]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+def _viewer(request):
+    if not request.user.is_authenticated:
+        return 'anonymous'
+    # The page varies by role (links, buttons), so the ETag does too.
+    roles = get_roles(request.user)
+    return f'{request.user.pk}:{",".join(sorted(roles.groups))}:{roles.is_superuser}'
+
+
+def _patch_cache_control(response, is_authenticated):
+    if is_authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, max_age=ANONYMOUS_PAGE_MAX_AGE)
+    patch_vary_headers(response, ['Cookie'])
+
+
+def conditional_page(last_modified_func):
+    """
+    Answer If-None-Match / If-Modified-Since with 304 using
+    ``last_modified_func(request, *args, **kwargs)``, and set Cache-Control:
+    public with a short max-age for anonymous visitors, private and always
+    revalidated for logged-in users. Works on sync and async views.
+    """
+    def validators(request, *args, **kwargs):
+        def compute():
+            # A pending flash message must be rendered, not skipped by a 304.
+            if len(get_messages(request)):
+                return None, None
+            stamp = last_modified_func(request, *args, **kwargs)
+            if stamp is None:
+                return None, None
+            raw = f'{request.path}?{normalized_query(request)}|{stamp.isoformat()}|{_viewer(request)}'
+            return hashlib.md5(raw.encode()).hexdigest(), stamp
+        return _memoized(request, 'validators', compute)
+
+    def etag(request, *args, **kwargs):
+        return validators(request, *args, **kwargs)[0]
+
+    def last_modified(request, *args, **kwargs):
+        return validators(request, *args, **kwargs)[1]
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view_func)
+
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                # condition() calls the validator functions synchronously, so
+                # compute them (session, cache and DB reads) in the sync thread
+                # first; the calls inside condition() then hit the memo.
+                await sync_to_async(validators)(request, *args, **kwargs)
+                response = await conditional_view(request, *args, **kwargs)
+                user = await request.auser()
+                _patch_cache_control(response, user.is_authenticated)
+                return response
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            _patch_cache_control(response, request.user.is_authenticated)
+            return response
+        return wrapper
+    return decorator
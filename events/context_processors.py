@@ -0,0 +1,6 @@
+from .roles import get_roles
+
+
+def roles(request):
+    """Expose is_admin / is_organizer / is_participant / can_add_event to templates."""
+    return get_roles(request.user).as_context()
@@ -0,0 +1,67 @@
+import random
+
+from faker import Faker
+
+from .geo import gazetteer
+
+
+# ----------------------------------------
+# Fake row generation for generate_fake_data
+# ----------------------------------------
+# These functions run inside worker processes, so they return plain tuples and
+# must not import Django models. Each chunk seeds its own Faker from
+# (seed, chunk index), which keeps output identical for any --workers value.
+
+def _faker(seed, chunk_index):
+    fake = Faker()
+    if seed is not None:
+        fake.seed_instance(seed * 1_000_003 + chunk_index)
+    return fake
+
+
+def event_rows(args):
+    seed, chunk_index, start, count, category_ids = args
+    fake = _faker(seed, chunk_index)
+    rng = random.Random(None if seed is None else seed * 7919 + chunk_index)
+    places, _ = gazetteer()
+    rows = []
+    for _ in range(count):
+        # Somewhere within ~15 km of a gazetteer city, so proximity search
+        # has something to find.
+        place = rng.choice(places)
+        rows.append((
+            fake.catch_phrase()[:100],
+            fake.text(max_nb_chars=100),
+            fake.date_between(start_date='-30d', end_date='+60d'),
+            fake.time_object(),
+            f"{fake.street_address()}, {place.name}"[:150],
+            round(place.latitude + rng.uniform(-0.15, 0.15), 6),
+            round(place.longitude + rng.uniform(-0.15, 0.15), 6),
+            rng.choice(category_ids),
+        ))
+    return rows
+
+
+def user_rows(args):
+    seed, chunk_index, start, count = args
+    fake = _faker(seed, chunk_index)
+    rows = []
+    for index in range(start, start + count):
+        first_name, last_name = fake.first_name(), fake.last_name()
+        rows.append((
+            f"user{index}",
+            f"user{index}@{fake.free_email_domain()}",
+            first_name[:150],
+            last_name[:150],
+        ))
+    return rows
+
+
+def participant_rows(args):
+    seed, chunk_index, start, count = args
+    fake = _faker(seed, chunk_index)
+    # The index suffix keeps emails unique across chunks and processes.
+    return [
+        (fake.name()[:100], f"participant{index}@{fake.free_email_domain()}")
+        for index in range(start, start + count)
+    ]
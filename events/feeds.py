@@ -0,0 +1,163 @@
+import hashlib
+import secrets
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Category, Event
+from .page_cache import record_outcome
+
+User = get_user_model()
+
+
+# ----------------------------------------
+# Per-user iCalendar subscription feeds
+# ----------------------------------------
+# Calendar apps poll a feed every few minutes, so a rendered feed is cached
+# under its URL token and a poll costs one cache lookup (and a 304 when the
+# client already has it). Nothing is looked up in the database on a hit;
+# instead the signals in events/signals.py drop the cached feeds of every
+# subscriber an RSVP or event change affects.
+
+FEED_CACHE_TIMEOUT = getattr(settings, 'CALENDAR_FEED_CACHE_TIMEOUT', 60 * 60)
+# Older events drop out of the feed; calendar apps keep what they already have.
+FEED_PAST_DAYS = getattr(settings, 'CALENDAR_FEED_PAST_DAYS', 90)
+# Event links and UIDs: the site's public address, not whichever host the
+# poll that happened to render the cached feed came in on.
+FEED_SITE_URL = getattr(settings, 'FRONTEND_URL', '').rstrip('/')
+
+ATTENDING = 'attending'
+ORGANIZING = 'organizing'
+FEED_KINDS = [ATTENDING, ORGANIZING]
+
+
+def feed_cache_key(kind, token):
+    return f'calendar_feed:{kind}:{token}'
+
+
+def calendar_token(user):
+    """The user's feed token, issued on first use."""
+    if not user.calendar_token:
+        token = secrets.token_urlsafe(32)
+        # Two tabs asking at once must end up with the same token.
+        User.objects.filter(pk=user.pk, calendar_token__isnull=True).update(calendar_token=token)
+        user.calendar_token = User.objects.values_list('calendar_token', flat=True).get(pk=user.pk)
+    return user.calendar_token
+
+
+def reset_calendar_token(user):
+    old = user.calendar_token
+    user.calendar_token = secrets.token_urlsafe(32)
+    User.objects.filter(pk=user.pk).update(calendar_token=user.calendar_token)
+    if old:
+        cache.delete_many([feed_cache_key(kind, old) for kind in FEED_KINDS])
+    return user.calendar_token
+
+
+def invalidate_feeds(user_ids=(), event_ids=()):
+    """
+    Drop the cached feeds of these users (ids or a queryset) and of everyone
+    attending or organizing these events.
+    """
+    # A queryset of users goes in as a subquery.
+    condition = Q(pk__in=user_ids if isinstance(user_ids, QuerySet) else list(user_ids))
+    if event_ids:
+        condition |= Q(rsvp_events__in=list(event_ids)) | Q(created_events__in=list(event_ids))
+    tokens = set(
+        User.objects.filter(condition, calendar_token__isnull=False).values_list('calendar_token', flat=True)
+    )
+    keys = [feed_cache_key(kind, token) for token in tokens for kind in FEED_KINDS]
+    if keys:
+        # After commit, so a poll in between can't cache the old rows again.
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# - - - - - - - - - - #
+#      Rendering      #
+# - - - - - - - - - - #
+def _escape(value):
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def _fold(line):
+    """RFC 5545: content lines longer than 75 octets continue on lines starting with a space."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Don't split a UTF-8 sequence.
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74
+    return '\r\n '.join(parts)
+
+
+def _stamp(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def feed_events(user, kind):
+    since = timezone.now() - timedelta(days=FEED_PAST_DAYS)
+    events = Event.objects.attended_by(user) if kind == ATTENDING else Event.objects.organized_by(user)
+    return events.filter(starts_at__gte=since).order_by('starts_at', 'id').values_list(
+        'id', 'name', 'description', 'location', 'latitude', 'longitude', 'starts_at', 'updated_at', 'category__name',
+    )
+
+
+def render_feed(user, kind, site_url=FEED_SITE_URL):
+    labels = dict(Category.CATEGORY_CHOICES)
+    title = "Events I'm attending" if kind == ATTENDING else "Events I'm organizing"
+    host = site_url.split('://', 1)[-1]
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Renova//Events//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(title)}',
+        'REFRESH-INTERVAL;VALUE=DURATION:PT15M',
+    ]
+    for pk, name, description, location, latitude, longitude, starts_at, updated_at, category in feed_events(user, kind):
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:event-{pk}@{host}',
+            f'DTSTAMP:{_stamp(updated_at)}',
+            f'LAST-MODIFIED:{_stamp(updated_at)}',
+            f'DTSTART:{_stamp(starts_at)}',
+            f'SUMMARY:{_escape(name)}',
+            f'LOCATION:{_escape(location)}',
+            *([f'GEO:{latitude:.6f};{longitude:.6f}'] if latitude is not None else []),
+            f'DESCRIPTION:{_escape(description)}',
+            f'CATEGORIES:{_escape(labels.get(category, category))}',
+            f"URL:{site_url}{reverse('event_detail', args=[pk])}",
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return ('\r\n'.join(_fold(line) for line in lines) + '\r\n').encode()
+
+
+def cached_feed(token, kind):
+    """(etag, body) for the feed behind ``token``, or None if the token is unknown."""
+    key = feed_cache_key(kind, token)
+    entry = cache.get(key)
+    if entry is not None:
+        record_outcome('calendar_feed', 'hit')
+        return entry
+    record_outcome('calendar_feed', 'miss')
+
+    user = User.objects.filter(calendar_token=token, is_active=True).first()
+    if user is None:
+        return None
+    body = render_feed(user, kind)
+    entry = (f'"{hashlib.md5(body).hexdigest()}"', body)
+    cache.set(key, entry, FEED_CACHE_TIMEOUT)
+    return entry
@@ -0,0 +1,144 @@
+import math
+from datetime import date
+
+from django.core.exceptions import BadRequest
+from django.db.models import Q
+from django.utils import timezone
+
+from .geo import MAX_RADIUS_KM, locate
+from .models import Event
+from .search import get_search_backend
+
+
+# ----------------------------------------
+# All-events filters
+# ----------------------------------------
+# Shared by AllEventsView and the JSON API so both accept the same query
+# string: q, category, start_date + end_date, upcoming, and near (a city
+# from the gazetteer) or lat + lng, with radius in km.
+
+RADIUS_CHOICES_KM = [5, 10, 25, 50, 100, 250]
+DEFAULT_RADIUS_KM = 25
+
+
+def search_point(params):
+    """(latitude, longitude) to search around, or None if the place is unknown."""
+    if params.get('lat') or params.get('lng'):
+        try:
+            latitude, longitude = float(params.get('lat')), float(params.get('lng'))
+        except (TypeError, ValueError):
+            return None
+        if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            return latitude, longitude
+        return None
+    place = locate(params.get('near'))
+    return (place.latitude, place.longitude) if place else None
+
+
+def search_radius(params):
+    try:
+        radius = float(params.get('radius') or DEFAULT_RADIUS_KM)
+    except ValueError:
+        radius = DEFAULT_RADIUS_KM
+    # float() takes "nan" and "inf", and min()/max() pass NaN straight through.
+    if not math.isfinite(radius):
+        radius = DEFAULT_RADIUS_KM
+    return min(max(radius, 1), MAX_RADIUS_KM)
+
+
+def is_proximity_search(params):
+    return bool(params.get('near') or params.get('lat') or params.get('lng'))
+
+
+class InvalidFilter(BadRequest):
+    """A malformed filter value: answered with a 400 rather than a server error."""
+
+
+def parse_category(params):
+    value = params.get('category')
+    if not value:
+        return None
+    # isdigit() alone lets through ids too large for the database column.
+    if not value.isdigit() or not 0 < int(value) < 2 ** 63:
+        raise InvalidFilter("category must be a category id")
+    return int(value)
+
+
+def parse_date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise InvalidFilter(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def filter_events(queryset, params):
+    """``queryset`` narrowed by ``params``; raises InvalidFilter on malformed values."""
+    search_query = params.get('q', '')
+    category_id = parse_category(params)
+    start_date = parse_date(params, 'start_date')
+    end_date = parse_date(params, 'end_date')
+
+    filters = Q()
+    if category_id:
+        filters &= Q(category__id=category_id)
+    if start_date and end_date:
+        filters &= Q(date__range=[start_date, end_date])
+
+    queryset = queryset.filter(filters)
+    if params.get('upcoming'):
+        queryset = queryset.upcoming()
+    if is_proximity_search(params):
+        point = search_point(params)
+        if point is None:
+            return queryset.none()
+        queryset = queryset.near(*point, search_radius(params))
+    if search_query:
+        queryset = get_search_backend().search(queryset, search_query)
+    return queryset
+
+
+def upcoming_cutoff(request, now=None):
+    """
+    For an ``upcoming`` listing, the start of the event that most recently
+    dropped off it: the last time the list changed with no write to the
+    database. None for other listings, which only change on writes.
+    """
+    if not request.GET.get('upcoming'):
+        return None
+    # Newest past start off event_starts_at_idx: one index seek.
+    return (
+        Event.objects.filter(starts_at__lt=now or timezone.now())
+        .order_by('-starts_at').values_list('starts_at', flat=True).first()
+    )
+
+
+def event_ordering(queryset, params):
+    # Search results are listed by relevance, events near a place nearest
+    # first, upcoming events soonest first, everything else newest first.
+    if 'search_rank' in queryset.query.annotations:
+        return ('search_rank', 'id')
+    if 'distance_km' in queryset.query.annotations:
+        return ('distance_km', 'id')
+    if params.get('upcoming'):
+        return ('starts_at', 'id')
+    return ('-date', '-id')
+
+
+def filter_context(params):
+    """The current filter values, for re-filling the filter form."""
+    return {
+        'query': params.get('q', ''),
+        'selected_category': params.get('category'),
+        'start_date': params.get('start_date'),
+        'end_date': params.get('end_date'),
+        'upcoming': params.get('upcoming'),
+        'near': params.get('near', ''),
+        'lat': params.get('lat', ''),
+        'lng': params.get('lng', ''),
+        'radius': search_radius(params),
+        'radius_choices': RADIUS_CHOICES_KM,
+        'proximity': is_proximity_search(params),
+    }
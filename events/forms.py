@@ -1,4 +1,6 @@
 from django import forms
+from django.template.defaultfilters import pluralize
+from events.geo import locate
 from events.models import Event
 
 
@@ -47,7 +49,7 @@ class StyledFormMixin:
 class EventModelForm(StyledFormMixin, forms.ModelForm):
     class Meta:
         model = Event
-        fields = ['name', 'description', 'date', 'time', 'location', 'category', 'image']
+        fields = ['name', 'description', 'date', 'time', 'location', 'latitude', 'longitude', 'category', 'capacity', 'image']
         widgets = {
             'date': forms.DateInput(attrs={'type': 'date'}),
             'time': forms.TimeInput(attrs={'type': 'time'}),
@@ -57,3 +59,29 @@ class EventModelForm(StyledFormMixin, forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.apply_styled_widgets()
+
+    def clean_capacity(self):
+        capacity = self.cleaned_data.get('capacity')
+        if capacity is not None and self.instance.pk:
+            booked = Event.objects.filter(pk=self.instance.pk).values_list('rsvp_count', flat=True).first() or 0
+            if capacity < booked:
+                raise forms.ValidationError(f"Capacity can't be below the {booked} seat{pluralize(booked)} already booked.")
+        return capacity
+
+    def clean(self):
+        cleaned_data = super().clean()
+        latitude, longitude = cleaned_data.get('latitude'), cleaned_data.get('longitude')
+        if (latitude is None) != (longitude is None) and not self.has_error('latitude') and not self.has_error('longitude'):
+            self.add_error('longitude', "Give both latitude and longitude, or neither.")
+            return cleaned_data
+        # Look the place up when no coordinates were given, or when the
+        # location changed and the old coordinates were left as they were.
+        moved = 'location' in self.changed_data and not {'latitude', 'longitude'} & set(self.changed_data)
+        if latitude is None or moved:
+            place = locate(cleaned_data.get('location'))
+            if place is not None:
+                cleaned_data['latitude'], cleaned_data['longitude'] = place.latitude, place.longitude
+            elif moved:
+                # Better unplaced than pinned to where the event used to be.
+                cleaned_data['latitude'] = cleaned_data['longitude'] = None
+        return cleaned_data
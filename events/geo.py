@@ -0,0 +1,149 @@
+import csv
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+
+
+# ----------------------------------------
+# Coordinates, grid cells and the offline gazetteer
+# ----------------------------------------
+# Every located event carries a grid cell: its latitude and longitude cut
+# into 2**26 steps each and bit-interleaved (a Z-order curve, the integer
+# form of a geohash). Points close together share a cell prefix, and a
+# prefix is a contiguous integer range, so "events in this box" becomes a
+# handful of range scans on a plain B-tree index, on SQLite and Postgres
+# alike. No model imports here: fake_data uses this module in worker
+# processes.
+
+CELL_BITS = 26                  # per axis; a level-26 cell is about 60 cm across
+KM_PER_DEGREE = 111.195         # one degree of latitude (mean Earth radius)
+MAX_RADIUS_KM = 500
+# Cells a search box is covered with; more cells mean tighter ranges but
+# more OR branches in the query.
+MAX_COVER_CELLS = 12
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+
+def _spread(value):
+    """Put the bits of a 26-bit integer at the even bit positions."""
+    value &= 0x3FFFFFF
+    value = (value | value << 16) & 0x0000FFFF0000FFFF
+    value = (value | value << 8) & 0x00FF00FF00FF00FF
+    value = (value | value << 4) & 0x0F0F0F0F0F0F0F0F
+    value = (value | value << 2) & 0x3333333333333333
+    value = (value | value << 1) & 0x5555555555555555
+    return value
+
+
+def _step(value, low, span, level):
+    steps = 1 << level
+    return min(max(int((value - low) / span * steps), 0), steps - 1)
+
+
+def _interleave(lat_step, lng_step):
+    # Longitude takes the higher bit of each pair, as in a geohash.
+    return _spread(lng_step) << 1 | _spread(lat_step)
+
+
+def geo_cell(latitude, longitude):
+    """The level-26 cell of a point, or None if either coordinate is missing."""
+    if latitude is None or longitude is None:
+        return None
+    return _interleave(
+        _step(latitude, -90, 180, CELL_BITS),
+        _step(longitude, -180, 360, CELL_BITS),
+    )
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(south, north, west, east) of the circle, clamped to the map edges."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    # Meridians converge towards the poles; never divide by (almost) zero.
+    lng_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return (
+        max(latitude - lat_delta, -90), min(latitude + lat_delta, 90),
+        max(longitude - lng_delta, -180), min(longitude + lng_delta, 180),
+    )
+
+
+def cover_ranges(south, north, west, east):
+    """
+    Inclusive (low, high) cell ranges covering the box: the finest level at
+    which it spans at most MAX_COVER_CELLS cells, with neighbouring ranges
+    merged.
+    """
+    for level in range(CELL_BITS, -1, -1):
+        lat_steps = range(_step(south, -90, 180, level), _step(north, -90, 180, level) + 1)
+        lng_steps = range(_step(west, -180, 360, level), _step(east, -180, 360, level) + 1)
+        if len(lat_steps) * len(lng_steps) <= MAX_COVER_CELLS:
+            break
+    shift = 2 * (CELL_BITS - level)
+    prefixes = sorted(_interleave(i, j) for i in lat_steps for j in lng_steps)
+
+    ranges = []
+    for prefix in prefixes:
+        low, high = prefix << shift, ((prefix + 1) << shift) - 1
+        if ranges and ranges[-1][1] + 1 == low:
+            ranges[-1] = (ranges[-1][0], high)
+        else:
+            ranges.append((low, high))
+    return ranges
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    """Great-circle (haversine) distance."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * KM_PER_DEGREE * math.degrees(math.asin(min(1, math.sqrt(a))))
+
+
+# - - - - - - - - - - #
+#      Gazetteer      #
+# - - - - - - - - - - #
+class Place:
+    def __init__(self, name, country, latitude, longitude):
+        self.name = name
+        self.country = country
+        self.latitude = latitude
+        self.longitude = longitude
+
+    def __repr__(self):
+        return f"Place({self.name}, {self.country})"
+
+
+def _key(text):
+    return re.sub(r'[^\w]+', ' ', text.lower()).strip()
+
+
+@lru_cache(maxsize=1)
+def gazetteer():
+    """(places in file order, {normalised name or alias: place})."""
+    places, names = [], {}
+    with open(GAZETTEER_PATH, encoding='utf-8', newline='') as fh:
+        for row in csv.DictReader(fh):
+            place = Place(row['name'], row['country'], float(row['latitude']), float(row['longitude']))
+            places.append(place)
+            for name in [row['name'], *filter(None, row['aliases'].split('|'))]:
+                # The file lists bigger cities first; they keep a shared name.
+                names.setdefault(_key(name), place)
+    return places, names
+
+
+def locate(text):
+    """
+    The gazetteer place a free-text location names, e.g. "Dhaka",
+    "Hall 3, Sylhet" or "Chittagong, Bangladesh"; None if none matches.
+    The whole text is tried first, then each comma-separated part from
+    the last (usually the city) to the first.
+    """
+    if not text:
+        return None
+    _, names = gazetteer()
+    parts = [text, *reversed(text.split(','))]
+    for part in parts:
+        place = names.get(_key(part))
+        if place is not None:
+            return place
+    return None
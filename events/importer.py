@@ -0,0 +1,204 @@
+import csv
+import io
+import re
+from datetime import datetime, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db import transaction
+from django.utils import timezone
+
+from .feeds import invalidate_feeds
+from .forms import EventModelForm
+from .geo import geo_cell
+from .models import Category, Event, StatRollup
+from .page_cache import bump_page_versions
+from .search import get_search_backend
+from .stats import bump_rollups, month
+
+
+# ----------------------------------------
+# Bulk event import (CSV / iCalendar)
+# ----------------------------------------
+# Both parsers read the file one line at a time and yield (line number, row)
+# pairs, so a season of events never sits in memory as a whole. Rows are
+# validated by EventImportForm, then bulk-inserted in chunks. A bad row
+# is reported with its line number and skipped; the rest still go in.
+
+IMPORT_CHUNK_SIZE = 500
+CSV_COLUMNS = ['name', 'description', 'date', 'time', 'location', 'latitude', 'longitude', 'category', 'capacity']
+
+
+class EventImportForm(EventModelForm):
+    """EventModelForm's rules for one imported row; the category is resolved by the importer."""
+
+    class Meta(EventModelForm.Meta):
+        fields = ['name', 'description', 'date', 'time', 'location', 'latitude', 'longitude', 'capacity']
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []     # (line number, message)
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+def text_stream(binary_file):
+    # utf-8-sig drops the byte order mark spreadsheets like to prepend.
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', errors='replace', newline='')
+
+
+def detect_format(filename):
+    return 'ics' if filename.lower().endswith(('.ics', '.ical', '.ifb')) else 'csv'
+
+
+# - - - - - - - - - - #
+#         CSV         #
+# - - - - - - - - - - #
+def parse_csv(lines):
+    reader = csv.DictReader(lines)
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, {key: (value or '').strip() for key, value in row.items() if key}
+
+
+# - - - - - - - - - - #
+#     iCalendar       #
+# - - - - - - - - - - #
+ICS_ESCAPES = re.compile(r'\\([\\;,nN])')
+
+
+def _unescape(value):
+    return ICS_ESCAPES.sub(lambda match: '\n' if match.group(1) in 'nN' else match.group(1), value)
+
+
+def _unfolded(lines):
+    """RFC 5545 content lines: a line starting with a space or tab continues the previous one."""
+    current, start = None, 0
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current is not None:
+        yield start, current
+
+
+def _ics_start(value, params):
+    """DTSTART -> (date, time) strings in the site's timezone."""
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return datetime.strptime(value[:8], '%Y%m%d').date().isoformat(), '00:00'
+    moment = datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+    if value.endswith('Z'):
+        moment = timezone.localtime(moment.replace(tzinfo=dt_timezone.utc))
+    elif 'TZID' in params:
+        try:
+            moment = timezone.localtime(moment.replace(tzinfo=ZoneInfo(params['TZID'])))
+        except ZoneInfoNotFoundError:
+            pass  # floating time, as if no TZID was given
+    return moment.date().isoformat(), moment.time().isoformat(timespec='minutes')
+
+
+def parse_ics(lines):
+    event, start = None, 0
+    for number, line in _unfolded(lines):
+        name, _, value = line.partition(':')
+        name, *param_parts = name.split(';')
+        name = name.upper()
+        params = dict(part.split('=', 1) for part in param_parts if '=' in part)
+
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event, start = {}, number
+        elif name == 'END' and value.upper() == 'VEVENT' and event is not None:
+            yield start, event
+            event = None
+        elif event is None:
+            continue
+        elif name == 'SUMMARY':
+            event['name'] = _unescape(value)
+        elif name == 'DESCRIPTION':
+            event['description'] = _unescape(value)
+        elif name == 'LOCATION':
+            event['location'] = _unescape(value)
+        elif name == 'GEO':
+            event['latitude'], _, event['longitude'] = value.partition(';')
+        elif name == 'CATEGORIES':
+            event['category'] = _unescape(value.split(',')[0])
+        elif name == 'DTSTART':
+            try:
+                event['date'], event['time'] = _ics_start(value, params)
+            except ValueError:
+                event['date'] = value    # left for the form to reject
+
+
+# - - - - - - - - - - #
+#       Import        #
+# - - - - - - - - - - #
+def category_map():
+    """Every way a row may name a category (key, label, id) -> Category, in one query."""
+    labels = dict(Category.CATEGORY_CHOICES)
+    categories = {}
+    for category in Category.objects.all():
+        for alias in (category.name, labels.get(category.name, ''), str(category.pk)):
+            if alias:
+                categories[alias.strip().lower()] = category
+    return categories
+
+
+def import_events(rows, created_by=None, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False):
+    """Validate and insert ``(line, row dict)`` pairs; returns an ImportResult."""
+    result = ImportResult()
+    categories = category_map()
+    default_category = Category.objects.order_by('pk').first()
+    pending = []
+
+    for line, row in rows:
+        form = EventImportForm(data=row)
+        if not form.is_valid():
+            message = '; '.join(f"{field}: {' '.join(errors)}" for field, errors in form.errors.items())
+            result.error(line, message)
+            continue
+        category_name = row.get('category', '').strip().lower()
+        category = categories.get(category_name) if category_name else default_category
+        if category is None:
+            result.error(line, f"category: unknown category \"{row.get('category')}\".")
+            continue
+
+        event = form.save(commit=False)
+        event.category = category
+        event.created_by = created_by
+        # bulk_create skips Event.save(), which normally sets these.
+        event.starts_at = Event.combine_starts_at(event.date, event.time)
+        event.geo_cell = geo_cell(event.latitude, event.longitude)
+        pending.append(event)
+        if len(pending) >= chunk_size:
+            result.created += _insert(pending, dry_run)
+            pending = []
+
+    if pending:
+        result.created += _insert(pending, dry_run)
+    if result.created and not dry_run:
+        bump_page_versions('events', 'calendar')
+        if created_by is not None:
+            invalidate_feeds(user_ids=[created_by.pk])
+    return result
+
+
+def _insert(events, dry_run):
+    if dry_run:
+        return len(events)
+    with transaction.atomic():
+        created = Event.objects.bulk_create(events)
+        # bulk_create sends no post_save: index and count the chunk here.
+        get_search_backend().index_events([event for event in created if event.pk])
+        deltas = {}
+        for event in created:
+            key = (StatRollup.EVENTS, event.category_id, month(event.date))
+            deltas[key] = deltas.get(key, 0) + 1
+        bump_rollups(deltas)
+    return len(created)
@@ -0,0 +1,175 @@
+import json
+import math
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import reverse
+from events.models import Event
+
+User = get_user_model()
+
+ROLES = ['anonymous', 'participant', 'organizer', 'admin']
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the main views against a freshly seeded test database and report latency/SQL stats as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=2000)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--participants', type=int, default=500)
+        parser.add_argument('--rsvps-per-event', type=int, default=5)
+        parser.add_argument('--requests', type=int, default=50, help="Requests per endpoint and role")
+        parser.add_argument('--warmup', type=int, default=3, help="Unmeasured requests per endpoint and role")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+        parser.add_argument('--baseline', help="JSON report of a previous run to compare against")
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Allowed relative slowdown in p95 latency / query count before failing")
+        parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                            help="Ignore latency changes smaller than this (timer noise)")
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the test database between runs")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            self.seed(options)
+            results = self.run_endpoints(options['requests'], options['warmup'])
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        report = {
+            'dataset': {
+                key: options[key] for key in ('events', 'users', 'participants', 'rsvps_per_event', 'seed')
+            },
+            'requests_per_endpoint': options['requests'],
+            'results': results,
+        }
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(payload + '\n')
+        else:
+            self.stdout.write(payload)
+
+        if options['baseline']:
+            self.compare(report, options['baseline'], options['threshold'], options['min_delta_ms'])
+
+    # - - - - - - - - - - #
+    #       Dataset       #
+    # - - - - - - - - - - #
+    def seed(self, options):
+        call_command(
+            'generate_fake_data',
+            events=options['events'], users=options['users'], participants=options['participants'],
+            rsvps_per_event=options['rsvps_per_event'], seed=options['seed'], workers=1,
+            stdout=self.stderr,
+        )
+        call_command('create_groups', stdout=self.stderr)
+
+        self.users = {}
+        for role, group in [('participant', 'Participant'), ('organizer', 'Organizer'), ('admin', 'Admin')]:
+            user = User.objects.create_user(f'bench_{role}', email=f'bench_{role}@example.com', password='bench')
+            user.groups.set([Group.objects.get(name=group)])
+            self.users[role] = user
+
+        # Give the organizer some events of their own and the participant some RSVPs.
+        event_ids = list(Event.objects.values_list('id', flat=True))
+        owned = self.rng.sample(event_ids, min(len(event_ids), 50))
+        Event.objects.filter(pk__in=owned).update(created_by=self.users['organizer'])
+        self.users['participant'].rsvp_events.add(*self.rng.sample(event_ids, min(len(event_ids), 20)))
+        self.event_ids = event_ids
+
+    def clients(self):
+        clients = {'anonymous': Client()}
+        for role, user in self.users.items():
+            clients[role] = Client()
+            clients[role].force_login(user)
+        return clients
+
+    # - - - - - - - - - - #
+    #      Endpoints      #
+    # - - - - - - - - - - #
+    def endpoints(self):
+        random_event = lambda: self.rng.choice(self.event_ids)
+        return [
+            ('all_events', ROLES, 'get', lambda: reverse('all_events')),
+            ('all_events_search', ROLES, 'get', lambda: reverse('all_events') + '?q=party'),
+            ('event_detail', ROLES, 'get', lambda: reverse('event_detail', args=[random_event()])),
+            ('dashboard', ['participant', 'organizer', 'admin'], 'get', lambda: reverse('dashboard')),
+            ('rsvp_event', ['participant'], 'post', lambda: reverse('rsvp_event', args=[random_event()])),
+            ('users_control', ['admin'], 'get', lambda: reverse('users_control')),
+        ]
+
+    def run_endpoints(self, requests, warmup):
+        clients = self.clients()
+        results = {}
+        for name, roles, method, url in self.endpoints():
+            for role in roles:
+                client = clients[role]
+                for _ in range(warmup):
+                    getattr(client, method)(url())
+
+                latencies, query_counts, sql_times = [], [], []
+                for _ in range(requests):
+                    target = url()
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        response = getattr(client, method)(target)
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    if response.status_code >= 400:
+                        raise CommandError(f"{name} as {role}: HTTP {response.status_code} for {target}")
+                    query_counts.append(len(queries))
+                    sql_times.append(sum(float(query['time']) for query in queries.captured_queries) * 1000)
+
+                results[f'{name}:{role}'] = {
+                    'p50_ms': round(percentile(latencies, 50), 3),
+                    'p95_ms': round(percentile(latencies, 95), 3),
+                    'p99_ms': round(percentile(latencies, 99), 3),
+                    'queries_p50': percentile(query_counts, 50),
+                    'queries_max': max(query_counts),
+                    'sql_ms_p50': round(percentile(sql_times, 50), 3),
+                }
+                self.stderr.write(f"  {name:<18} {role:<12} p95={results[f'{name}:{role}']['p95_ms']}ms "
+                                  f"queries={results[f'{name}:{role}']['queries_p50']}")
+        return results
+
+    # - - - - - - - - - - #
+    #     Regressions     #
+    # - - - - - - - - - - #
+    def compare(self, report, baseline_path, threshold, min_delta_ms):
+        with open(baseline_path) as fh:
+            baseline = json.load(fh)
+
+        regressions = []
+        for key, before in baseline.get('results', {}).items():
+            after = report['results'].get(key)
+            if after is None:
+                continue
+            if (after['p95_ms'] > before['p95_ms'] * (1 + threshold)
+                    and after['p95_ms'] - before['p95_ms'] >= min_delta_ms):
+                regressions.append(f"{key} p95_ms: {before['p95_ms']} -> {after['p95_ms']}")
+            if after['queries_p50'] > before['queries_p50'] * (1 + threshold):
+                regressions.append(f"{key} queries_p50: {before['queries_p50']} -> {after['queries_p50']}")
+
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stderr.write(self.style.SUCCESS(f"✅ No regressions beyond {threshold:.0%} against {baseline_path}"))
@@ -0,0 +1,145 @@
+import json
+import random
+import time
+from datetime import date, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+from events.geo import geo_cell, gazetteer
+from events.models import Category, Event
+
+from .bench import percentile
+
+
+class Command(BaseCommand):
+    help = "Benchmark proximity search on the grid-cell index against a brute-force scan of every event"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1_000_000)
+        parser.add_argument('--queries', type=int, default=50, help="Searches per radius")
+        parser.add_argument('--radius', type=float, action='append',
+                            help="Search radius in km (repeatable; default 5, 25 and 100)")
+        parser.add_argument('--clustered', type=float, default=0.8,
+                            help="Share of events placed around gazetteer cities; the rest are spread worldwide")
+        parser.add_argument('--chunk-size', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the test database between runs")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        radii = options['radius'] or [5, 25, 100]
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            if Event.objects.count() != options['events']:
+                Event.objects.all().delete()
+                self.seed(options['events'], options['clustered'], options['chunk_size'])
+            self.stderr.write(f"  plan: {self.plan()}")
+            results = {f'{radius:g}km': self.run(radius, options['queries']) for radius in radii}
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        report = {
+            'dataset': {'events': options['events'], 'clustered': options['clustered'], 'seed': options['seed']},
+            'queries_per_radius': options['queries'],
+            'results': results,
+        }
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(payload + '\n')
+        else:
+            self.stdout.write(payload)
+
+    # - - - - - - - - - - #
+    #       Dataset       #
+    # - - - - - - - - - - #
+    def point(self, clustered):
+        if self.rng.random() < clustered:
+            place = self.rng.choice(self.places)
+            return place.latitude + self.rng.gauss(0, 0.3), place.longitude + self.rng.gauss(0, 0.3)
+        return self.rng.uniform(-60, 70), self.rng.uniform(-180, 180)
+
+    def seed(self, total, clustered, chunk_size):
+        # Straight multi-row INSERTs: a million model instances would take
+        # longer to build than the benchmark takes to run.
+        self.places, _ = gazetteer()
+        category, _ = Category.objects.get_or_create(name='CASUAL')
+        day, at = date(2026, 1, 1), dt_time(18, 0)
+        starts_at, now = Event.combine_starts_at(day, at), timezone.now()
+        fields = [Event._meta.get_field(name) for name in (
+            'name', 'date', 'time', 'location', 'category', 'starts_at', 'rsvp_count', 'image', 'updated_at',
+            'latitude', 'longitude', 'geo_cell',
+        )]
+        table = connection.ops.quote_name(Event._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        values = lambda field, value: field.get_db_prep_save(value, connection)
+
+        started = time.monotonic()
+        for start in range(0, total, chunk_size):
+            rows = []
+            for index in range(start, min(start + chunk_size, total)):
+                latitude, longitude = self.point(clustered)
+                latitude, longitude = min(max(latitude, -90), 90), min(max(longitude, -180), 180)
+                row = (f"Event {index}", day, at, "Somewhere", category.pk, starts_at, 0,
+                       'event_images/default.jpg', now, latitude, longitude, geo_cell(latitude, longitude))
+                rows.append([values(field, value) for field, value in zip(fields, row)])
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
+            done = min(start + chunk_size, total)
+            self.stderr.write(f"  events: {done}/{total} ({done / (time.monotonic() - started):.0f} rows/sec)")
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {table}")
+
+    # - - - - - - - - - - #
+    #      Searches       #
+    # - - - - - - - - - - #
+    def plan(self):
+        place = gazetteer()[0][0]
+        queryset = Event.objects.near(place.latitude, place.longitude, 25).values_list('id', 'distance_km')
+        return ' | '.join(line.strip() for line in queryset.explain().splitlines() if line.strip())
+
+    def search(self, latitude, longitude, radius, cells):
+        queryset = Event.objects.near(latitude, longitude, radius, cells=cells).order_by('distance_km', 'id')
+        started = time.perf_counter()
+        rows = list(queryset.values_list('id', 'distance_km'))
+        return (time.perf_counter() - started) * 1000, rows
+
+    def run(self, radius, queries):
+        places, _ = gazetteer()
+        indexed_ms, brute_ms, matches = [], [], []
+        for _ in range(queries):
+            place = self.rng.choice(places)
+            latitude = place.latitude + self.rng.uniform(-0.2, 0.2)
+            longitude = place.longitude + self.rng.uniform(-0.2, 0.2)
+            elapsed, rows = self.search(latitude, longitude, radius, cells=True)
+            brute_elapsed, brute_rows = self.search(latitude, longitude, radius, cells=False)
+            if rows != brute_rows:
+                raise CommandError(
+                    f"Indexed and brute-force results differ around ({latitude:.4f}, {longitude:.4f}) within {radius} km"
+                )
+            indexed_ms.append(elapsed)
+            brute_ms.append(brute_elapsed)
+            matches.append(len(rows))
+
+        result = {
+            'indexed_p50_ms': round(percentile(indexed_ms, 50), 3),
+            'indexed_p95_ms': round(percentile(indexed_ms, 95), 3),
+            'brute_force_p50_ms': round(percentile(brute_ms, 50), 3),
+            'brute_force_p95_ms': round(percentile(brute_ms, 95), 3),
+            'matches_p50': percentile(matches, 50),
+            'matches_max': max(matches),
+        }
+        result['speedup_p50'] = round(result['brute_force_p50_ms'] / max(result['indexed_p50_ms'], 0.001), 1)
+        self.stderr.write(
+            f"  {radius:>6g} km  indexed p50={result['indexed_p50_ms']}ms  "
+            f"brute force p50={result['brute_force_p50_ms']}ms  x{result['speedup_p50']}  "
+            f"matches p50={result['matches_p50']}"
+        )
+        return result
@@ -0,0 +1,164 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from events.models import Event
+
+from .bench import percentile
+
+User = get_user_model()
+
+# name -> (server command, extra environment)
+SERVERS = {
+    'wsgi': (['gunicorn', 'config.wsgi:application'], {'ASYNC_READ_VIEWS': 'False'}),
+    'asgi': (['uvicorn', 'config.asgi:application'], {'ASYNC_READ_VIEWS': 'True'}),
+}
+
+
+class Command(BaseCommand):
+    help = ("Start the app under gunicorn (WSGI, sync views) and uvicorn (ASGI, async views) against this "
+            "database and compare concurrent-request throughput and latency as JSON")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', action='append', choices=list(SERVERS),
+                            help="Only benchmark this server (repeatable, default: all)")
+        parser.add_argument('--workers', type=int, default=2, help="Server worker processes")
+        parser.add_argument('--concurrency', type=int, action='append',
+                            help="Concurrent clients (repeatable, default: 1, 8, 32)")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint and concurrency level")
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        levels = options['concurrency'] or [1, 8, 32]
+        self.bust = count()
+        cookie = self.login_cookie()
+        endpoints = self.endpoints(cookie)
+
+        results = {}
+        for name in options['server'] or list(SERVERS):
+            with self.server(name, options['workers'], options['port']) as base_url:
+                for endpoint, (path, headers) in endpoints.items():
+                    self.run(base_url, path, headers, options['requests'], 1)  # warm up
+                    for level in levels:
+                        stats = self.run(base_url, path, headers, options['requests'], level)
+                        results[f'{name}:{endpoint}:c{level}'] = stats
+                        self.stderr.write(f"  {name:<5} {endpoint:<16} c={level:<3} {stats['rps']:>8} req/s "
+                                          f"p95={stats['p95_ms']}ms errors={stats['errors']}")
+
+        report = {
+            'workers': options['workers'],
+            'requests_per_level': options['requests'],
+            'events': Event.objects.count(),
+            'results': results,
+        }
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(payload + '\n')
+        else:
+            self.stdout.write(payload)
+        self.stderr.write(self.style.SUCCESS("✅ Benchmark finished"))
+
+    # - - - - - - - - - - #
+    #      Endpoints      #
+    # - - - - - - - - - - #
+    def login_cookie(self):
+        # Sessions live in the database, so one logged in here is valid in
+        # the server processes too.
+        user = User.objects.filter(rsvp_events__isnull=False).first()
+        if user is None:
+            return None
+        client = Client()
+        client.force_login(user)
+        return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    def endpoints(self, cookie):
+        event = Event.objects.order_by('-date', '-id').first()
+        if event is None:
+            raise CommandError("No events in this database; run generate_fake_data first")
+        endpoints = {
+            'home': (reverse('home'), {}),
+            'all_events': (reverse('all_events'), {}),
+            'event_detail': (reverse('event_detail', args=[event.pk]), {}),
+        }
+        if cookie:
+            endpoints['attended_events'] = (reverse('attended_events'), {'Cookie': cookie})
+        return endpoints
+
+    # - - - - - - - - - - #
+    #       Servers       #
+    # - - - - - - - - - - #
+    def server(self, name, workers, port):
+        command, extra_env = SERVERS[name]
+        env = {**os.environ, 'REQUEST_PROFILING_SAMPLE_RATE': '0', **extra_env}
+        bind = ['--bind', f'127.0.0.1:{port}'] if name == 'wsgi' else ['--host', '127.0.0.1', '--port', str(port)]
+        args = [sys.executable, '-m', *command, *bind, '--workers', str(workers), '--log-level', 'warning']
+        return _Server(args, env, port)
+
+    def run(self, base_url, path, headers, requests, concurrency):
+        def fetch(_):
+            # A unique query string keeps the anonymous page cache out of the numbers.
+            request = urllib.request.Request(f'{base_url}{path}?_bench={next(self.bust)}', headers=headers)
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return (time.perf_counter() - started) * 1000, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(fetch, range(requests)))
+        elapsed = time.perf_counter() - started
+
+        latencies = [ms for ms, _ in outcomes]
+        return {
+            'rps': round(requests / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'errors': sum(1 for _, ok in outcomes if not ok),
+        }
+
+
+class _Server:
+    """Run a server process for the duration of a ``with`` block."""
+
+    def __init__(self, args, env, port, timeout=30):
+        self.args, self.env, self.port, self.timeout = args, env, port, timeout
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.args, env=self.env, cwd=settings.BASE_DIR)
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"{' '.join(self.args)} exited with {self.process.returncode}")
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=1).close()
+                return f'http://127.0.0.1:{self.port}'
+            except OSError:
+                time.sleep(0.2)
+        self.process.kill()
+        raise CommandError(f"{' '.join(self.args)} did not start within {self.timeout}s")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
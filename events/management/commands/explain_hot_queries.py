@@ -0,0 +1,162 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from events.geo import gazetteer
+from events.models import Event, Category
+
+User = get_user_model()
+
+# Lookup tables small enough that a full scan is the right plan.
+SMALL_TABLES = ['events_category', 'auth_group', 'django_content_type', 'django_session']
+
+# "Seq Scan on events_event" (PostgreSQL) / "SCAN events_event" (SQLite, no index).
+SEQ_SCAN_PATTERNS = [
+    re.compile(r'Seq Scan on (\w+)'),
+    re.compile(r'^SCAN (\w+)$'),
+]
+SORT_PATTERNS = [
+    re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT)'),
+    re.compile(r'^Sort\b'),
+]
+
+
+class Command(BaseCommand):
+    help = "Run the hot views against this database, EXPLAIN every SELECT they issue and flag sequential scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ignore-table', action='append', default=list(SMALL_TABLES),
+                            help="Don't flag full scans of this table (repeatable)")
+        parser.add_argument('--plans', action='store_true', help="Print the full plan of every statement")
+        parser.add_argument('--fail', action='store_true', help="Exit non-zero when a sequential scan is found")
+
+    def handle(self, *args, **options):
+        self.ignored = set(options['ignore_table'])
+        self.factory = RequestFactory()
+        users = self.pick_users()
+
+        flagged = 0
+        for label, url, user in self.hot_views(users):
+            if user is None:
+                self.stdout.write(self.style.WARNING(f"- {label}: skipped (no suitable user in this database)"))
+                continue
+            statements = self.capture(url, user)
+            self.stdout.write(f"\n{label}  {url}  ({len(statements)} distinct SELECTs)")
+            for sql, params in statements:
+                plan = self.explain(sql, params)
+                scans = self.seq_scans(plan)
+                sorts = [line for line in plan if any(p.search(line) for p in SORT_PATTERNS)]
+                if scans:
+                    flagged += 1
+                    self.stdout.write(self.style.ERROR(f"  ✗ sequential scan on {', '.join(scans)}"))
+                elif sorts:
+                    self.stdout.write(self.style.WARNING("  ~ index used, but sorted in memory"))
+                else:
+                    self.stdout.write(self.style.SUCCESS("  ✓ uses indexes"))
+                self.stdout.write(f"    {sql[:200]}")
+                if options['plans'] or scans:
+                    for line in plan:
+                        self.stdout.write(f"      {line}")
+
+        if flagged and options['fail']:
+            raise CommandError(f"{flagged} statements use a sequential scan")
+        summary = f"{flagged} statements with sequential scans" if flagged else "No sequential scans on hot paths"
+        self.stdout.write(self.style.SUCCESS(f"\n✅ {summary} ({connection.vendor})"))
+
+    # - - - - - - - - - - #
+    #    Views + users    #
+    # - - - - - - - - - - #
+    def pick_users(self):
+        admin = User.objects.filter(is_superuser=True).first() or User.objects.filter(groups__name='Admin').first()
+        organizer = (
+            User.objects.filter(groups__name='Organizer', created_events__isnull=False).first()
+            or User.objects.filter(groups__name='Organizer').first()
+        )
+        participant = (
+            User.objects.filter(is_superuser=False, rsvp_events__isnull=False)
+            .exclude(groups__name__in=['Admin', 'Organizer']).first()
+        )
+        return {'admin': admin, 'organizer': organizer, 'participant': participant}
+
+    def hot_views(self, users):
+        # Authenticated requests bypass the anonymous page cache, so every
+        # view really queries.
+        viewer = users['admin'] or users['organizer'] or users['participant']
+        all_events = reverse('all_events')
+        category = Category.objects.order_by('pk').first()
+        event = Event.objects.order_by('-date', '-id').first()
+        today = timezone.localdate()
+
+        views = [
+            ('all events', all_events, viewer),
+            ('all events, upcoming', f'{all_events}?upcoming=1', viewer),
+            ('all events, date range',
+             f'{all_events}?start_date={today}&end_date={today + timedelta(days=30)}', viewer),
+            ('all events, near a city', f'{all_events}?near={gazetteer()[0][0].name}&radius=25', viewer),
+        ]
+        if category:
+            views.append(('all events, category', f'{all_events}?category={category.pk}', viewer))
+        calendar = f"{reverse('events_calendar')}?date={event.date if event else today}"
+        views.append(('calendar, month', calendar, viewer))
+        if category:
+            views.append(('calendar, week, category', f'{calendar}&view=week&category={category.pk}', viewer))
+        if event:
+            views.append(('event detail', reverse('event_detail', args=[event.pk]), viewer))
+        views += [
+            ('organizer dashboard', reverse('dashboard'), users['organizer']),
+            ('participant dashboard', reverse('dashboard'), users['participant']),
+            ('attended events', reverse('attended_events'), users['participant']),
+            ('admin dashboard', reverse('dashboard'), users['admin']),
+            ('events control', reverse('events_control'), users['admin']),
+        ]
+        return views
+
+    def capture(self, url, user):
+        request = self.factory.get(url)
+        request.user = user
+        match = resolve(request.path_info)
+        request.resolver_match = match
+        with CaptureQueriesContext(connection) as queries:
+            response = match.func(request, *match.args, **match.kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        if response.status_code >= 400:
+            raise CommandError(f"{url} as {user}: HTTP {response.status_code}")
+
+        statements = []
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if sql.lstrip().upper().startswith('SELECT') and (sql, ()) not in statements:
+                statements.append((sql, ()))
+        # Querysets handed to the template but never evaluated by it still
+        # belong to the view; explain them too.
+        for value in (getattr(response, 'context_data', None) or {}).values():
+            if isinstance(value, QuerySet) and value._result_cache is None:
+                sql, params = value.query.sql_with_params()
+                statements.append((sql, tuple(params)))
+        return statements
+
+    # - - - - - - - - - - #
+    #        Plans        #
+    # - - - - - - - - - - #
+    def explain(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params or None)
+            # SQLite returns (id, parent, notused, detail), PostgreSQL one text column.
+            return [str(row[-1]).strip() for row in cursor.fetchall()]
+
+    def seq_scans(self, plan):
+        tables = []
+        for line in plan:
+            for pattern in SEQ_SCAN_PATTERNS:
+                match = pattern.search(line)
+                if match and match.group(1) not in self.ignored and match.group(1) not in tables:
+                    tables.append(match.group(1))
+        return tables
@@ -0,0 +1,38 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from events.exports import EXPORT_CHUNK_SIZE, attendee_rows, csv_chunks
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = "Stream an event's attendees (RSVPs and legacy participants) as CSV to a file or stdout"
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', type=int)
+        parser.add_argument('--output', help="File to write (default: stdout)")
+        parser.add_argument('--excel', action='store_true', help="Add a BOM and defuse formula-like cells")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if not Event.objects.filter(pk=options['event_id']).exists():
+            raise CommandError(f"No event with id {options['event_id']}")
+
+        started = time.monotonic()
+        written = 0
+        chunks = csv_chunks(attendee_rows(options['event_id'], options['chunk_size']), excel=options['excel'])
+        out = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            if options['output']:
+                out.close()
+            else:
+                out.flush()
+
+        self.stderr.write(self.style.SUCCESS(
+            f"✅ Exported {written} bytes in {time.monotonic() - started:.1f}s"
+        ))
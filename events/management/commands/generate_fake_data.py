@@ -1,49 +1,199 @@
 # events/management/commands/generate_fake_data.py
 
-from django.core.management.base import BaseCommand
-from faker import Faker
-from events.models import Event, Category, Participant
+import multiprocessing
+import os
 import random
-from datetime import datetime, timedelta
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from events import fake_data
+from events.geo import geo_cell
+from events.models import Attendance, Event, Category, Participant
+from events.rsvps import fill_event_dates
+
+User = get_user_model()
+
 
 class Command(BaseCommand):
-    help = 'Generate fake categories, events, and participants'
+    help = 'Generate fake categories, events, users, RSVPs and participants (scales to millions of rows)'
 
-    def handle(self, *args, **kwargs):
-        fake = Faker()
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=20)
+        parser.add_argument('--users', type=int, default=0,
+                            help="Users to create (they are the RSVP pool)")
+        parser.add_argument('--participants', type=int, default=200,
+                            help="Legacy Participant rows, each linked to 1-3 random events")
+        parser.add_argument('--rsvps-per-event', type=int, default=0,
+                            help="Distinct users RSVP'd to every event (capped at the user count)")
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Processes generating Faker data")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--skip-search-index', action='store_true',
+                            help="Don't rebuild the search index afterwards")
 
-        # Optional: Clear previous data
-        # Participant.objects.all().delete()
-        # Event.objects.all().delete()
-        # Category.objects.all().delete()
+    def handle(self, *args, **options):
+        self.chunk_size = options['chunk_size']
+        self.seed = options['seed']
+        self.rng = random.Random(self.seed)
+        self.rows_written = 0
+        started = time.monotonic()
 
         # Create categories (if not already exist)
         categories = dict(Category.CATEGORY_CHOICES)
         for key, label in categories.items():
             Category.objects.get_or_create(name=key, defaults={'description': f"{label} Description"})
+        category_ids = list(Category.objects.values_list('id', flat=True))
+
+        workers = max(1, options['workers'])
+        with multiprocessing.get_context('spawn').Pool(workers) as pool:
+            user_ids = self.create_users(pool, options['users'])
+            if not user_ids:
+                user_ids = list(User.objects.values_list('id', flat=True))
+            event_ids = self.create_events(pool, options['events'], category_ids, user_ids, options['rsvps_per_event'])
+            self.create_participants(pool, options['participants'], event_ids)
+
+        if not options['skip_search_index'] and options['events']:
+            call_command('rebuild_search_index', chunk_size=self.chunk_size, stdout=self.stdout)
+        # Rows went in with bulk_create / raw INSERTs, past the rollup signals.
+        call_command('rebuild_stats', stdout=self.stdout)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Fake data generated successfully! {self.rows_written} rows in {elapsed:.1f}s "
+            f"({self.rows_written / elapsed if elapsed else 0:.0f} rows/sec)"
+        ))
 
-        category_objs = list(Category.objects.all())
-
-        # Create events
-        for _ in range(20):
-            event = Event.objects.create(
-                name=fake.catch_phrase(),
-                description=fake.text(max_nb_chars=100),
-                date=fake.date_between(start_date='-30d', end_date='+60d'),
-                time=fake.time(),
-                location=fake.city(),
-                category=random.choice(category_objs),
-            )
-
-            # Add participants
-            for _ in range(random.randint(5, 15)):
-                name = fake.name()
-                email = fake.unique.email()
-
-                participant, created = Participant.objects.get_or_create(
-                    email=email,
-                    defaults={"name": name}
+    # - - - - - - - - - - #
+    #       Helpers       #
+    # - - - - - - - - - - #
+    def chunks(self, total, *extra):
+        for chunk_index, start in enumerate(range(0, total, self.chunk_size)):
+            yield (self.seed, chunk_index, start, min(self.chunk_size, total - start), *extra)
+
+    def report(self, label, done, total, started):
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"  {label}: {done}/{total} ({done / elapsed if elapsed else 0:.0f} rows/sec)")
+
+    def bulk_insert(self, model, objs):
+        # Returns the new primary keys. Backends that can't return them from a
+        # bulk INSERT get them back by scanning above the previous max id.
+        if not objs:
+            return []
+        last_id = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        created = model.objects.bulk_create(objs, batch_size=self.chunk_size)
+        self.rows_written += len(objs)
+        if all(obj.pk is not None for obj in created):
+            return [obj.pk for obj in created]
+        return list(model.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True))
+
+    def insert_links(self, through, columns, rows):
+        # Through-table rows skip model instances entirely: one multi-row
+        # INSERT per batch, sized to the backend's bind-parameter limit.
+        if not rows:
+            return
+        fields = [through._meta.get_field(column) for column in columns]
+        rows = [[field.get_db_prep_save(value, connection) for field, value in zip(fields, row)] for row in rows]
+        batch_size = min(self.chunk_size, connection.ops.bulk_batch_size(fields, rows) or self.chunk_size)
+        table = connection.ops.quote_name(through._meta.db_table)
+        column_sql = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        placeholder = '(' + ', '.join(['%s'] * len(fields)) + ')'
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                cursor.execute(
+                    f"INSERT INTO {table} ({column_sql}) VALUES {', '.join([placeholder] * len(batch))}",
+                    [value for row in batch for value in row],
+                )
+        self.rows_written += len(rows)
+
+    # - - - - - - - - - - #
+    #        Users        #
+    # - - - - - - - - - - #
+    def create_users(self, pool, total):
+        if not total:
+            return []
+        start_index = User.objects.count()
+        started = time.monotonic()
+        user_ids = []
+        for rows in pool.imap(fake_data.user_rows, self.chunks(total)):
+            objs = [
+                # "!" is an unusable password hash; hashing a real one per row
+                # would dominate the run time.
+                User(username=f"{username}_{start_index}", email=email, first_name=first, last_name=last, password='!')
+                for username, email, first, last in rows
+            ]
+            with transaction.atomic():
+                user_ids += self.bulk_insert(User, objs)
+            self.report("users", len(user_ids), total, started)
+        return user_ids
+
+    # - - - - - - - - - - #
+    #    Events + RSVPs   #
+    # - - - - - - - - - - #
+    def create_events(self, pool, total, category_ids, user_ids, rsvps_per_event):
+        rsvps_per_event = min(rsvps_per_event, len(user_ids))
+        columns = ['event', 'user', 'status', 'created_at', 'event_date']
+        now = timezone.now()
+        started = time.monotonic()
+        event_ids = []
+
+        for rows in pool.imap(fake_data.event_rows, self.chunks(total, category_ids)):
+            objs = [
+                Event(
+                    name=name, description=description, date=date, time=time_, location=location,
+                    latitude=latitude, longitude=longitude, category_id=category_id, rsvp_count=rsvps_per_event,
+                    # bulk_create skips Event.save(), which normally sets these.
+                    starts_at=Event.combine_starts_at(date, time_), geo_cell=geo_cell(latitude, longitude),
                 )
-                participant.events.add(event)
+                for name, description, date, time_, location, latitude, longitude, category_id in rows
+            ]
+            with transaction.atomic():
+                chunk_ids = self.bulk_insert(Event, objs)
+                if rsvps_per_event:
+                    # Straight into the through table: no m2m_changed, and
+                    # rsvp_count was already set on the rows above.
+                    links = [
+                        (event_id, user_id, Attendance.CONFIRMED, now, event.date)
+                        for event_id, event in zip(chunk_ids, objs)
+                        for user_id in self.rng.sample(user_ids, rsvps_per_event)
+                    ]
+                    self.insert_links(Attendance, columns, links)
+            event_ids += chunk_ids
+            self.report("events", len(event_ids), total, started)
+        return event_ids
+
+    # - - - - - - - - - - #
+    #     Participants    #
+    # - - - - - - - - - - #
+    def create_participants(self, pool, total, event_ids):
+        if not total:
+            return
+        if not event_ids:
+            event_ids = list(Event.objects.values_list('id', flat=True))
+        start_index = Participant.objects.count()
+        now = timezone.now()
+        started = time.monotonic()
+        done = 0
 
-        self.stdout.write(self.style.SUCCESS('✅ Fake data generated successfully!'))
+        for rows in pool.imap(fake_data.participant_rows, self.chunks(total)):
+            objs = [
+                Participant(name=name, email=email.replace('@', f'.{start_index}@', 1))
+                for name, email in rows
+            ]
+            with transaction.atomic():
+                participant_ids = self.bulk_insert(Participant, objs)
+                if event_ids:
+                    links = [
+                        (participant_id, event_id, Attendance.CONFIRMED, now)
+                        for participant_id in participant_ids
+                        for event_id in self.rng.sample(event_ids, min(len(event_ids), self.rng.randint(1, 3)))
+                    ]
+                    self.insert_links(Attendance, ['participant', 'event', 'status', 'created_at'], links)
+                    fill_event_dates(Attendance.objects.filter(participant_id__in=participant_ids))
+            done += len(objs)
+            self.report("participants", done, total, started)
@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from events.images import generate_derivatives
+from events.models import Event
+
+User = get_user_model()
+
+class Command(BaseCommand):
+    help = "Backfill resized WebP/JPEG derivatives for event images and profile pictures"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--overwrite', action='store_true', help="Regenerate derivatives that already exist")
+
+    def handle(self, *args, **options):
+        sources = [
+            (Event, 'image'),
+            (User, 'profile_picture'),
+        ]
+        processed = failed = 0
+        original_bytes = derivative_bytes = 0
+
+        for model, field_name in sources:
+            field = model._meta.get_field(field_name)
+            # Many rows share one file (e.g. the default image): handle each name once.
+            names = (
+                model.objects.exclude(**{field_name: ''}).order_by()
+                .values_list(field_name, flat=True).distinct().iterator()
+            )
+            for name in names:
+                field_file = field.attr_class(None, field, name)
+                try:
+                    derivative_bytes += generate_derivatives(field_file, overwrite=options['overwrite'])
+                    original_bytes += field_file.size
+                    processed += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"  {name}: {exc}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Processed {processed} images ({failed} failed). "
+            f"Originals: {original_bytes / 1024:.0f} KiB, new derivatives: {derivative_bytes / 1024:.0f} KiB."
+        ))
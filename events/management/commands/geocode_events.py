@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from events.geo import geo_cell, locate
+from events.models import Event
+from events.page_cache import bump_page_versions
+
+class Command(BaseCommand):
+    help = "Fill in missing event coordinates from the offline city gazetteer and recompute grid cells"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        checked = located = 0
+        last_id = 0
+
+        # Primary-key ranges, one short transaction each.
+        while True:
+            events = list(
+                Event.objects.filter(pk__gt=last_id).order_by('pk')
+                .only('id', 'location', 'latitude', 'longitude', 'geo_cell')[:chunk_size]
+            )
+            if not events:
+                break
+            changed = []
+            for event in events:
+                if event.latitude is None or event.longitude is None:
+                    place = locate(event.location)
+                    if place is not None:
+                        event.latitude, event.longitude = place.latitude, place.longitude
+                        located += 1
+                cell = geo_cell(event.latitude, event.longitude)
+                if cell != event.geo_cell:
+                    event.geo_cell = cell
+                    changed.append(event)
+            with transaction.atomic():
+                # bulk_update skips Event.save(), so geo_cell is set above.
+                Event.objects.bulk_update(changed, ['latitude', 'longitude', 'geo_cell'])
+
+            checked += len(events)
+            last_id = events[-1].pk
+
+        if located:
+            bump_page_versions('events')
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Checked {checked} events. Located {located} from the gazetteer."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from events.page_cache import page_cache_stats
+
+PAGE_CACHE_NAMESPACES = ['home', 'all_events', 'event_detail', 'calendar_feed']
+
+class Command(BaseCommand):
+    help = "Show hit/miss/bypass counters of the anonymous page cache"
+
+    def handle(self, *args, **kwargs):
+        for namespace, counts in page_cache_stats(PAGE_CACHE_NAMESPACES).items():
+            lookups = counts['hit'] + counts['miss']
+            ratio = counts['hit'] / lookups * 100 if lookups else 0
+            self.stdout.write(
+                f"{namespace:<14} hits={counts['hit']:<8} misses={counts['miss']:<8} "
+                f"bypassed={counts['bypass']:<8} hit ratio={ratio:.1f}%"
+            )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from events.models import Event
+from events.search import get_search_backend
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for events"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        chunk_size = options['chunk_size']
+        events = Event.objects.select_related('category').only(
+            'id', 'name', 'location', 'description', 'category__id', 'category__name',
+        )
+
+        with transaction.atomic():
+            backend.install()
+            backend.clear()
+
+            total = 0
+            chunk = []
+            for event in events.iterator(chunk_size=chunk_size):
+                chunk.append(event)
+                if len(chunk) >= chunk_size:
+                    backend.index_events(chunk)
+                    total += len(chunk)
+                    chunk = []
+            backend.index_events(chunk)
+            total += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Indexed {total} events with {backend.__class__.__name__}."
+        ))
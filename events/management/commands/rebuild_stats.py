@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from events.models import StatRollup
+from events.stats import compute_rollups, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the admin dashboard statistics rollups from the source tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report counters that have drifted")
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            current = {
+                (metric, dimension, period): value
+                for metric, dimension, period, value
+                in StatRollup.objects.exclude(value=0).values_list('metric', 'dimension', 'period', 'value')
+            }
+            expected = {(metric, dimension, period): value for metric, dimension, period, value in compute_rollups()}
+            drifted = sorted(
+                (key for key in current.keys() | expected.keys() if current.get(key, 0) != expected.get(key, 0)),
+                key=str,
+            )
+            for key in drifted:
+                self.stdout.write(f"  {key}: {current.get(key, 0)} -> {expected.get(key, 0)}")
+            self.stdout.write(self.style.SUCCESS(f"✅ {len(drifted)} drifted counters (dry run, nothing written)"))
+            return
+
+        rows = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {rows} statistics rows"))
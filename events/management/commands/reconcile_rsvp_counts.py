@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from events.models import Event
+from events.rsvps import actual_rsvp_count, reconcile_rsvp_counts
+from django.db.models import F
+
+class Command(BaseCommand):
+    help = "Repair drift between Event.rsvp_count and the Event.rsvps table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help="Only report drifted events")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        checked = fixed = 0
+        last_id = 0
+
+        # Walk the table in primary-key ranges so each UPDATE touches a bounded
+        # number of rows and holds its locks only briefly.
+        while True:
+            ids = list(
+                Event.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            chunk = Event.objects.filter(pk__gte=ids[0], pk__lte=ids[-1])
+
+            if options['dry_run']:
+                fixed += chunk.annotate(actual=actual_rsvp_count()).exclude(rsvp_count=F('actual')).count()
+            else:
+                with transaction.atomic():
+                    fixed += reconcile_rsvp_counts(chunk)
+
+            checked += len(ids)
+            last_id = ids[-1]
+
+        verb = "Found" if options['dry_run'] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Checked {checked} events. {verb} {fixed} drifted RSVP counts."
+        ))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from events.outbox import DeliveryStats, drain_outbox
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the outbox in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help="Stop after this many batches (default: until drained)")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep polling for new messages instead of exiting once drained")
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds to sleep between polls with --loop")
+
+    def handle(self, *args, **options):
+        stats = DeliveryStats()
+        while True:
+            drain_outbox(options['batch_size'], options['max_batches'], stats)
+            self.stdout.write(str(stats))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Outbox run finished: {stats}"))
@@ -0,0 +1,149 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.utils import timezone
+from events.booking import BOOKED, book_seat
+from events.models import Attendance, Category, Event
+
+from .bench import percentile
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ("Fire concurrent RSVPs at one capacity-limited event in this database, check that it is never "
+            "oversold or double-booked and report throughput; the event and users are deleted afterwards")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--capacity', type=int, default=500)
+        parser.add_argument('--attempts', type=int, default=2, help="RSVPs per user (repeats test idempotency)")
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--keep', action='store_true', help="Leave the event and users in the database")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        event, user_ids = self.setup(options['users'], options['capacity'])
+        try:
+            attempts = [user_id for user_id in user_ids for _ in range(options['attempts'])]
+            rng.shuffle(attempts)
+            outcomes, latencies, errors, elapsed = self.fire(event.pk, attempts, options['threads'])
+            problems = self.verify(event, len(user_ids), options['capacity'], outcomes)
+        finally:
+            if not options['keep']:
+                self.cleanup(event, user_ids)
+
+        report = {
+            'users': len(user_ids),
+            'capacity': options['capacity'],
+            'attempts': len(attempts),
+            'threads': options['threads'],
+            'outcomes': dict(outcomes),
+            'errors': dict(Counter(type(error).__name__ for error in errors)),
+            'rsvps_per_second': round(len(attempts) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+        }
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+
+        if errors:
+            problems.append(f"{len(errors)} bookings raised, first: {errors[0]!r}")
+        if problems:
+            raise CommandError("Invariants violated:\n  " + "\n  ".join(problems))
+        self.stderr.write(self.style.SUCCESS("✅ No overselling, no double bookings"))
+
+    # - - - - - - - - - - #
+    #       Dataset       #
+    # - - - - - - - - - - #
+    def setup(self, users, capacity):
+        category = Category.objects.order_by('pk').first()
+        if category is None:
+            raise CommandError("No categories in this database; run generate_fake_data first")
+        stamp = int(time.time())
+        event = Event.objects.create(
+            name=f'RSVP stress {stamp}', date=timezone.localdate() + timedelta(days=30), time='20:00',
+            location='Stress test', category=category, capacity=capacity,
+        )
+        # One save() per user so the signals (default group, stats) see them.
+        user_ids = []
+        for n in range(users):
+            user = User(username=f'rsvp_stress_{stamp}_{n}', email=f'rsvp_stress_{stamp}_{n}@example.com')
+            user.set_unusable_password()
+            user.save()
+            user_ids.append(user.pk)
+        return event, user_ids
+
+    def cleanup(self, event, user_ids):
+        event.delete()
+        for start in range(0, len(user_ids), 500):
+            User.objects.filter(pk__in=user_ids[start:start + 500]).delete()
+
+    # - - - - - - - - - - #
+    #        Load         #
+    # - - - - - - - - - - #
+    def fire(self, event_id, attempts, threads):
+        lock = threading.Lock()
+        queue = iter(attempts)
+        outcomes, latencies, errors = Counter(), [], []
+        start = threading.Barrier(threads + 1)
+
+        def worker():
+            start.wait()
+            try:
+                while True:
+                    with lock:
+                        user_id = next(queue, None)
+                    if user_id is None:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        outcome = book_seat(event_id, user_id)
+                    except Exception as error:
+                        outcome = 'error'
+                        with lock:
+                            errors.append(error)
+                    with lock:
+                        outcomes[outcome] += 1
+                        latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                # Every thread opened its own connections.
+                connections.close_all()
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in pool:
+            thread.join()
+        return outcomes, latencies, errors, time.perf_counter() - started
+
+    def verify(self, event, users, capacity, outcomes):
+        event.refresh_from_db()
+        rows = Attendance.objects.rsvps().filter(event_id=event.pk)
+        booked_rows = rows.count()
+        doubles = rows.values('user_id').annotate(n=Count('pk')).filter(n__gt=1).count()
+        expected = min(users, capacity)
+
+        problems = []
+        if booked_rows > capacity:
+            problems.append(f"oversold: {booked_rows} RSVPs for {capacity} seats")
+        if booked_rows != expected:
+            problems.append(f"{booked_rows} RSVPs, expected {expected}")
+        if event.rsvp_count != booked_rows:
+            problems.append(f"rsvp_count {event.rsvp_count} != {booked_rows} RSVP rows")
+        if outcomes[BOOKED] != booked_rows:
+            problems.append(f"{outcomes[BOOKED]} bookings reported, {booked_rows} RSVP rows")
+        if doubles:
+            problems.append(f"{doubles} users booked twice")
+        return problems
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from events.throttling import throttle_stats
+
+class Command(BaseCommand):
+    help = "Show how many requests the rate limits (429) and load shedding (503) have rejected"
+
+    def handle(self, *args, **kwargs):
+        for name, rejected in throttle_stats().items():
+            label = "shed (503)" if name == 'shed' else f"{name} (429)"
+            self.stdout.write(f"{label:<28} rejected={rejected}")
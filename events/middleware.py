@@ -0,0 +1,403 @@
+import contextvars
+import hashlib
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from inspect import iscoroutinefunction
+from urllib.parse import urlparse
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+from .storage import is_fingerprinted
+from .throttling import (
+    MAX_CONCURRENT_REQUESTS, RATE_LIMITED_METHODS, RATE_LIMITS,
+    InFlight, check_rate_limits, client_ip, record_rejection,
+)
+
+logger = logging.getLogger('events.profiling')
+
+PROFILING_DEFAULTS = {
+    'SAMPLE_RATE': 0.0,          # fraction of requests instrumented
+    'SLOW_REQUEST_MS': 500,      # log at WARNING above this
+    'SLOW_QUERY_MS': 100,        # statements listed as slow above this
+    'TOP_QUERIES': 3,            # slowest statements included in the log line
+    'DUPLICATE_THRESHOLD': 3,    # same SQL this many times = N+1 suspect
+    'SERVER_TIMING': True,       # emit the Server-Timing response header
+}
+
+_current_profile = contextvars.ContextVar('request_profile', default=None)
+
+
+def profiling_setting(name):
+    return getattr(settings, 'REQUEST_PROFILING', {}).get(name, PROFILING_DEFAULTS[name])
+
+
+def current_profile():
+    """The RequestProfile of the request being sampled on this thread/task, if any."""
+    return _current_profile.get()
+
+
+# ----------------------------------------
+# Per-request measurements
+# ----------------------------------------
+class RequestProfile:
+    def __init__(self):
+        self.queries = []        # (sql, duration in seconds)
+        self.template_time = 0.0
+        self.template_sql_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook: wraps every statement on the connection.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries.append((sql, duration))
+            if self.template_depth:
+                self.template_sql_time += duration
+
+    @contextmanager
+    def rendering(self):
+        # A template rendered from inside another one (render_to_string in a
+        # tag) is already inside the outer timer.
+        self.template_depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.template_depth -= 1
+            if self.template_depth == 0:
+                self.template_time += time.perf_counter() - started
+
+    @property
+    def sql_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    @property
+    def render_time(self):
+        # Lazy querysets evaluated inside templates are already counted as SQL.
+        return max(self.template_time - self.template_sql_time, 0.0)
+
+    def slowest(self, count, min_ms):
+        slow = [(sql, duration) for sql, duration in self.queries if duration * 1000 >= min_ms]
+        return sorted(slow, key=lambda item: item[1], reverse=True)[:count]
+
+    def duplicates(self, threshold):
+        # Parameters are passed separately from the SQL, so identical SQL text
+        # is the same statement shape run again: the N+1 signature.
+        counts = {}
+        for sql, duration in self.queries:
+            count, total = counts.get(sql, (0, 0.0))
+            counts[sql] = (count + 1, total + duration)
+        return sorted(
+            [(sql, count, total) for sql, (count, total) in counts.items() if count >= threshold],
+            key=lambda item: item[1], reverse=True,
+        )
+
+
+def signature(sql):
+    return hashlib.md5(sql.encode()).hexdigest()[:10]
+
+
+# ----------------------------------------
+# Middleware
+# ----------------------------------------
+class RequestProfilingMiddleware:
+    """
+    Record query count, SQL time, slow and duplicated statements and template
+    render time for a sample of requests; report them in a ``Server-Timing``
+    header and one structured log line tagged with the URL name.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def instrument(stack, profile):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if random.random() >= profiling_setting('SAMPLE_RATE'):
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.instrument(stack, profile)
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        return self.finish(request, response, profile, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if random.random() >= profiling_setting('SAMPLE_RATE'):
+            return await self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        stack = ExitStack()
+        try:
+            # Connections are per thread: the async ORM runs every query of
+            # this request in its one sync thread, so wrap them there.
+            await sync_to_async(self.instrument)(stack, profile)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            _current_profile.reset(token)
+        return self.finish(request, response, profile, time.perf_counter() - started)
+
+    def finish(self, request, response, profile, total):
+        if profiling_setting('SERVER_TIMING'):
+            response['Server-Timing'] = self.server_timing(profile, total)
+        self.log(request, response, profile, total)
+        return response
+
+    def server_timing(self, profile, total):
+        sql_ms = profile.sql_time * 1000
+        template_ms = profile.render_time * 1000
+        total_ms = total * 1000
+        view_ms = max(total_ms - sql_ms - template_ms, 0)
+        entries = [
+            f'db;dur={sql_ms:.1f};desc="{len(profile.queries)} queries"',
+            f'tpl;dur={template_ms:.1f};desc="templates"',
+            f'app;dur={view_ms:.1f};desc="view code"',
+            f'total;dur={total_ms:.1f}',
+        ]
+        duplicates = profile.duplicates(profiling_setting('DUPLICATE_THRESHOLD'))
+        if duplicates:
+            entries.append(f'dup;desc="{len(duplicates)} repeated statements"')
+        return ', '.join(entries)
+
+    def log(self, request, response, profile, total):
+        match = getattr(request, 'resolver_match', None)
+        total_ms = total * 1000
+        record = {
+            'url_name': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'db_ms': round(profile.sql_time * 1000, 2),
+            'queries': len(profile.queries),
+            'template_ms': round(profile.render_time * 1000, 2),
+            'slow_queries': [
+                {'ms': round(duration * 1000, 2), 'sql': sql[:300]}
+                for sql, duration in profile.slowest(profiling_setting('TOP_QUERIES'), profiling_setting('SLOW_QUERY_MS'))
+            ],
+            'duplicates': [
+                {'signature': signature(sql), 'count': count, 'ms': round(duration * 1000, 2), 'sql': sql[:300]}
+                for sql, count, duration in profile.duplicates(profiling_setting('DUPLICATE_THRESHOLD'))
+            ],
+        }
+        # Only slow requests are worth a line by default; set the logger to
+        # DEBUG to see every sampled one.
+        level = logging.WARNING if total_ms >= profiling_setting('SLOW_REQUEST_MS') else logging.DEBUG
+        logger.log(level, json.dumps(record), extra={'profile': record})
+
+
+# ----------------------------------------
+# Static and media files
+# ----------------------------------------
+class MediaFiles(WhiteNoise):
+    """
+    MEDIA_ROOT behind WhiteNoise's responder (ETag, Range, precompressed
+    variants). Uploads appear at any time, so files are looked up on disk
+    per request rather than indexed at startup.
+    """
+
+    def __init__(self, root, prefix, max_age):
+        super().__init__(application=None, autorefresh=True, max_age=max_age, allow_all_origins=False)
+        self.add_files(root, prefix=prefix)
+
+    def immutable_file_test(self, path, url):
+        return is_fingerprinted(url)
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise is sync-only, which makes Django run everything below it in a
+    worker thread under ASGI. Finding a static file is a dict lookup, so this
+    subclass answers both modes natively and keeps async views async.
+
+    With SERVE_MEDIA on it also serves MEDIA_URL; fingerprinted uploads
+    (events.storage) are cached as immutable, the rest for MEDIA_MAX_AGE.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        self.media_files = None
+        if getattr(settings, 'SERVE_MEDIA', False) and settings.MEDIA_ROOT:
+            self.media_prefix = ensure_leading_trailing_slash(urlparse(settings.MEDIA_URL).path)
+            self.media_files = MediaFiles(
+                settings.MEDIA_ROOT, self.media_prefix, getattr(settings, 'MEDIA_MAX_AGE', 60 * 60),
+            )
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def is_media(self, path_info):
+        return self.media_files is not None and path_info.startswith(self.media_prefix)
+
+    def find_any_file(self, path_info):
+        if self.is_media(path_info):
+            return self.media_files.find_file(path_info)
+        if self.autorefresh:
+            return self.find_file(path_info)
+        return self.files.get(path_info)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        static_file = self.find_any_file(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh or self.is_media(request.path_info):
+            # Scans the disk: media always, static files in DEBUG.
+            static_file = await sync_to_async(self.find_any_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+# ----------------------------------------
+# Load shedding and rate limiting
+# ----------------------------------------
+def _retry_later(status, message, retry_after):
+    response = HttpResponse(message, status=status, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+class AdmissionControlMiddleware:
+    """
+    Answer 503 once this process already has MAX_CONCURRENT_REQUESTS in
+    flight. Goes right below the static files middleware so shed requests
+    cost neither a session nor a database lookup.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.in_flight = InFlight(MAX_CONCURRENT_REQUESTS)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def shed(self):
+        return _retry_later(503, "The server is busy. Please try again shortly.", 1)
+
+    def release_after(self, response):
+        # A streaming body is produced after the view returns; keep the slot
+        # until the server has sent it and closes the response.
+        if response.streaming:
+            response._resource_closers.append(self.in_flight.leave)
+        else:
+            self.in_flight.leave()
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.in_flight.enter():
+            record_rejection('shed')
+            return self.shed()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            self.in_flight.leave()
+            raise
+        return self.release_after(response)
+
+    async def __acall__(self, request):
+        if not self.in_flight.enter():
+            await sync_to_async(record_rejection)('shed')
+            return self.shed()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            self.in_flight.leave()
+            raise
+        return self.release_after(response)
+
+
+class RateLimitMiddleware:
+    """
+    Apply settings.RATE_LIMITS to the named URLs (POSTs by default) and
+    answer 429 with Retry-After when a bucket is empty. Needs request.user,
+    so it goes below AuthenticationMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def limited_url_name(request):
+        if request.method not in RATE_LIMITED_METHODS:
+            return None
+        try:
+            url_name = resolve(request.path_info).url_name
+        except Resolver404:
+            return None
+        return url_name if url_name in RATE_LIMITS else None
+
+    @staticmethod
+    def too_many(retry_after):
+        return _retry_later(429, f"Too many requests. Please try again in {retry_after} seconds.", retry_after)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        url_name = self.limited_url_name(request)
+        if url_name:
+            user_id = request.user.pk if request.user.is_authenticated else None
+            retry_after = check_rate_limits(url_name, client_ip(request), user_id)
+            if retry_after:
+                return self.too_many(retry_after)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        url_name = self.limited_url_name(request)
+        if url_name:
+            user = await request.auser()
+            user_id = user.pk if user.is_authenticated else None
+            retry_after = await sync_to_async(check_rate_limits)(url_name, client_ip(request), user_id)
+            if retry_after:
+                return self.too_many(retry_after)
+        return await self.get_response(request)
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from events.search import get_search_backend
+
+    backend = get_search_backend(schema_editor.connection)
+    backend.install()
+
+    Event = apps.get_model('events', 'Event')
+    events = Event.objects.using(schema_editor.connection.alias).select_related('category')
+    chunk = []
+    for event in events.iterator(chunk_size=2000):
+        chunk.append(event)
+        if len(chunk) >= 2000:
+            backend.index_events(chunk)
+            chunk = []
+    backend.index_events(chunk)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from events.search import get_search_backend
+
+    get_search_backend(schema_editor.connection).uninstall()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_event_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:28
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_rsvp_count(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Through = Event.rsvps.through
+    counts = (
+        Through.objects.filter(event_id=OuterRef('pk'))
+        .values('event_id').annotate(n=Count('pk')).values('n')
+    )
+    Event.objects.using(schema_editor.connection.alias).update(
+        rsvp_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_event_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='rsvp_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rsvp_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:05
+
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 2000
+
+
+def backfill_starts_at(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    events = Event.objects.using(schema_editor.connection.alias)
+    tz = timezone.get_default_timezone()
+    last_id = 0
+    while True:
+        batch = list(events.filter(pk__gt=last_id).order_by('pk').only('id', 'date', 'time')[:BATCH_SIZE])
+        if not batch:
+            break
+        for event in batch:
+            event.starts_at = timezone.make_aware(datetime.combine(event.date, event.time), tz)
+        events.bulk_update(batch, ['starts_at'])
+        last_id = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_starts_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', '-date', '-id'], name='event_category_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['created_by', '-date', '-id'], name='event_creator_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['starts_at', 'id'], name='event_starts_at_idx'),
+        ),
+        # The auto-created RSVP through table only has the (event, user) unique
+        # index; "events this user attended" needs the reverse direction.
+        migrations.RunSQL(
+            'CREATE INDEX event_rsvps_user_event_idx ON events_event_rsvps (customuser_id, event_id)',
+            'DROP INDEX event_rsvps_user_event_idx',
+        ),
+    ]
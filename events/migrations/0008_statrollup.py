@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:45
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def populate_rollups(apps, schema_editor):
+    # Same counters as events.stats.compute_rollups(), on historical models.
+    alias = schema_editor.connection.alias
+    Event = apps.get_model('events', 'Event')
+    StatRollup = apps.get_model('events', 'StatRollup')
+    User = apps.get_model('users', 'CustomUser')
+
+    rows = []
+    for row in (Event.objects.using(alias).annotate(month=TruncMonth('date'))
+                .values('category_id', 'month').annotate(n=Count('id')).order_by()):
+        rows.append(StatRollup(metric='events', dimension=str(row['category_id']), period=row['month'], value=row['n']))
+    for row in Event.rsvps.through.objects.using(alias).values('event__date').annotate(n=Count('pk')).order_by():
+        rows.append(StatRollup(metric='rsvps', dimension='', period=row['event__date'], value=row['n']))
+    for row in User.objects.using(alias).values('is_active').annotate(n=Count('id')).order_by():
+        rows.append(StatRollup(metric='users', dimension='active' if row['is_active'] else 'inactive', value=row['n']))
+    for row in User.groups.through.objects.using(alias).values('group__name').annotate(n=Count('pk')).order_by():
+        rows.append(StatRollup(metric='group_members', dimension=row['group__name'], value=row['n']))
+    StatRollup.objects.using(alias).bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_updated_at'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=30)),
+                ('dimension', models.CharField(blank=True, default='', max_length=150)),
+                ('period', models.DateField(blank=True, null=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('metric', 'dimension', 'period'), name='stat_rollup_unique'), models.UniqueConstraint(condition=models.Q(('period__isnull', True)), fields=('metric', 'dimension'), name='stat_rollup_unique_total')],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 20000
+
+
+def copy_links(apps, schema_editor, through, column, target):
+    """
+    Copy an old link table into Attendance, ``column`` of each row becoming
+    ``target``: one INSERT ... SELECT per primary-key range, each in its own
+    transaction so neither table stays locked for the whole run. Pairs
+    already copied are skipped, so an interrupted run can simply be repeated.
+    """
+    Attendance = apps.get_model('events', 'Attendance')
+    Event = apps.get_model('events', 'Event')
+    connection = schema_editor.connection
+    quote = schema_editor.quote_name
+
+    def col(model, name):
+        return quote(model._meta.get_field(name).column)
+
+    attendance, link, event = (quote(model._meta.db_table) for model in (Attendance, through, Event))
+    sql = f"""
+        INSERT INTO {attendance} ({col(Attendance, 'event')}, {col(Attendance, target)},
+                                  {col(Attendance, 'status')}, {col(Attendance, 'created_at')}, {col(Attendance, 'event_date')})
+        SELECT l.{col(through, 'event')}, l.{col(through, column)}, %s, %s, e.{col(Event, 'date')}
+        FROM {link} l JOIN {event} e ON e.{col(Event, 'id')} = l.{col(through, 'event')}
+        WHERE l.{col(through, 'id')} > %s AND l.{col(through, 'id')} <= %s
+          AND NOT EXISTS (
+              SELECT 1 FROM {attendance} a
+              WHERE a.{col(Attendance, 'event')} = l.{col(through, 'event')}
+                AND a.{col(Attendance, target)} = l.{col(through, column)}
+          )
+    """
+    merged_at = Attendance._meta.get_field('created_at').get_db_prep_save(timezone.now(), connection)
+    ids = through.objects.using(connection.alias).order_by('pk').values_list('pk', flat=True)
+    last_id = ids.last() or 0
+    start = (ids.first() or 1) - 1
+    while start < last_id:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(sql, ['CONFIRMED', merged_at, start, start + BATCH_SIZE])
+        start += BATCH_SIZE
+
+
+def merge_attendance(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Participant = apps.get_model('events', 'Participant')
+    rsvps = Event._meta.get_field('rsvps')
+    participant_events = Participant._meta.get_field('events')
+    # Old link tables name their columns after the models (customuser_id, ...).
+    copy_links(apps, schema_editor, rsvps.remote_field.through, rsvps.m2m_reverse_field_name(), 'user')
+    copy_links(apps, schema_editor, participant_events.remote_field.through, participant_events.m2m_field_name(), 'participant')
+
+
+def clear_attendance(apps, schema_editor):
+    Attendance = apps.get_model('events', 'Attendance')
+    Attendance.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own (see copy_links).
+    atomic = False
+
+    dependencies = [
+        ('events', '0011_attendance'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_attendance, clear_attendance),
+    ]
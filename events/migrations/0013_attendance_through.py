@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 5000
+
+
+def old_link_tables(apps):
+    Event = apps.get_model('events', 'Event')
+    Participant = apps.get_model('events', 'Participant')
+    return [
+        (Event._meta.get_field('rsvps'), 'user'),
+        (Participant._meta.get_field('events'), 'participant'),
+    ]
+
+
+def drop_old_link_tables(apps, schema_editor):
+    # Their rows are in Attendance now (0012).
+    for field, _ in old_link_tables(apps):
+        schema_editor.delete_model(field.remote_field.through)
+
+
+def restore_old_link_tables(apps, schema_editor):
+    Attendance = apps.get_model('events', 'Attendance')
+    alias = schema_editor.connection.alias
+    for field, source in old_link_tables(apps):
+        through = field.remote_field.through
+        schema_editor.create_model(through)
+        own, other = field.m2m_field_name(), field.m2m_reverse_field_name()
+        if source == 'user':
+            # The reverse-direction index 0006 added by hand.
+            schema_editor.execute('CREATE INDEX event_rsvps_user_event_idx ON %s (%s, %s)' % (
+                schema_editor.quote_name(through._meta.db_table),
+                schema_editor.quote_name(through._meta.get_field(other).column),
+                schema_editor.quote_name(through._meta.get_field(own).column),
+            ))
+        rows = Attendance.objects.using(alias).filter(**{f'{source}__isnull': False}).order_by('pk')
+        last_id = 0
+        while True:
+            batch = list(rows.filter(pk__gt=last_id).values_list('pk', 'event_id', f'{source}_id')[:BATCH_SIZE])
+            if not batch:
+                break
+            links = []
+            for _, event_id, pk in batch:
+                # Event.rsvps links event -> user, Participant.events participant -> event.
+                ends = {own: event_id, other: pk} if source == 'user' else {own: pk, other: event_id}
+                links.append(through(**{f'{name}_id': value for name, value in ends.items()}))
+            through.objects.using(alias).bulk_create(links)
+            last_id = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_merge_attendance'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_old_link_tables, restore_old_link_tables),
+        # Django can't add through= to an existing ManyToManyField, and the
+        # tables are already taken care of above: only the state changes.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveField(
+                    model_name='participant',
+                    name='events',
+                ),
+                migrations.AlterField(
+                    model_name='event',
+                    name='rsvps',
+                    field=models.ManyToManyField(blank=True, related_name='rsvp_events', through='events.Attendance', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+
+
+def rebucket_rsvps(apps, schema_editor, day):
+    # Same counters as events.stats.compute_rollups(), on historical models.
+    alias = schema_editor.connection.alias
+    Attendance = apps.get_model('events', 'Attendance')
+    StatRollup = apps.get_model('events', 'StatRollup')
+    StatRollup.objects.using(alias).filter(metric='rsvps').delete()
+    rows = Attendance.objects.using(alias).annotate(day=day).values('day').annotate(n=Count('pk')).order_by()
+    StatRollup.objects.using(alias).bulk_create([
+        StatRollup(metric='rsvps', dimension='', period=row['day'], value=row['n']) for row in rows
+    ])
+
+
+def by_day_made(apps, schema_editor):
+    rebucket_rsvps(apps, schema_editor, TruncDate('created_at'))
+
+
+def by_event_day(apps, schema_editor):
+    rebucket_rsvps(apps, schema_editor, F('event__date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_attendance_through'),
+    ]
+
+    operations = [
+        migrations.RunPython(by_day_made, by_event_day),
+    ]
@@ -1,5 +1,13 @@
-from django.db import models
+import math
+from datetime import datetime
+
+from django.db import DatabaseError, models, router, transaction
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db.models.functions import Sqrt
+from django.utils import timezone
+
+from .geo import KM_PER_DEGREE, bounding_box, cover_ranges, geo_cell
 
 # - - - - - - - - - - #
 #    Category Model   #
@@ -13,6 +21,9 @@ class Category(models.Model):
     ]
     name = models.CharField(max_length=15, choices=CATEGORY_CHOICES, default="CASUAL")
     description = models.TextField(blank=True, null=True)
+    # Also bumped when one of its events is deleted (events.signals), so the
+    # newest updated_at across events and categories dates the events list.
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -24,27 +35,183 @@ class Category(models.Model):
 # - - - - - - - - #
 #   Event Model   #
 # - - - - - - - - #
+class EventQuerySet(models.QuerySet):
+    # The dashboard, attended-events page and explain_hot_queries share these,
+    # so the queries they EXPLAIN are the ones the views actually run.
+    def upcoming(self, now=None):
+        return self.filter(starts_at__gte=now or timezone.now()).order_by('starts_at', 'id')
+
+    def organized_by(self, user):
+        return self.filter(created_by=user).order_by('-date', '-id')
+
+    def attended_by(self, user):
+        # Sorted on the Attendance copy of the date so attendance_user_date_idx
+        # both finds the user's rows and hands them over in order.
+        return self.filter(attendances__user=user).order_by('-attendances__event_date', '-attendances__event')
+
+    def near(self, latitude, longitude, radius_km, cells=True):
+        """
+        Events within ``radius_km`` of the point, annotated with
+        ``distance_km``. The grid-cell ranges covering the search box pick
+        the candidates off event_geo_cell_idx; only those are measured.
+        ``cells=False`` measures every located event instead (the brute-force
+        baseline of `python manage.py bench_nearby`).
+        """
+        if cells:
+            south, north, west, east = bounding_box(latitude, longitude, radius_km)
+            candidates = models.Q()
+            for low, high in cover_ranges(south, north, west, east):
+                candidates |= models.Q(geo_cell__range=(low, high))
+            candidates &= models.Q(latitude__range=(south, north), longitude__range=(west, east))
+        else:
+            candidates = models.Q(latitude__isnull=False)
+        # Flat-earth distance (latitude-corrected degrees): plain arithmetic
+        # every backend can run. Up to 60° latitude it is within 1% of the
+        # great circle at 100 km and 3% at the 500 km maximum.
+        north_km = (models.F('latitude') - latitude) * KM_PER_DEGREE
+        east_km = (models.F('longitude') - longitude) * (KM_PER_DEGREE * math.cos(math.radians(latitude)))
+        squared = models.ExpressionWrapper(north_km * north_km + east_km * east_km, output_field=models.FloatField())
+        return (
+            self.filter(candidates)
+            .alias(distance_squared=squared)
+            .filter(distance_squared__lte=radius_km * radius_km)
+            .annotate(distance_km=Sqrt('distance_squared', output_field=models.FloatField()))
+        )
+
+
 class Event(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
     date = models.DateField()
     time = models.TimeField()
     location = models.CharField(max_length=150)
+    # Optional; EventModelForm fills them from the gazetteer (events.geo)
+    # when the location names a known city.
+    latitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)],
+        help_text="Leave empty to look the location up in the built-in city list.",
+    )
+    longitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    # events.geo.geo_cell(latitude, longitude), kept in sync by save().
+    geo_cell = models.BigIntegerField(null=True, blank=True, editable=False)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, default=1, related_name='events')
+    # date + time as one timezone-aware value, kept in sync by save(), so
+    # "upcoming" is a single range scan instead of a (date, time) OR.
+    starts_at = models.DateTimeField(editable=False)
 
+    # The user rows of Attendance. Its participant rows share the table, so
+    # use remove() rather than clear(): Django clears by event alone.
     rsvps = models.ManyToManyField(
-        settings.AUTH_USER_MODEL, related_name='rsvp_events', blank=True
+        settings.AUTH_USER_MODEL, through='Attendance', related_name='rsvp_events', blank=True
     )
+    # Denormalized len(rsvps), maintained by events.signals and repaired by
+    # `python manage.py reconcile_rsvp_counts`.
+    rsvp_count = models.PositiveIntegerField(default=0, editable=False)
+    # Seats on offer; empty means unlimited. Bookings go through
+    # events.booking.book_seat(), which never lets rsvp_count pass it.
+    capacity = models.PositiveIntegerField(null=True, blank=True, help_text="Leave empty for unlimited seats.")
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
         null=True, blank=True, related_name='created_events'
     )
 
     image = models.ImageField(upload_to='event_images/', default='event_images/default.jpg')
+    # Bumped on every save and RSVP change; drives ETag / Last-Modified.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination walks events newest first on (date, id).
+            models.Index(fields=['-date', '-id'], name='event_date_id_idx'),
+            # All events filtered by category, then newest first.
+            models.Index(fields=['category', '-date', '-id'], name='event_category_date_idx'),
+            # Organizer dashboard: their own events, newest first.
+            models.Index(fields=['created_by', '-date', '-id'], name='event_creator_date_idx'),
+            models.Index(fields=['starts_at', 'id'], name='event_starts_at_idx'),
+            # MAX(updated_at) for the list's Last-Modified is one index probe.
+            models.Index(fields=['updated_at'], name='event_updated_at_idx'),
+            # Proximity search: range scans over grid cells, with the
+            # coordinates in the index so the box check reads no table rows.
+            models.Index(fields=['geo_cell', 'latitude', 'longitude'], name='event_geo_cell_idx'),
+        ]
+        constraints = [
+            # The last line of defence against overselling, whatever path
+            # the RSVP rows come in by.
+            models.CheckConstraint(
+                condition=models.Q(capacity__isnull=True) | models.Q(rsvp_count__lte=models.F('capacity')),
+                name='event_rsvps_within_capacity',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def seats_left(self):
+        if self.capacity is None:
+            return None
+        return max(self.capacity - self.rsvp_count, 0)
+
+    @staticmethod
+    def combine_starts_at(date, time):
+        return timezone.make_aware(datetime.combine(date, time), timezone.get_default_timezone())
+
+    def save(self, *args, **kwargs):
+        deferred = self.get_deferred_fields()
+        # Derived fields are left alone when their sources weren't loaded,
+        # rather than fetching each one with a query of its own.
+        if not {'date', 'time'} & deferred:
+            # Forms hand over date/time objects, but Event.objects.create() may get strings.
+            date = self._meta.get_field('date').to_python(self.date)
+            time = self._meta.get_field('time').to_python(self.time)
+            self.starts_at = self.combine_starts_at(date, time)
+        if not {'latitude', 'longitude'} & deferred:
+            self.geo_cell = geo_cell(self.latitude, self.longitude)
+
+        update_fields = kwargs.get('update_fields')
+        rewrite = update_fields is None and not self._state.adding and not kwargs.get('force_insert')
+        if rewrite:
+            # What Model.save() would write, minus rsvp_count: that is only
+            # ever moved by F() updates, and the value loaded with this
+            # instance may be stale. Deferred fields aren't loaded, so stay.
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred and field.name != 'rsvp_count'
+            ]
+        if update_fields is not None:
+            # auto_now only reaches the database if it's among update_fields.
+            extra = {'updated_at'}
+            if {'date', 'time'} & set(update_fields):
+                extra.add('starts_at')
+            if {'latitude', 'longitude'} & set(update_fields):
+                extra.add('geo_cell')
+            kwargs['update_fields'] = {*update_fields, *extra}
+        if not rewrite:
+            super().save(*args, **kwargs)
+            return
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        try:
+            # A savepoint, so that a failed save leaves the caller's
+            # transaction usable.
+            with transaction.atomic(using=using):
+                super().save(*args, **kwargs)
+        except DatabaseError as error:
+            # Django reports an update that matched no row with a bare
+            # DatabaseError; the driver's errors are subclasses.
+            if type(error) is not DatabaseError or deferred:
+                raise
+            if type(self)._base_manager.using(using).filter(pk=self.pk).exists():
+                raise
+            # A loaded row deleted underneath us: save it back as a plain
+            # save() would. Its Attendance rows went with it.
+            self.rsvp_count = 0
+            kwargs.pop('update_fields')
+            super().save(*args, force_insert=True, **kwargs)
+
 
 
 
@@ -53,10 +220,157 @@ class Event(models.Model):
 #   Participant Model   #
 # - - - - - - - - - - - #
 class Participant(models.Model):
+    """Someone attending without an account; their events are in ``attendances``."""
     name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
-    events = models.ManyToManyField(Event)
 
     def __str__(self):
         return f"Participant: {self.name}, Email: {self.email}"
 
+
+
+
+
+
+# - - - - - - - - - - - #
+#   Attendance Model    #
+# - - - - - - - - - - - #
+class AttendanceQuerySet(models.QuerySet):
+    def rsvps(self):
+        """The rows Event.rsvps and rsvp_count are made of: users, not participants."""
+        return self.filter(user__isnull=False)
+
+
+class Attendance(models.Model):
+    """
+    One attendee of one event: a user who RSVP'd (the Event.rsvps through
+    row) or a Participant without an account. Every attendance query reads
+    this table.
+    """
+    CONFIRMED = 'CONFIRMED'
+    CHECKED_IN = 'CHECKED_IN'
+    STATUS_CHOICES = [
+        (CONFIRMED, 'Confirmed'),
+        (CHECKED_IN, 'Checked in'),
+    ]
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='attendances')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        null=True, blank=True, related_name='attendances'
+    )
+    participant = models.ForeignKey(
+        Participant, on_delete=models.CASCADE,
+        null=True, blank=True, related_name='attendances'
+    )
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=CONFIRMED)
+    # When the RSVP was made; rows merged from the old tables carry the merge time.
+    created_at = models.DateTimeField(default=timezone.now)
+    # Copy of event.date for attendance_user_date_idx, kept in sync by
+    # events.signals.
+    event_date = models.DateField(null=True, blank=True, editable=False)
+
+    objects = AttendanceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # An event's attendees in RSVP order (exports, attendee lists).
+            models.Index(fields=['event', 'created_at'], name='attendance_event_created_idx'),
+            # A user's events, newest first (attended events page).
+            models.Index(fields=['user', '-event_date', '-event'], name='attendance_user_date_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(user__isnull=False, participant__isnull=True)
+                | models.Q(user__isnull=True, participant__isnull=False),
+                name='attendance_user_or_participant',
+            ),
+            # Also what turns a double booking into an IntegrityError (events.booking).
+            models.UniqueConstraint(
+                fields=['event', 'user'], condition=models.Q(user__isnull=False),
+                name='attendance_unique_user',
+            ),
+            models.UniqueConstraint(
+                fields=['event', 'participant'], condition=models.Q(participant__isnull=False),
+                name='attendance_unique_participant',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user or self.participant} @ {self.event_id} ({self.status})"
+
+
+
+
+
+
+# - - - - - - - - - - - - #
+#   Outbox Email Model    #
+# - - - - - - - - - - - - #
+class OutboxEmail(models.Model):
+    PENDING = 'PENDING'
+    SENT = 'SENT'
+    DEAD = 'DEAD'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (DEAD, 'Dead'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    recipients = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker polls "PENDING and due", oldest first.
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+
+
+
+
+
+# - - - - - - - - - - - - - #
+#   Statistics Rollup Model #
+# - - - - - - - - - - - - - #
+class StatRollup(models.Model):
+    """
+    One pre-aggregated counter, e.g. ("events", "<category id>", 2026-10-01)
+    or ("users", "active", None). Kept up to date by events.signals and
+    rebuilt from scratch by `python manage.py rebuild_stats`.
+    """
+    EVENTS = 'events'                # dimension: category id, period: month
+    RSVPS = 'rsvps'                  # period: day made; every Attendance row
+    USERS = 'users'                  # dimension: active / inactive
+    GROUP_MEMBERS = 'group_members'  # dimension: group name
+
+    metric = models.CharField(max_length=30)
+    dimension = models.CharField(max_length=150, blank=True, default='')
+    period = models.DateField(null=True, blank=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'dimension', 'period'], name='stat_rollup_unique'),
+            # NULLs never collide in a unique index, so period-less counters need their own.
+            models.UniqueConstraint(
+                fields=['metric', 'dimension'], condition=models.Q(period__isnull=True),
+                name='stat_rollup_unique_total',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.metric}[{self.dimension}@{self.period}] = {self.value}"
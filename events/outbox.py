@@ -0,0 +1,191 @@
+import smtplib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+# ----------------------------------------
+# Transactional email outbox
+# ----------------------------------------
+# Request code calls queue_mail(), which only INSERTs a row in the current
+# transaction. `python manage.py send_outbox` drains the table in batches over
+# a single reused mail connection, retrying failures with exponential backoff
+# and dead-lettering messages that keep failing.
+#
+# A batch is claimed in a short transaction that leases its rows (pushes
+# next_attempt_at out by OUTBOX_LEASE_SECONDS), so no lock is held while
+# talking to the mail server; a worker that dies mid-batch leaves messages
+# that simply fall due again.
+
+OUTBOX_BATCH_SIZE = getattr(settings, 'OUTBOX_BATCH_SIZE', 100)
+OUTBOX_MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 6)
+OUTBOX_RETRY_BASE_SECONDS = getattr(settings, 'OUTBOX_RETRY_BASE_SECONDS', 30)
+OUTBOX_RETRY_MAX_SECONDS = getattr(settings, 'OUTBOX_RETRY_MAX_SECONDS', 60 * 60)
+OUTBOX_LEASE_SECONDS = getattr(settings, 'OUTBOX_LEASE_SECONDS', 10 * 60)
+
+# The session failed rather than the message.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    recipients = [address for address in recipient_list if address]
+    if not recipients:
+        return None
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or '',
+        recipients=recipients,
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_SECONDS))
+
+
+class DeliveryStats:
+    def __init__(self):
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+        self.deferred = 0
+        self.batches = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"sent={self.sent} retried={self.retried} dead={self.dead} deferred={self.deferred} "
+            f"batches={self.batches} elapsed={self.elapsed:.2f}s rate={self.rate:.1f} msg/s"
+        )
+
+
+class MailServerUnavailable(Exception):
+    pass
+
+
+class MailSession:
+    """One mail connection, opened on the first send and reopened once after a drop."""
+
+    def __init__(self):
+        self.connection = None
+
+    def _send(self, message):
+        if self.connection is None:
+            self.connection = get_connection()
+            self.connection.open()
+        message.connection = self.connection
+        message.send()
+
+    def send(self, message):
+        try:
+            self._send(message)
+        except CONNECTION_ERRORS:
+            self.close()
+            try:
+                self._send(message)
+            except CONNECTION_ERRORS as exc:
+                self.close()
+                raise MailServerUnavailable(f"{exc.__class__.__name__}: {exc}") from exc
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+
+def claim_batch(batch_size=None):
+    now = timezone.now()
+    with transaction.atomic():
+        # skip_locked lets several workers claim at once without sending a
+        # message twice; backends without row locks ignore it.
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size or OUTBOX_BATCH_SIZE]
+        )
+        if batch:
+            OutboxEmail.objects.filter(pk__in=[outbox_email.pk for outbox_email in batch]).update(
+                next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS),
+            )
+    return batch
+
+
+def deliver_batch(session, stats, batch_size=None):
+    """
+    Send one batch of due messages through ``session``. Returns the number
+    of messages attempted: 0 once the outbox is drained or the mail server
+    can't be reached.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0
+
+    attempted = 0
+    for outbox_email in batch:
+        try:
+            session.send(EmailMessage(
+                subject=outbox_email.subject,
+                body=outbox_email.body,
+                from_email=outbox_email.from_email or None,
+                to=outbox_email.recipients,
+            ))
+        except MailServerUnavailable as exc:
+            # Not the messages' fault: the rest keep their attempts and their
+            # original due time, so the next drain picks them up first.
+            for unsent in batch[attempted:]:
+                unsent.last_error = str(exc)
+            stats.deferred += len(batch) - attempted
+            break
+        except Exception as exc:
+            outbox_email.attempts += 1
+            outbox_email.last_error = f"{exc.__class__.__name__}: {exc}"
+            if outbox_email.attempts >= OUTBOX_MAX_ATTEMPTS:
+                outbox_email.status = OutboxEmail.DEAD
+                stats.dead += 1
+            else:
+                outbox_email.next_attempt_at = timezone.now() + retry_delay(outbox_email.attempts)
+                stats.retried += 1
+        else:
+            outbox_email.attempts += 1
+            outbox_email.status = OutboxEmail.SENT
+            outbox_email.sent_at = timezone.now()
+            outbox_email.last_error = ''
+            stats.sent += 1
+        attempted += 1
+
+    OutboxEmail.objects.bulk_update(
+        batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    stats.batches += 1
+    return attempted if attempted == len(batch) else 0
+
+
+def drain_outbox(batch_size=None, max_batches=None, stats=None):
+    stats = stats or DeliveryStats()
+    # One session for the whole drain instead of one per message, opened
+    # only once there is something to send.
+    session = MailSession()
+    try:
+        while max_batches is None or stats.batches < max_batches:
+            if not deliver_batch(session, stats, batch_size):
+                break
+    finally:
+        session.close()
+    return stats
@@ -0,0 +1,197 @@
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+
+# ----------------------------------------
+# Anonymous full-page cache
+# ----------------------------------------
+# Rendered pages are cached for logged-out visitors only. Every entry is tied
+# to one or more version "scopes" (e.g. "events", "event:42"); the signals in
+# events/signals.py bump a scope's version on writes, which orphans every entry
+# built under the old version.
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 5)
+PAGE_CACHE_STATS_KEY = 'page_cache:stats:{namespace}:{outcome}'
+
+# Headers that must not be replayed to another visitor. Validators are
+# recomputed per request by events.conditional.
+UNCACHEABLE_HEADERS = {'set-cookie', 'etag', 'last-modified'}
+
+
+def _version_key(scope):
+    return f'page_cache:version:{scope}'
+
+
+def bump_page_versions(*scopes):
+    """Orphan the scopes' cached pages once the current transaction commits (at once outside one)."""
+    def bump():
+        for scope in scopes:
+            key = _version_key(scope)
+            # add() seeds the counter so incr() never races a missing key.
+            cache.add(key, 1, timeout=None)
+            cache.incr(key)
+
+    # Bumped before the commit, a reader could still see the old rows and
+    # cache them under the new version.
+    transaction.on_commit(bump)
+
+
+def normalized_query(request):
+    """Sorted, blank-free query string so ?b=&a=1 and ?a=1 share an entry."""
+    items = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        for value in values
+        if value != ''
+    )
+    return urlencode(items)
+
+
+def scope_version(*scopes):
+    """The scopes' current versions as one string, for building cache keys."""
+    versions = cache.get_many([_version_key(scope) for scope in scopes])
+    return '.'.join(str(versions.get(_version_key(scope), 1)) for scope in scopes)
+
+
+def page_cache_key(namespace, scopes, request, vary=None):
+    version = scope_version(*scopes)
+    raw = f'{request.path}?{normalized_query(request)}|{vary}'
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'page_cache:{namespace}:{version}:{digest}'
+
+
+def record_outcome(namespace, outcome):
+    key = PAGE_CACHE_STATS_KEY.format(namespace=namespace, outcome=outcome)
+    cache.add(key, 0, timeout=None)
+    cache.incr(key)
+
+
+def page_cache_stats(namespaces):
+    keys = {
+        (namespace, outcome): PAGE_CACHE_STATS_KEY.format(namespace=namespace, outcome=outcome)
+        for namespace in namespaces
+        for outcome in ('hit', 'miss', 'bypass')
+    }
+    values = cache.get_many(keys.values())
+    return {
+        namespace: {outcome: values.get(keys[namespace, outcome], 0) for outcome in ('hit', 'miss', 'bypass')}
+        for namespace in namespaces
+    }
+
+
+def _is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    # A page carrying a flash message is personal; len() doesn't consume them.
+    if len(get_messages(request)):
+        return False
+    return True
+
+
+def _is_cacheable_response(request, response):
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.has_header('Cache-Control') and 'private' in response['Cache-Control']:
+        return False
+    # The page rendered a CSRF token, which is tied to this visitor's cookie.
+    if request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        return False
+    return True
+
+
+def _store(key, response):
+    headers = [
+        (name, value) for name, value in response.items()
+        if name.lower() not in UNCACHEABLE_HEADERS
+    ]
+    cache.set(key, (response.status_code, headers, response.content), PAGE_CACHE_TIMEOUT)
+
+
+def _replay(entry):
+    status, headers, content = entry
+    response = HttpResponse(content, status=status)
+    for name, value in headers:
+        response[name] = value
+    return response
+
+
+def _lookup(namespace, scopes, vary_on, request, kwargs):
+    """(key, cached entry) for this request, or (None, None) when it must bypass the cache."""
+    if not _is_cacheable_request(request):
+        record_outcome(namespace, 'bypass')
+        return None, None
+    vary = vary_on(request) if vary_on else None
+    key = page_cache_key(namespace, [scope.format(**kwargs) for scope in scopes], request, vary)
+    entry = cache.get(key)
+    record_outcome(namespace, 'miss' if entry is None else 'hit')
+    return key, entry
+
+
+def _hit(entry):
+    response = _replay(entry)
+    response['X-Page-Cache'] = 'HIT'
+    return response
+
+
+def _store_after_render(request, key, response):
+    """Cache ``response`` once rendered; returns the store callable if it must run now."""
+    def store(rendered):
+        if _is_cacheable_response(request, rendered):
+            _store(key, rendered)
+
+    response['X-Page-Cache'] = 'MISS'
+    if hasattr(response, 'render') and callable(response.render) and not response.is_rendered:
+        # TemplateResponses render later, in a sync thread even for async views.
+        response.add_post_render_callback(store)
+        return None
+    return store
+
+
+def cache_anonymous_page(namespace, *scopes, vary_on=None):
+    """
+    Cache the view's response for anonymous visitors. ``scopes`` may use the
+    view's URL kwargs, e.g. ``cache_anonymous_page('event_detail', 'event:{event_id}')``.
+    ``vary_on(request)`` adds to the key whatever else the page depends on
+    that no write bumps a scope for, such as the clock. Works on sync and
+    async views.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                # Session, user and cache lookups in one hop to the sync thread.
+                key, entry = await sync_to_async(_lookup)(namespace, scopes, vary_on, request, kwargs)
+                if entry is not None:
+                    return _hit(entry)
+                response = await view_func(request, *args, **kwargs)
+                if key is not None:
+                    store = _store_after_render(request, key, response)
+                    if store:
+                        await sync_to_async(store)(response)
+                return response
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            key, entry = _lookup(namespace, scopes, vary_on, request, kwargs)
+            if entry is not None:
+                return _hit(entry)
+            response = view_func(request, *args, **kwargs)
+            if key is not None:
+                store = _store_after_render(request, key, response)
+                if store:
+                    store(response)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,178 @@
+import base64
+import json
+
+from django.db.models import Q
+
+
+# ----------------------------------------
+# Keyset (cursor) pagination
+# ----------------------------------------
+# Pages are addressed by the sort key of the last/first row shown instead of an
+# OFFSET, so fetching page 1000 costs the same index range scan as page 1.
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` on ``ordering`` (e.g. ``('-date', '-id')``).
+    The last key must be unique so that every row has a distinct position.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-date', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.keys = [key.lstrip('-') for key in self.ordering]
+        self.fields = [self._field(key) for key in self.keys]
+
+    def _field(self, name):
+        # Ordering keys may be model fields or annotations (e.g. a search rank).
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def _lookup(self, key, field):
+        return key if key in self.queryset.query.annotations else field.attname
+
+    # - - - - - - - - - - #
+    #   Cursor encoding   #
+    # - - - - - - - - - - #
+    def encode_cursor(self, obj, direction):
+        values = []
+        for key, field in zip(self.keys, self.fields):
+            value = getattr(obj, self._lookup(key, field))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        raw = json.dumps([direction] + values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, values = data[0], data[1:]
+            if direction not in ('n', 'p') or len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            values = [field.to_python(value) for field, value in zip(self.fields, values)]
+        except InvalidCursor:
+            raise
+        except Exception:
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    # - - - - - - - - - - #
+    #   Query building    #
+    # - - - - - - - - - - #
+    def _seek(self, values, forward):
+        # Lexicographic "comes after (values)" in the page ordering, expanded
+        # into (k1 > v1) OR (k1 = v1 AND k2 > v2) ... so each branch is a
+        # range over the composite index.
+        condition = Q()
+        equal = Q()
+        for key, field, value in zip(self.ordering, self.fields, values):
+            descending = key.startswith('-')
+            name = self._lookup(key.lstrip('-'), field)
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _reverse_ordering(self):
+        return [key[1:] if key.startswith('-') else f'-{key}' for key in self.ordering]
+
+    def _window(self, cursor):
+        # One row past the page tells whether there is a next one.
+        direction, values = ('n', None)
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+
+        forward = direction == 'n'
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward))
+        ordering = self.ordering if forward else self._reverse_ordering()
+        return queryset.order_by(*ordering)[:self.per_page + 1], forward, values
+
+    def _build_page(self, rows, forward, values):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage([])
+
+        if forward:
+            has_next, has_previous = has_more, values is not None
+        else:
+            has_next, has_previous = True, has_more
+
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], 'n') if has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], 'p') if has_previous else None,
+        )
+
+    def page(self, cursor=None):
+        window, forward, values = self._window(cursor)
+        return self._build_page(list(window), forward, values)
+
+    async def apage(self, cursor=None):
+        window, forward, values = self._window(cursor)
+        return self._build_page([row async for row in window], forward, values)
+
+    def page_or_first(self, cursor=None):
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+    async def apage_or_first(self, cursor=None):
+        try:
+            return await self.apage(cursor)
+        except InvalidCursor:
+            return await self.apage()
+
+    def stream(self, cursor=None, chunk_size=100):
+        """
+        Yield the rows of one forward page straight from a database cursor
+        without building the page in memory. Once exhausted, ``next_cursor``
+        holds the cursor of the following page (or None).
+        """
+        window, forward, _ = self._window(cursor)
+        if not forward:
+            raise InvalidCursor(cursor)
+        self.next_cursor = None
+        last = None
+        for index, row in enumerate(window.iterator(chunk_size=chunk_size)):
+            if index == self.per_page:
+                self.next_cursor = self.encode_cursor(last, 'n')
+                break
+            last = row
+            yield row
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+# ----------------------------------------
+# Role resolution
+# ----------------------------------------
+# A user's group names are looked up once and cached across requests; the
+# signals in events/signals.py drop the entry whenever the user's groups or
+# superuser flag change.
+
+ROLE_CACHE_TIMEOUT = getattr(settings, 'ROLE_CACHE_TIMEOUT', 60 * 60)
+
+
+class UserRoles:
+    def __init__(self, groups=(), is_superuser=False, is_authenticated=True):
+        self.groups = frozenset(groups)
+        self.is_superuser = is_superuser
+        self.is_authenticated = is_authenticated
+
+    @property
+    def is_admin(self):
+        return self.is_superuser or 'Admin' in self.groups
+
+    @property
+    def is_organizer(self):
+        return 'Organizer' in self.groups
+
+    @property
+    def is_participant(self):
+        return self.is_authenticated and not (self.is_admin or self.is_organizer)
+
+    @property
+    def can_add_event(self):
+        return self.is_admin or self.is_organizer
+
+    def in_groups(self, group_names):
+        return self.is_superuser or not self.groups.isdisjoint(group_names)
+
+    def as_context(self):
+        return {
+            'is_admin': self.is_admin,
+            'is_organizer': self.is_organizer,
+            'is_participant': self.is_participant,
+            'can_add_event': self.can_add_event,
+        }
+
+
+ANONYMOUS_ROLES = UserRoles(is_authenticated=False)
+
+
+def role_cache_key(user_id):
+    return f'roles:{user_id}'
+
+
+def get_roles(user):
+    if not user.is_authenticated:
+        return ANONYMOUS_ROLES
+
+    # Memoize on the user object too, so one request costs one cache lookup.
+    roles = getattr(user, '_roles', None)
+    if roles is not None:
+        return roles
+
+    key = role_cache_key(user.pk)
+    cached = cache.get(key)
+    if cached is None:
+        cached = (tuple(user.groups.values_list('name', flat=True)), user.is_superuser)
+        cache.set(key, cached, ROLE_CACHE_TIMEOUT)
+
+    user._roles = UserRoles(*cached)
+    return user._roles
+
+
+def invalidate_roles(user_ids):
+    cache.delete_many([role_cache_key(user_id) for user_id in user_ids])
@@ -0,0 +1,53 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Attendance, Event
+
+
+# ----------------------------------------
+# RSVP counter maintenance
+# ----------------------------------------
+def actual_rsvp_count():
+    """Correlated subquery counting the RSVP'd users of the outer event."""
+    counts = (
+        Attendance.objects.rsvps().filter(event_id=OuterRef('pk'))
+        .values('event_id').annotate(n=Count('pk')).values('n')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def fill_event_dates(attendances):
+    """Set event_date on rows inserted without one (Event.rsvps.add() and friends)."""
+    return attendances.filter(event_date__isnull=True).update(
+        event_date=Subquery(Event.objects.filter(pk=OuterRef('event_id')).values('date')[:1])
+    )
+
+
+def adjust_rsvp_counts(deltas):
+    """
+    Apply ``{event_id: delta}`` with F-expressions, one UPDATE per distinct
+    delta, so concurrent RSVPs never overwrite each other's increments.
+    """
+    by_delta = {}
+    for event_id, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(event_id)
+    now = timezone.now()
+    for delta, event_ids in by_delta.items():
+        Event.objects.filter(pk__in=event_ids).update(rsvp_count=F('rsvp_count') + delta, updated_at=now)
+
+
+def touch_events(event_ids):
+    """Move updated_at for attendance changes that leave rsvp_count alone."""
+    if event_ids:
+        Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+
+
+def reconcile_rsvp_counts(queryset):
+    """Rewrite rsvp_count for every drifted event in ``queryset``; returns rows fixed."""
+    return (
+        queryset.annotate(actual=actual_rsvp_count())
+        .exclude(rsvp_count=F('actual'))
+        .update(rsvp_count=actual_rsvp_count(), updated_at=timezone.now())
+    )
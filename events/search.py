@@ -0,0 +1,227 @@
+import re
+
+from django.db import connection as default_connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+
+# ----------------------------------------
+# Full-text search for events
+# ----------------------------------------
+# Each event is mirrored into a search table holding a "title" (the event name)
+# and a "body" (location, description and category label). The table is kept
+# in sync by the signals in events/signals.py and can be rebuilt with
+# `python manage.py rebuild_search_index`.
+#
+# The match goes into the caller's query as a subquery, so category, date
+# and distance filters narrow the same SQL statement and the page limit
+# applies after them.
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def event_document(event):
+    body = [event.location or '', event.description or '']
+    if event.category_id:
+        body.append(event.category.get_name_display())
+    return event.name or '', ' '.join(part for part in body if part)
+
+
+class BaseSearchBackend:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        pass
+
+    def uninstall(self):
+        pass
+
+    def clear(self):
+        pass
+
+    def index_events(self, events):
+        pass
+
+    def remove_events(self, event_ids):
+        pass
+
+    def match_sql(self, query):
+        """(sql, params) selecting the ids of matching events, or None if nothing can match."""
+        raise NotImplementedError
+
+    def rank_sql(self, query, event_id):
+        """(sql, params) of the rank of the event whose id is the ``event_id`` column."""
+        raise NotImplementedError
+
+    def search(self, queryset, query):
+        """
+        Restrict ``queryset`` to events matching ``query`` and annotate each
+        with ``search_rank`` (lower = more relevant).
+        """
+        match = self.match_sql(query)
+        if match is None:
+            return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+        quote = self.connection.ops.quote_name
+        event_id = f'{quote(queryset.model._meta.db_table)}.{quote(queryset.model._meta.pk.column)}'
+        return queryset.filter(pk__in=RawSQL(*match)).annotate(
+            search_rank=RawSQL(*self.rank_sql(query, event_id), output_field=FloatField()),
+        )
+
+
+# - - - - - - - - - - - - - - - - #
+#   PostgreSQL: tsvector + pg_trgm  #
+# - - - - - - - - - - - - - - - - #
+class PostgresSearchBackend(BaseSearchBackend):
+    table = 'events_event_search'
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    event_id bigint PRIMARY KEY REFERENCES events_event (id) ON DELETE CASCADE,
+                    title text NOT NULL,
+                    body text NOT NULL,
+                    vector tsvector GENERATED ALWAYS AS (
+                        setweight(to_tsvector('english', title), 'A') ||
+                        setweight(to_tsvector('english', body), 'B')
+                    ) STORED
+                )
+            """)
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_vector_idx "
+                f"ON {self.table} USING GIN (vector)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_trgm_idx "
+                f"ON {self.table} USING GIN ((title || ' ' || body) gin_trgm_ops)"
+            )
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {self.table}")
+
+    def index_events(self, events):
+        rows = [(event.pk, *event_document(event)) for event in events]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (event_id, title, body) VALUES (%s, %s, %s) "
+                f"ON CONFLICT (event_id) DO UPDATE SET title = EXCLUDED.title, body = EXCLUDED.body",
+                rows,
+            )
+
+    def remove_events(self, event_ids):
+        event_ids = list(event_ids)
+        if event_ids:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {self.table} WHERE event_id = ANY(%s)", [event_ids])
+
+    def match_sql(self, query):
+        return (
+            f"SELECT event_id FROM {self.table}, websearch_to_tsquery('english', %s) AS query "
+            f"WHERE vector @@ query OR (title || ' ' || body) %% %s",
+            [query, query],
+        )
+
+    def rank_sql(self, query, event_id):
+        return (
+            f"SELECT -(ts_rank(vector, query) + similarity(title || ' ' || body, %s)) "
+            f"FROM {self.table}, websearch_to_tsquery('english', %s) AS query "
+            f"WHERE event_id = {event_id}",
+            [query, query],
+        )
+
+
+# - - - - - - - - - - - - #
+#   SQLite: FTS5 table    #
+# - - - - - - - - - - - - #
+class SQLiteSearchBackend(BaseSearchBackend):
+    table = 'events_event_fts'
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                f"USING fts5(title, body, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def index_events(self, events):
+        rows = [(event.pk, *event_document(event)) for event in events]
+        if not rows:
+            return
+        self.remove_events([row[0] for row in rows])
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, title, body) VALUES (%s, %s, %s)", rows
+            )
+
+    def remove_events(self, event_ids):
+        event_ids = list(event_ids)
+        if event_ids:
+            placeholders = ', '.join(['%s'] * len(event_ids))
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", event_ids)
+
+    @staticmethod
+    def match_expression(query):
+        # Quote every word so user input can't inject FTS5 syntax; the trailing
+        # * gives prefix matching ("wed" finds "wedding").
+        return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+    def match_sql(self, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return None
+        return f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [expression]
+
+    def rank_sql(self, query, event_id):
+        return (
+            f"SELECT bm25({self.table}, 10.0, 1.0) FROM {self.table} "
+            f"WHERE {self.table} MATCH %s AND rowid = {event_id}",
+            [self.match_expression(query)],
+        )
+
+
+# - - - - - - - - - - - - - - - #
+#   Fallback: plain icontains   #
+# - - - - - - - - - - - - - - - #
+class IContainsSearchBackend(BaseSearchBackend):
+    def search(self, queryset, query):
+        filters = Q(name__icontains=query) | Q(location__icontains=query)
+        # No relevance to rank by: newest first.
+        return queryset.filter(filters).annotate(search_rank=-F('id'))
+
+
+_fts5_support = {}
+
+
+def sqlite_has_fts5(connection):
+    if connection.alias not in _fts5_support:
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            _fts5_support[connection.alias] = any('ENABLE_FTS5' in row[0] for row in cursor.fetchall())
+    return _fts5_support[connection.alias]
+
+
+def get_search_backend(connection=None):
+    connection = connection or default_connection
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend(connection)
+    if connection.vendor == 'sqlite' and sqlite_has_fts5(connection):
+        return SQLiteSearchBackend(connection)
+    return IContainsSearchBackend(connection)
@@ -1,10 +1,371 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Attendance, Event, Category, Participant, StatRollup
+from .search import get_search_backend
+from .rsvps import adjust_rsvp_counts, fill_event_dates, touch_events
+from .roles import invalidate_roles
+from .page_cache import bump_page_versions
+from .images import ensure_derivatives
+from .feeds import invalidate_feeds
+from .stats import (
+    attendance_days, bump_rollups, month, record_attendance, record_group_members, record_user_activity,
+)
+
+User = get_user_model()
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)  # string, safe at import
 def assign_default_group(sender, instance, created, **kwargs):
     if created:
         participant_group, _ = Group.objects.get_or_create(name='Participant')
-        instance.groups.add(participant_group)
\ No newline at end of file
+        instance.groups.add(participant_group)
+
+
+# ----------------------------------------
+# Keep the event search index in sync
+# ----------------------------------------
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().index_events([instance])
+
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, **kwargs):
+    get_search_backend().remove_events([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_events(sender, instance, created, raw=False, **kwargs):
+    # The category label is part of every event document in it.
+    if not created and not raw:
+        get_search_backend().index_events(instance.events.select_related('category'))
+
+
+
+# ----------------------------------------
+# Keep Event.rsvp_count in sync with Event.rsvps
+# ----------------------------------------
+@receiver(m2m_changed, sender=Attendance)
+def update_rsvp_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('pre_remove', 'pre_clear'):
+        # remove()'s pk_set may name pairs that don't exist, so count the rows
+        # that are really about to go before they are deleted.
+        rows = sender.objects.rsvps().filter(**{'user_id' if reverse else 'event_id': instance.pk})
+        if action == 'pre_remove':
+            rows = rows.filter(**{'event_id__in' if reverse else 'user_id__in': pk_set})
+        instance._rsvp_removals = {}
+        for event_id in rows.values_list('event_id', flat=True):
+            instance._rsvp_removals[event_id] = instance._rsvp_removals.get(event_id, 0) - 1
+        instance._rsvp_removal_days = attendance_days(rows) if instance._rsvp_removals else {}
+        return
+
+    if action == 'post_add':
+        # Django only reports pairs that were actually inserted.
+        if reverse:
+            deltas = {event_id: 1 for event_id in pk_set}
+        else:
+            deltas = {instance.pk: len(pk_set)}
+        # The through rows were stamped created_at=now() just before this.
+        days = {timezone.localdate(): sum(deltas.values())}
+        sign = 1
+    elif action in ('post_remove', 'post_clear'):
+        deltas = getattr(instance, '_rsvp_removals', {})
+        days = getattr(instance, '_rsvp_removal_days', {})
+        sign = -1
+        instance._rsvp_removals, instance._rsvp_removal_days = {}, {}
+    else:
+        return
+
+    adjust_rsvp_counts(deltas)
+    record_attendance(days, sign=sign)
+    if deltas:
+        bump_page_versions('events', *[f'event:{event_id}' for event_id in deltas])
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def release_user_rsvps(sender, instance, **kwargs):
+    # Deleting a user cascades through the RSVP table without m2m_changed.
+    attendances = Attendance.objects.filter(user_id=instance.pk)
+    event_ids = list(attendances.values_list('event_id', flat=True))
+    adjust_rsvp_counts({event_id: -1 for event_id in event_ids})
+    if event_ids:
+        record_attendance(attendance_days(attendances), sign=-1)
+        bump_page_versions('events', *[f'event:{event_id}' for event_id in event_ids])
+
+
+@receiver(pre_delete, sender=Participant)
+def release_participant_attendance(sender, instance, **kwargs):
+    # Participants hold no seats (rsvp_count is users only), but their rows
+    # are part of the attendance rollup and the validators of the pages
+    # that show it.
+    days = attendance_days(instance.attendances.all())
+    record_attendance(days, sign=-1)
+    if days:
+        touch_events(set(instance.attendances.values_list('event_id', flat=True)))
+        bump_page_versions('events')
+
+
+@receiver(post_save, sender=Attendance)
+def count_participant_attendance(sender, instance, created, raw=False, **kwargs):
+    # User rows are counted by update_rsvp_counts() and book_seat();
+    # participant rows are created directly.
+    if raw or not created or instance.participant_id is None:
+        return
+    record_attendance({timezone.localdate(instance.created_at): 1})
+    touch_events([instance.event_id])
+    bump_page_versions('events', f'event:{instance.event_id}')
+
+
+
+# ----------------------------------------
+# Keep Attendance.event_date in sync
+# ----------------------------------------
+@receiver(m2m_changed, sender=Attendance)
+def date_added_rsvps(sender, instance, action, reverse, **kwargs):
+    # add() inserts through rows without the event's date; book_seat()
+    # sets it itself.
+    if action == 'post_add':
+        fill_event_dates(sender.objects.filter(**{'user_id' if reverse else 'event_id': instance.pk}))
+
+
+@receiver(post_save, sender=Event)
+def redate_attendance(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw or (update_fields is not None and 'date' not in update_fields):
+        return
+    date = sender._meta.get_field('date').to_python(instance.date)
+    instance.attendances.exclude(event_date=date).update(event_date=date)
+
+
+
+# ----------------------------------------
+# Invalidate cached role flags
+# ----------------------------------------
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_group_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            invalidate_roles([instance.pk])
+    elif action == 'pre_clear':
+        # group.user_set.clear(): collect the members before the rows go.
+        instance._role_members = list(instance.user_set.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        invalidate_roles(getattr(instance, '_role_members', []))
+    elif action.startswith('post_'):
+        invalidate_roles(pk_set)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_roles(sender, instance, update_fields=None, **kwargs):
+    # is_superuser is part of the cached value; saves like login()'s
+    # last_login update leave it alone.
+    if update_fields is None or 'is_superuser' in update_fields:
+        invalidate_roles([instance.pk])
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_group_member_roles(sender, instance, **kwargs):
+    invalidate_roles(instance.user_set.values_list('pk', flat=True))
+
+
+# ----------------------------------------
+# Invalidate the anonymous page cache
+# ----------------------------------------
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def bump_event_pages(sender, instance, **kwargs):
+    bump_page_versions('events', 'calendar', f'event:{instance.pk}')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_pages(sender, instance, **kwargs):
+    bump_page_versions('events', 'categories')
+
+
+@receiver(post_delete, sender=Event)
+def touch_event_category(sender, instance, **kwargs):
+    # A deleted event leaves no updated_at behind; its category's moves the
+    # events list's Last-Modified forward instead.
+    Category.objects.filter(pk=instance.category_id).update(updated_at=timezone.now())
+
+
+
+
+# ----------------------------------------
+# Drop cached calendar feeds
+# ----------------------------------------
+@receiver(m2m_changed, sender=Attendance)
+def invalidate_rsvp_feeds(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # user.rsvp_events.add/remove/clear(): only this user's feed changes.
+        if action.startswith('post_'):
+            invalidate_feeds(user_ids=[instance.pk])
+    elif action == 'pre_clear':
+        instance._feed_users = list(sender.objects.rsvps().filter(event_id=instance.pk).values_list('user_id', flat=True))
+    elif action == 'post_clear':
+        invalidate_feeds(user_ids=getattr(instance, '_feed_users', []))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_feeds(user_ids=pk_set)
+
+
+@receiver(post_save, sender=Event)
+def invalidate_event_feeds(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        # A new event has no attendees yet, only its organizer.
+        invalidate_feeds(user_ids=[instance.created_by_id])
+    else:
+        invalidate_feeds(event_ids=[instance.pk])
+
+
+@receiver(pre_delete, sender=Event)
+def invalidate_deleted_event_feeds(sender, instance, **kwargs):
+    # Before the RSVP rows cascade away with the event.
+    invalidate_feeds(event_ids=[instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_deactivated_user_feeds(sender, instance, created, raw=False, **kwargs):
+    # A cache hit never checks is_active; _was_active is set by remember_user_activity.
+    if not raw and not created and getattr(instance, '_was_active', None) and not instance.is_active:
+        invalidate_feeds(user_ids=[instance.pk])
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_deleted_user_feeds(sender, instance, **kwargs):
+    invalidate_feeds(user_ids=[instance.pk])
+
+
+
+
+# ----------------------------------------
+# Resized image derivatives on upload
+# ----------------------------------------
+@receiver(post_save, sender=Event)
+def event_image_derivatives(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or 'image' in update_fields):
+        ensure_derivatives(instance.image)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def profile_picture_derivatives(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or 'profile_picture' in update_fields):
+        ensure_derivatives(instance.profile_picture)
+
+
+
+
+# ----------------------------------------
+# Admin statistics rollups
+# ----------------------------------------
+# Attendance is recorded next to adjust_rsvp_counts() above.
+def event_date(instance):
+    # Event.objects.create(date='2026-01-31') leaves a string on the instance.
+    return Event._meta.get_field('date').to_python(instance.date)
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_bucket(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._stat_bucket = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is None or {'date', 'category'} & set(update_fields):
+        instance._stat_bucket = Event.objects.filter(pk=instance.pk).values_list('category_id', 'date').first()
+
+
+@receiver(post_save, sender=Event)
+def count_event(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    date = event_date(instance)
+    if created:
+        bump_rollups({(StatRollup.EVENTS, instance.category_id, month(date)): 1})
+        return
+    previous = getattr(instance, '_stat_bucket', None)
+    if previous is None:
+        return
+    old_category, old_date = previous
+    # Move the event to its new month / category; its attendance is counted
+    # by the day it was made, so that stays put.
+    deltas = {}
+    for key, delta in [
+        ((StatRollup.EVENTS, old_category, month(old_date)), -1),
+        ((StatRollup.EVENTS, instance.category_id, month(date)), 1),
+    ]:
+        deltas[key] = deltas.get(key, 0) + delta
+    bump_rollups(deltas)
+
+
+@receiver(pre_delete, sender=Event)
+def remember_event_attendance(sender, instance, **kwargs):
+    # The Attendance rows cascade without m2m_changed; count them first.
+    instance._attendance_days = attendance_days(instance.attendances.all())
+
+
+@receiver(post_delete, sender=Event)
+def uncount_event(sender, instance, **kwargs):
+    bump_rollups({(StatRollup.EVENTS, instance.category_id, month(event_date(instance))): -1})
+    record_attendance(getattr(instance, '_attendance_days', {}), sign=-1)
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def remember_user_activity(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._was_active = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is None or 'is_active' in update_fields:
+        instance._was_active = User.objects.filter(pk=instance.pk).values_list('is_active', flat=True).first()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def count_user(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        bump_rollups({(StatRollup.USERS, 'active' if instance.is_active else 'inactive', None): 1})
+        return
+    was_active = getattr(instance, '_was_active', None)
+    if was_active is not None and was_active != instance.is_active:
+        record_user_activity(**{'activated' if instance.is_active else 'deactivated': 1})
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def uncount_user(sender, instance, **kwargs):
+    # Group memberships cascade without m2m_changed too.
+    bump_rollups({(StatRollup.USERS, 'active' if instance.is_active else 'inactive', None): -1})
+    record_group_members({name: 1 for name in instance.groups.values_list('name', flat=True)}, sign=-1)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def count_group_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('pre_remove', 'pre_clear'):
+        # As with RSVPs, count the memberships that really exist before they go.
+        rows = sender.objects.filter(**{'group_id' if reverse else 'customuser_id': instance.pk})
+        if action == 'pre_remove':
+            rows = rows.filter(**{'customuser_id__in' if reverse else 'group_id__in': pk_set})
+        instance._stat_members = dict(
+            rows.values('group__name').annotate(n=Count('pk')).values_list('group__name', 'n')
+        )
+    elif action == 'post_add' and pk_set:
+        if reverse:
+            record_group_members({instance.name: len(pk_set)})
+        else:
+            record_group_members(dict(
+                Group.objects.filter(pk__in=pk_set).values_list('name').annotate(n=Count('id'))
+            ))
+    elif action in ('post_remove', 'post_clear'):
+        record_group_members(getattr(instance, '_stat_members', {}), sign=-1)
+        instance._stat_members = {}
+
+
+@receiver(pre_delete, sender=Group)
+def uncount_group(sender, instance, **kwargs):
+    bump_rollups({(StatRollup.GROUP_MEMBERS, instance.name, None): -instance.user_set.count()})
+
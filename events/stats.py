@@ -0,0 +1,154 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import Attendance, Category, Event, StatRollup
+
+User = get_user_model()
+
+
+# ----------------------------------------
+# Admin statistics rollups
+# ----------------------------------------
+# Counters are adjusted by deltas as rows change (see events.signals), so the
+# dashboard reads a few dozen StatRollup rows instead of scanning events,
+# RSVPs and users. rebuild_rollups() recomputes everything from the source
+# tables and repairs any drift.
+
+def month(day):
+    return day.replace(day=1)
+
+
+def bump_rollups(deltas):
+    """Apply ``{(metric, dimension, period): delta}`` with F-expression upserts."""
+    for (metric, dimension, period), delta in deltas.items():
+        if not delta:
+            continue
+        key = {'metric': metric, 'dimension': str(dimension), 'period': period}
+        if StatRollup.objects.filter(**key).update(value=F('value') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                StatRollup.objects.create(value=delta, **key)
+        except IntegrityError:
+            # Someone else created the row between our UPDATE and INSERT.
+            StatRollup.objects.filter(**key).update(value=F('value') + delta)
+
+
+def attendance_days(attendances):
+    """``{day: rows}`` for an Attendance queryset, by the local day each row was made."""
+    return dict(
+        attendances.annotate(day=TruncDate('created_at')).values('day')
+        .annotate(n=Count('pk')).order_by().values_list('day', 'n')
+    )
+
+
+def record_attendance(day_counts, sign=1):
+    """``{day: rows}`` of Attendance made (sign=1) or removed (sign=-1)."""
+    bump_rollups({(StatRollup.RSVPS, '', day): sign * count for day, count in day_counts.items()})
+
+
+def record_user_activity(activated=0, deactivated=0):
+    bump_rollups({
+        (StatRollup.USERS, 'active', None): activated - deactivated,
+        (StatRollup.USERS, 'inactive', None): deactivated - activated,
+    })
+
+
+def record_group_members(group_counts, sign=1):
+    """``{group name: members}`` joined (sign=1) or left (sign=-1)."""
+    bump_rollups({
+        (StatRollup.GROUP_MEMBERS, name, None): sign * count
+        for name, count in group_counts.items()
+    })
+
+
+# - - - - - - - - - - #
+#       Rebuild       #
+# - - - - - - - - - - #
+def compute_rollups():
+    rows = []
+    events = (
+        Event.objects.annotate(month=TruncMonth('date'))
+        .values('category_id', 'month').annotate(n=Count('id')).order_by()
+    )
+    rows += [(StatRollup.EVENTS, str(row['category_id']), row['month'], row['n']) for row in events]
+
+    rows += [(StatRollup.RSVPS, '', day, n) for day, n in attendance_days(Attendance.objects.all()).items()]
+
+    users = User.objects.values('is_active').annotate(n=Count('id')).order_by()
+    rows += [(StatRollup.USERS, 'active' if row['is_active'] else 'inactive', None, row['n']) for row in users]
+
+    members = User.groups.through.objects.values('group__name').annotate(n=Count('pk')).order_by()
+    rows += [(StatRollup.GROUP_MEMBERS, row['group__name'], None, row['n']) for row in members]
+    return rows
+
+
+def rebuild_rollups():
+    rows = compute_rollups()
+    with transaction.atomic():
+        StatRollup.objects.all().delete()
+        StatRollup.objects.bulk_create([
+            StatRollup(metric=metric, dimension=dimension, period=period, value=value)
+            for metric, dimension, period, value in rows
+        ])
+    return len(rows)
+
+
+# - - - - - - - - - - #
+#      Dashboard      #
+# - - - - - - - - - - #
+def total_attendance():
+    """Attendance rows (RSVPs and participants) across all events, from the rollups."""
+    return StatRollup.objects.filter(metric=StatRollup.RSVPS).aggregate(total=Sum('value'))['total'] or 0
+
+
+def dashboard_stats(months=12, days=30):
+    today = timezone.localdate()
+    first_month = month(today - timedelta(days=31 * (months - 1)))
+    first_day = today - timedelta(days=days - 1)
+
+    totals = {
+        (row['metric'], row['dimension']): row['total']
+        for row in StatRollup.objects.values('metric', 'dimension').annotate(total=Sum('value')).order_by()
+    }
+    recent = StatRollup.objects.filter(
+        metric=StatRollup.EVENTS, period__gte=first_month,
+    ).values_list('dimension', 'period', 'value')
+    daily = dict(
+        StatRollup.objects.filter(metric=StatRollup.RSVPS, period__range=(first_day, today))
+        .values_list('period', 'value')
+    )
+
+    def total(metric, dimension=None):
+        return sum(value for (m, d), value in totals.items() if m == metric and dimension in (None, d))
+
+    labels = dict(Category.CATEGORY_CHOICES)
+    categories = {
+        str(pk): labels.get(name, name) for pk, name in Category.objects.values_list('id', 'name')
+    }
+    events_by_month = {}
+    for category_id, period, value in recent:
+        events_by_month.setdefault(period, []).append((categories.get(category_id, category_id), value))
+
+    return {
+        'total_events': total(StatRollup.EVENTS),
+        'events_by_category': sorted(
+            (categories.get(d, d), v) for (m, d), v in totals.items() if m == StatRollup.EVENTS
+        ),
+        'total_rsvps': total(StatRollup.RSVPS),
+        'active_users': total(StatRollup.USERS, 'active'),
+        'inactive_users': total(StatRollup.USERS, 'inactive'),
+        'organizers': total(StatRollup.GROUP_MEMBERS, 'Organizer'),
+        'admins': total(StatRollup.GROUP_MEMBERS, 'Admin'),
+        'participants': total(StatRollup.GROUP_MEMBERS, 'Participant'),
+        'events_by_month': [
+            (period, sorted(counts), sum(n for _, n in counts))
+            for period, counts in sorted(events_by_month.items(), reverse=True)
+        ],
+        'rsvps_by_day': [(first_day + timedelta(days=n), daily.get(first_day + timedelta(days=n), 0)) for n in range(days)],
+    }
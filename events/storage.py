@@ -0,0 +1,45 @@
+import hashlib
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import UploadedFile
+
+
+# ----------------------------------------
+# Fingerprinted media names
+# ----------------------------------------
+# An upload is saved as "<name>.<12 hex digits of its md5>.<ext>", the same
+# scheme ManifestStaticFilesStorage uses for static files, so a media URL
+# names one exact content and can be cached forever. Image derivatives are
+# named after their original ("<name>_<hash>_<ext>_<size>.webp") and carry
+# the fingerprint along.
+
+FINGERPRINT_LENGTH = 12
+FINGERPRINT_RE = re.compile(r'[._][0-9a-f]{%d}[._]' % FINGERPRINT_LENGTH)
+
+
+def fingerprint(content):
+    md5 = hashlib.md5()
+    for chunk in content.chunks():
+        md5.update(chunk)
+    content.seek(0)
+    return md5.hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def is_fingerprinted(name):
+    return bool(FINGERPRINT_RE.search(posixpath.basename(name)))
+
+
+class FingerprintedFileSystemStorage(FileSystemStorage):
+    """
+    Uploaded files get their content hash in the name. Files the app writes
+    itself (derivatives) keep the name they are given: templates build their
+    URLs from the original's name.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name and isinstance(content, UploadedFile) and not is_fingerprinted(name):
+            root, ext = posixpath.splitext(name)
+            name = f'{root}.{fingerprint(content)}{ext}'
+        return super().save(name, content, max_length=max_length)
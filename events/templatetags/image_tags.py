@@ -0,0 +1,39 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from events.images import IMAGE_DERIVATIVES, derivative_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_srcset(image, ext='webp'):
+    """``srcset`` value listing every derivative of ``image`` in format ``ext``."""
+    return ', '.join(f'{url} {width}w' for _, width, url in derivative_urls(image, ext))
+
+
+@register.simple_tag
+def responsive_image(image, size='card', sizes=None, **attrs):
+    """
+    <picture> with WebP and JPEG srcsets of ``image``'s derivatives; ``size``
+    picks the fallback <img src>. Falls back to the original file until the
+    derivatives exist. Extra keyword arguments become <img> attributes.
+    """
+    if not image:
+        return ''
+    attributes = format_html_join(' ', '{}="{}"', [(key.replace('_', '-'), value) for key, value in attrs.items()])
+    sizes = sizes or f'{IMAGE_DERIVATIVES[size][0]}px'
+
+    jpeg = derivative_urls(image, 'jpg')
+    if not jpeg:
+        return format_html('<img src="{}" loading="lazy" {}>', image.url, attributes)
+
+    fallback = next(url for name, _, url in jpeg if name == size)
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" loading="lazy" decoding="async" {}>'
+        '</picture>',
+        image_srcset(image, 'webp'), sizes,
+        fallback, image_srcset(image, 'jpg'), sizes, attributes,
+    )
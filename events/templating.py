@@ -0,0 +1,29 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from .middleware import current_profile
+
+
+# ----------------------------------------
+# Template backend that reports render time to the request profiler
+# ----------------------------------------
+class ProfiledTemplate(Template):
+    def render(self, context=None, request=None):
+        profile = current_profile()
+        if profile is None:
+            return super().render(context, request)
+        with profile.rendering():
+            return super().render(context, request)
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """
+    The stock Django engine, except that the templates it hands out time
+    themselves when the current request is being sampled. Includes and
+    extends render inside the top-level template, so only that is wrapped.
+    """
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name).template, self)
@@ -1,3 +1,1141 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import re
+import shutil
+import smtplib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.mail.backends import locmem
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count, Q
+from django.http import StreamingHttpResponse
+from django.template import Template as DjangoTemplate, engines
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+from PIL import Image as PILImage
+
+from config import urls as root_urls
+
+from . import async_views
+from .booking import ALREADY_BOOKED, BOOKED, FULL, book_seat
+from .feeds import calendar_token
+from .filters import DEFAULT_RADIUS_KM, event_ordering, filter_events, search_radius
+from .forms import EventModelForm
+from .geo import MAX_RADIUS_KM
+from .images import IMAGE_DERIVATIVES, IMAGE_FORMATS, derivative_name, derivative_urls, has_derivatives
+from .importer import import_events, parse_csv, parse_ics
+from .management.commands import bench
+from .middleware import AdmissionControlMiddleware
+from .models import Attendance, Category, Event, OutboxEmail, Participant, StatRollup
+from .outbox import OUTBOX_MAX_ATTEMPTS, drain_outbox, queue_mail
+from .pagination import KeysetPaginator
+from .roles import get_roles
+from .search import get_search_backend
+from .stats import compute_rollups, dashboard_stats, rebuild_rollups, total_attendance
+from .storage import is_fingerprinted
+from .templatetags.image_tags import responsive_image
+from .throttling import InFlight, hit_window
+from .views import EVENTS_PER_PAGE, bulk_user_action
+
+User = get_user_model()
+
+
+def make_user(username, **fields):
+    return User.objects.create_user(username, f"{username}@example.com", **fields)
+
+
+def make_event(name="Event", category=None, days=7, **fields):
+    category = category or Category.objects.get_or_create(name='CASUAL')[0]
+    fields.setdefault('location', "Dhaka")
+    return Event.objects.create(
+        name=name, category=category, date=date.today() + timedelta(days=days), time=time(18, 0), **fields
+    )
+
+
+@override_settings(STATIC_ROOT=None, STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class ViewTestCase(TestCase):
+    """Renders pages without collectstatic's manifest, starting from an empty cache."""
+
+    def setUp(self):
+        cache.clear()
+
+
+# ----------------------------------------
+# Keyset pagination
+# ----------------------------------------
+class KeysetPaginationTests(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        # Shared dates, so the id tie-breaker decides the order within a day.
+        self.events = [make_event(f"Event {i}", days=i % 3) for i in range(8)]
+
+    def test_pages_cover_every_event_once_both_ways(self):
+        paginator = KeysetPaginator(Event.objects.all(), per_page=3)
+        expected = list(Event.objects.order_by('-date', '-id').values_list('pk', flat=True))
+
+        pages, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            pages.append(page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual([event.pk for page in pages for event in page], expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+
+        previous = paginator.page(pages[-1].previous_cursor)
+        self.assertEqual([event.pk for event in previous], [event.pk for event in pages[1]])
+
+    def test_bad_cursor_shows_first_page(self):
+        response = self.client.get(reverse('all_events'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Event 7")
+
+
+# ----------------------------------------
+# Denormalized rsvp_count
+# ----------------------------------------
+class RsvpCountTests(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        self.event = make_event()
+        self.users = [make_user(f"guest{i}") for i in range(3)]
+
+    def rsvp_count(self):
+        return Event.objects.values_list('rsvp_count', flat=True).get(pk=self.event.pk)
+
+    def test_count_follows_rsvps(self):
+        self.event.rsvps.add(*self.users)
+        self.assertEqual(self.rsvp_count(), 3)
+        self.event.rsvps.remove(self.users[0])
+        self.assertEqual(self.rsvp_count(), 2)
+        self.users[1].delete()
+        self.assertEqual(self.rsvp_count(), 1)
+
+    def test_reconcile_repairs_drift(self):
+        self.event.rsvps.add(self.users[0])
+        Event.objects.filter(pk=self.event.pk).update(rsvp_count=7)
+        call_command('reconcile_rsvp_counts', stdout=StringIO())
+        self.assertEqual(self.rsvp_count(), 1)
+
+    def test_events_control_counts_without_a_query_per_row(self):
+        self.client.force_login(make_user("admin", is_superuser=True))
+        url = reverse('events_control')
+
+        def queries():
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            return len(context)
+
+        queries()  # caches the admin's roles
+        one = queries()
+        for i in range(4):
+            make_event(f"More {i}")
+        self.assertEqual(queries(), one)
+
+
+# ----------------------------------------
+# Cached roles
+# ----------------------------------------
+class RoleCacheTests(ViewTestCase):
+    def roles(self, user):
+        # A fresh instance, as the next request would load.
+        return get_roles(User.objects.get(pk=user.pk))
+
+    def test_group_changes_reach_the_cache(self):
+        user = make_user("organizer")
+        organizers = Group.objects.create(name='Organizer')
+        self.assertFalse(self.roles(user).is_organizer)
+
+        organizers.user_set.add(user)
+        self.assertTrue(self.roles(user).is_organizer)
+        user.groups.clear()
+        self.assertFalse(self.roles(user).is_organizer)
+
+        user.is_superuser = True
+        user.save()
+        self.assertTrue(self.roles(user).is_admin)
+
+    def test_cached_roles_cost_no_queries(self):
+        user = make_user("admin", is_superuser=True)
+        self.roles(user)
+        user = User.objects.get(pk=user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(get_roles(user).can_add_event)
+
+
+# ----------------------------------------
+# Anonymous page cache
+# ----------------------------------------
+class PageCacheTests(ViewTestCase):
+    def test_edits_orphan_cached_pages(self):
+        event = make_event("Garden party")
+        url = reverse('event_detail', args=[event.pk])
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'HIT')
+
+        event.name = "Garden brunch"
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+            # Not before the commit: a reader now would cache the old row
+            # under the new version.
+            self.assertEqual(self.client.get(url)['X-Page-Cache'], 'HIT')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, "Garden brunch")
+
+    def test_upcoming_listing_expires_when_an_event_starts(self):
+        event = make_event("Sunrise yoga", days=1)
+        url = reverse('all_events') + '?upcoming=1'
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'HIT')
+
+        # Time passing, not a write: no signal bumps the "events" scope.
+        Event.objects.filter(pk=event.pk).update(starts_at=timezone.now() - timedelta(minutes=1))
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertNotContains(response, "Sunrise yoga")
+
+    def test_logged_in_pages_are_not_cached(self):
+        event = make_event()
+        self.client.force_login(make_user("member"))
+        response = self.client.get(reverse('event_detail', args=[event.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Page-Cache', response)
+
+
+# ----------------------------------------
+# Email outbox
+# ----------------------------------------
+class FlakyEmailBackend(locmem.EmailBackend):
+    """locmem, but the next ``drops`` sends fail as a dropped SMTP session."""
+    drops = 0
+    opened = 0
+    sent_in_transaction = False
+
+    def open(self):
+        FlakyEmailBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        FlakyEmailBackend.sent_in_transaction |= connection.in_atomic_block
+        if FlakyEmailBackend.drops:
+            FlakyEmailBackend.drops -= 1
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        if any('bounce' in address for message in messages for address in message.to):
+            raise smtplib.SMTPRecipientsRefused({})
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='events.tests.FlakyEmailBackend')
+class OutboxTests(TransactionTestCase):
+    def setUp(self):
+        FlakyEmailBackend.drops = FlakyEmailBackend.opened = 0
+        FlakyEmailBackend.sent_in_transaction = False
+
+    def queue(self, *recipients):
+        return [queue_mail("Hello", "Body", None, [recipient]) for recipient in recipients]
+
+    def test_sends_outside_transactions_over_one_session(self):
+        self.queue('a@example.com', 'b@example.com', 'c@example.com')
+        stats = drain_outbox(batch_size=2)
+        self.assertEqual((stats.sent, stats.batches), (3, 2))
+        self.assertEqual(FlakyEmailBackend.opened, 1)
+        self.assertFalse(FlakyEmailBackend.sent_in_transaction)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.SENT).exists())
+
+    def test_nothing_due_opens_no_session(self):
+        drain_outbox()
+        self.assertEqual(FlakyEmailBackend.opened, 0)
+
+    def test_dropped_session_is_reopened_without_costing_an_attempt(self):
+        self.queue('a@example.com', 'b@example.com')
+        FlakyEmailBackend.drops = 1
+        stats = drain_outbox()
+        self.assertEqual(stats.sent, 2)
+        self.assertEqual(FlakyEmailBackend.opened, 2)
+        self.assertEqual(list(OutboxEmail.objects.values_list('attempts', flat=True)), [1, 1])
+
+    def test_unreachable_server_defers_the_batch(self):
+        self.queue('a@example.com', 'b@example.com')
+        FlakyEmailBackend.drops = 10
+        stats = drain_outbox()
+        self.assertEqual((stats.sent, stats.deferred), (0, 2))
+        due = OutboxEmail.objects.filter(status=OutboxEmail.PENDING, attempts=0, next_attempt_at__lte=timezone.now())
+        self.assertEqual(due.count(), 2)
+
+    def test_failures_back_off_then_dead_letter(self):
+        outbox_email, = self.queue('bounce@example.com')
+        for attempt in range(1, OUTBOX_MAX_ATTEMPTS + 1):
+            drain_outbox()
+            outbox_email.refresh_from_db()
+            self.assertEqual(outbox_email.attempts, attempt)
+            if attempt < OUTBOX_MAX_ATTEMPTS:
+                self.assertEqual(outbox_email.status, OutboxEmail.PENDING)
+                self.assertGreater(outbox_email.next_attempt_at, timezone.now())
+                # Skip the wait.
+                OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox_email.status, OutboxEmail.DEAD)
+        self.assertIn('SMTPRecipientsRefused', outbox_email.last_error)
+
+
+# ----------------------------------------
+# Fake data
+# ----------------------------------------
+class FakeDataTests(TestCase):
+    def test_bulk_rows_are_consistent(self):
+        call_command(
+            'generate_fake_data', events=30, users=10, participants=5, rsvps_per_event=4,
+            seed=1, workers=1, stdout=StringIO(),
+        )
+        self.assertEqual(Event.objects.count(), 30)
+        self.assertEqual(User.objects.count(), 10)
+        counts = Event.objects.annotate(actual=Count('attendances', filter=Q(attendances__user__isnull=False)))
+        self.assertEqual({(event.rsvp_count, event.actual) for event in counts}, {(4, 4)})
+
+        event = Event.objects.order_by('pk').first()
+        self.assertIn(event, filter_events(Event.objects.all(), {'q': event.name}))
+        self.assertEqual(total_attendance(), 30 * 4 + Attendance.objects.filter(participant__isnull=False).count())
+
+
+# ----------------------------------------
+# Benchmark regressions
+# ----------------------------------------
+class BenchCompareTests(SimpleTestCase):
+    def compare(self, before, after):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as fh:
+            json.dump({'results': {'all_events:anonymous': before}}, fh)
+        self.addCleanup(os.remove, fh.name)
+        command = bench.Command(stdout=StringIO(), stderr=StringIO())
+        command.compare({'results': {'all_events:anonymous': after}}, fh.name, threshold=0.25, min_delta_ms=2.0)
+
+    def test_percentile_is_nearest_rank(self):
+        self.assertEqual(bench.percentile([5, 1, 4, 2, 3], 50), 3)
+        self.assertEqual(bench.percentile(list(range(1, 101)), 95), 95)
+
+    def test_slowdowns_and_extra_queries_fail(self):
+        self.compare({'p95_ms': 10.0, 'queries_p50': 4}, {'p95_ms': 11.5, 'queries_p50': 4})
+        # 30% slower, but under min_delta_ms: timer noise.
+        self.compare({'p95_ms': 1.0, 'queries_p50': 4}, {'p95_ms': 1.3, 'queries_p50': 4})
+        with self.assertRaisesMessage(CommandError, "p95_ms: 10.0 -> 20.0"):
+            self.compare({'p95_ms': 10.0, 'queries_p50': 4}, {'p95_ms': 20.0, 'queries_p50': 4})
+        with self.assertRaisesMessage(CommandError, "queries_p50: 4 -> 9"):
+            self.compare({'p95_ms': 10.0, 'queries_p50': 4}, {'p95_ms': 10.0, 'queries_p50': 9})
+
+
+# ----------------------------------------
+# Request profiling
+# ----------------------------------------
+@override_settings(REQUEST_PROFILING={'SAMPLE_RATE': 1.0, 'SLOW_REQUEST_MS': 60_000})
+class RequestProfilingTests(ViewTestCase):
+    def test_sampled_request_reports_templates_and_queries(self):
+        make_event("Profiled")
+        with self.assertLogs('events.profiling', 'DEBUG') as logs:
+            response = self.client.get(reverse('all_events'))
+
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries", tpl;dur=')
+        self.assertEqual(logs.records[0].levelname, 'DEBUG')
+        record = logs.records[0].profile
+        self.assertEqual(record['url_name'], 'all_events')
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+
+    def test_templates_outside_a_sampled_request_are_untouched(self):
+        self.assertFalse(hasattr(DjangoTemplate.render, 'profiling_wrapper'))
+        self.assertEqual(engines['django'].from_string("{{ x }}").render({'x': 1}), "1")
+
+    @override_settings(REQUEST_PROFILING={'SAMPLE_RATE': 0.0})
+    def test_unsampled_request_has_no_timing(self):
+        response = self.client.get(reverse('all_events'))
+        self.assertNotIn('Server-Timing', response)
+
+
+# ----------------------------------------
+# Image derivatives
+# ----------------------------------------
+def jpeg_upload(name, size, orientation=1):
+    exif = PILImage.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = "Camera maker"
+    buffer = BytesIO()
+    PILImage.new('RGB', size, (200, 30, 30)).save(buffer, 'JPEG', exif=exif.tobytes())
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings_override = override_settings(MEDIA_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_upload_gets_resized_oriented_exif_free_copies(self):
+        # Landscape pixels tagged "rotate 90°": a portrait photo off a phone.
+        event = make_event(image=jpeg_upload('photo.jpg', (2000, 1000), orientation=6))
+        image = event.image
+        self.assertTrue(has_derivatives(image))
+
+        for size, (box, crop) in IMAGE_DERIVATIVES.items():
+            for ext in IMAGE_FORMATS:
+                with default_storage.open(derivative_name(image.name, size, ext)) as fh:
+                    derivative = PILImage.open(fh)
+                    self.assertEqual(derivative.size, (box, box) if crop else (box // 2, box), (size, ext))
+                    self.assertFalse(derivative.getexif(), (size, ext))
+
+        html = responsive_image(image, 'card', alt="Photo")
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn(f'{default_storage.url(derivative_name(image.name, "card", "jpg"))} 480w', html)
+
+    def test_missing_derivatives_fall_back_to_the_original(self):
+        name = default_storage.save('event_images/plain.jpg', jpeg_upload('plain.jpg', (40, 20)))
+        image = Event(image=name).image
+        self.assertEqual(derivative_urls(image, 'webp'), [])
+        self.assertEqual(responsive_image(image), f'<img src="{image.url}" loading="lazy" >')
+
+
+# ----------------------------------------
+# Event filters and the JSON API
+# ----------------------------------------
+class EventFilterTests(ViewTestCase):
+    def test_api_filters_and_pages(self):
+        music = Category.objects.create(name='MUSIC')
+        make_event("Gig", category=music, days=3)
+        make_event("Picnic", days=3)
+        make_event("Next month", category=music, days=40)
+
+        start, end = date.today(), date.today() + timedelta(days=7)
+        response = self.client.get(reverse('events_api'), {
+            'category': music.pk, 'start_date': start.isoformat(), 'end_date': end.isoformat(), 'fields': 'name',
+        })
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(body['results'], [{'name': "Gig"}])
+        self.assertIsNone(body['next'])
+
+    def test_malformed_filters_are_bad_requests(self):
+        for params in [
+            {'category': 'music'},
+            {'category': '99999999999999999999'},
+            {'start_date': '2024-13-01', 'end_date': '2024-12-31'},
+            {'start_date': '2024-01-01', 'end_date': 'tomorrow'},
+        ]:
+            response = self.client.get(reverse('events_api'), params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+            self.assertEqual(self.client.get(reverse('all_events'), params).status_code, 400, params)
+
+
+# ----------------------------------------
+# Conditional GET
+# ----------------------------------------
+class ConditionalGetTests(ViewTestCase):
+    def test_unchanged_pages_revalidate_with_304(self):
+        event = make_event()
+        url = reverse('event_detail', args=[event.pk])
+        response = self.client.get(url)
+        self.assertIn('max-age', response['Cache-Control'])
+
+        response = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_upcoming_validators_change_when_an_event_starts(self):
+        event = make_event("Sunrise yoga", days=1)
+        # Last written an hour ago, as far as the validators can tell.
+        Event.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        Category.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        url = reverse('all_events') + '?upcoming=1'
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': first['ETag']}).status_code, 304)
+
+        Event.objects.filter(pk=event.pk).update(starts_at=timezone.now() - timedelta(minutes=1))
+        for headers in ({'If-None-Match': first['ETag']}, {'If-Modified-Since': first['Last-Modified']}):
+            response = self.client.get(url, headers=headers)
+            self.assertEqual(response.status_code, 200, headers)
+            self.assertNotContains(response, "Sunrise yoga")
+
+
+    def test_listing_validators_change_with_participant_attendance(self):
+        event = make_event()
+        participant = Participant.objects.create(name="Walk-in", email="walkin@example.com")
+        url = reverse('all_events')
+
+        for change in (
+            lambda: Attendance.objects.create(event=event, participant=participant),
+            participant.delete,
+        ):
+            Event.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+            Category.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+            first = self.client.get(url)
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            for headers in ({'If-None-Match': first['ETag']}, {'If-Modified-Since': first['Last-Modified']}):
+                self.assertEqual(self.client.get(url, headers=headers).status_code, 200, headers)
+
+
+# ----------------------------------------
+# Bulk user actions
+# ----------------------------------------
+class BulkUserActionTests(ViewTestCase):
+    def test_change_role_moves_every_selected_member(self):
+        admin = make_user("admin", is_superuser=True)
+        members = [make_user(f"member{i}") for i in range(5)]
+        for member in members:
+            self.assertFalse(get_roles(member).is_organizer)
+
+        with patch('events.views.USER_ACTION_BATCH_SIZE', 2), CaptureQueriesContext(connection) as queries:
+            count = bulk_user_action('change_role', User.objects.all(), admin, 'Organizer')
+
+        self.assertEqual(count, 5)
+        for member in members:
+            self.assertEqual(list(member.groups.values_list('name', flat=True)), ['Organizer'])
+            self.assertTrue(get_roles(User.objects.get(pk=member.pk)).is_organizer)
+        self.assertEqual(list(admin.groups.values_list('name', flat=True)), ['Participant'])
+
+        delete = next(query['sql'] for query in queries if query['sql'].startswith('DELETE'))
+        self.assertIn('IN (SELECT', delete)
+
+
+# ----------------------------------------
+# Event.save() and rsvp_count
+# ----------------------------------------
+class EventSaveTests(TestCase):
+    def setUp(self):
+        self.event = make_event("Launch")
+        self.guest = make_user("guest")
+
+    def test_stale_instance_keeps_concurrent_rsvps(self):
+        Event.objects.get(pk=self.event.pk).rsvps.add(self.guest)
+        self.event.name = "Launch party"
+        self.event.save()
+        self.assertEqual(Event.objects.values_list('name', 'rsvp_count').get(), ("Launch party", 1))
+
+    def test_deleted_row_is_saved_back(self):
+        self.event.rsvps.add(self.guest)
+        self.event.refresh_from_db()
+        Event.objects.filter(pk=self.event.pk).delete()
+
+        self.event.save()
+        # Its attendance went with the delete, so it comes back with none.
+        self.assertEqual(Event.objects.values_list('pk', 'rsvp_count').get(), (self.event.pk, 0))
+
+    def test_deferred_instance_saves_what_was_loaded(self):
+        self.event.rsvps.add(self.guest)
+        before = Event.objects.get(pk=self.event.pk)
+
+        event = Event.objects.only('name').get(pk=self.event.pk)
+        event.name = "Launch party"
+        event.save()
+
+        after = Event.objects.get(pk=self.event.pk)
+        self.assertEqual((after.name, after.rsvp_count), ("Launch party", 1))
+        self.assertEqual((after.date, after.starts_at), (before.date, before.starts_at))
+        self.assertGreater(after.updated_at, before.updated_at)
+
+    def test_update_fields_can_still_write_the_count(self):
+        self.event.rsvp_count = 5
+        self.event.save(update_fields=['rsvp_count'])
+        self.assertEqual(Event.objects.values_list('rsvp_count', flat=True).get(), 5)
+
+
+# ----------------------------------------
+# Statistics rollups
+# ----------------------------------------
+class StatRollupTests(TestCase):
+    def assertRollupsMatchRebuild(self):
+        current = {
+            (metric, dimension, period): value
+            for metric, dimension, period, value
+            in StatRollup.objects.exclude(value=0).values_list('metric', 'dimension', 'period', 'value')
+        }
+        self.assertEqual(current, {(m, d, p): v for m, d, p, v in compute_rollups()})
+
+    def test_attendance_is_counted_on_the_day_it_was_made(self):
+        event = make_event(days=40)
+        today = timezone.localdate()
+        event.rsvps.add(make_user("guest"))
+        book_seat(event.pk, make_user("other").pk)
+
+        self.assertEqual(dict(dashboard_stats()['rsvps_by_day'])[today], 2)
+        self.assertRollupsMatchRebuild()
+
+    def test_attendance_stays_put_when_the_event_moves(self):
+        event = make_event()
+        guest = make_user("guest")
+        event.rsvps.add(guest, make_user("other"))
+        Attendance.objects.filter(user=guest).update(created_at=timezone.now() - timedelta(days=3))
+        rebuild_rollups()
+
+        event.date += timedelta(days=10)
+        event.save()
+        self.assertRollupsMatchRebuild()
+        event.rsvps.remove(guest)
+        self.assertRollupsMatchRebuild()
+        guest.delete()
+        event.delete()
+        self.assertRollupsMatchRebuild()
+        self.assertEqual(total_attendance(), 0)
+
+
+# ----------------------------------------
+# Async read views
+# ----------------------------------------
+# ROOT_URLCONF for AsyncViewTests: the routes events/urls.py picks under ASGI,
+# ahead of the rest of the site (templates reverse the named ones).
+urlpatterns = [
+    path('events/all_events/', async_views.all_events),
+    path('events/event/<int:event_id>/', async_views.event_detail),
+    path('events/dashboard/attended-events/', async_views.attended_events),
+    *root_urls.urlpatterns,
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewTests(ViewTestCase):
+    async def test_event_detail_is_cached_for_anonymous_visitors(self):
+        event = await sync_to_async(make_event)("Night market")
+        url = reverse('event_detail', args=[event.pk])
+        response = await self.async_client.get(url)
+        self.assertIs(response.resolver_match.func, async_views.event_detail)
+        self.assertContains(response, "Night market")
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertEqual((await self.async_client.get(url))['X-Page-Cache'], 'HIT')
+
+        response = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+        response = await self.async_client.get(reverse('event_detail', args=[event.pk + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_all_events_filters_and_pages(self):
+        music = await Category.objects.acreate(name='MUSIC')
+        for i in range(EVENTS_PER_PAGE + 1):
+            await sync_to_async(make_event)(f"Gig {i}", category=music)
+        await sync_to_async(make_event)("Picnic")
+
+        response = await self.async_client.get(reverse('all_events'), {'category': music.pk})
+        self.assertEqual(len(response.context['events']), EVENTS_PER_PAGE)
+        self.assertNotContains(response, "Picnic")
+        self.assertTrue(response.context['page_obj'].has_next)
+
+        response = await self.async_client.get(reverse('all_events'), {'category': 'music'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_attended_events_needs_a_login(self):
+        event = await sync_to_async(make_event)()
+        user = await sync_to_async(make_user)("guest")
+        await event.rsvps.aadd(user)
+        url = reverse('attended_events')
+
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 302)
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(url)
+        self.assertContains(response, reverse('event_detail', args=[event.pk]))
+
+
+# ----------------------------------------
+# Booking seats
+# ----------------------------------------
+class BookSeatTests(TransactionTestCase):
+    def book_concurrently(self, event, user_ids):
+        barrier = threading.Barrier(len(user_ids))
+
+        def book(user_id):
+            try:
+                barrier.wait()
+                return book_seat(event.pk, user_id)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(user_ids)) as pool:
+            return list(pool.map(book, user_ids))
+
+    def test_concurrent_bookings_never_overfill(self):
+        event = make_event(capacity=3)
+        users = [make_user(f"guest{i}") for i in range(8)]
+
+        outcomes = self.book_concurrently(event, [user.pk for user in users])
+
+        self.assertEqual(outcomes.count(BOOKED), 3)
+        self.assertEqual(outcomes.count(FULL), 5)
+        event.refresh_from_db()
+        self.assertEqual(event.rsvp_count, 3)
+        self.assertEqual(Attendance.objects.filter(event=event).count(), 3)
+
+    def test_repeat_clicks_book_one_seat(self):
+        event = make_event(capacity=5)
+        user = make_user("guest")
+
+        outcomes = self.book_concurrently(event, [user.pk] * 6)
+
+        self.assertEqual(sorted(outcomes), [ALREADY_BOOKED] * 5 + [BOOKED])
+        event.refresh_from_db()
+        self.assertEqual(event.rsvp_count, 1)
+        self.assertEqual(Attendance.objects.filter(event=event, user=user).count(), 1)
+
+    def test_rsvp_view_books_outside_a_transaction(self):
+        # A view-wide transaction would hold the event row lock until the
+        # response is built.
+        event = make_event()
+        self.client.force_login(make_user("guest"))
+        in_atomic = []
+
+        def booking(*args):
+            in_atomic.append(connection.in_atomic_block)
+            return book_seat(*args)
+
+        with patch('events.views.book_seat', booking):
+            self.client.post(reverse('rsvp_event', args=[event.pk]))
+
+        self.assertEqual(in_atomic, [False])
+        self.assertEqual(Attendance.objects.filter(event=event).count(), 1)
+
+
+# ----------------------------------------
+# Rate limiting and load shedding
+# ----------------------------------------
+class ThrottlingTests(ViewTestCase):
+    def test_window_allows_the_limit_then_slides(self):
+        self.assertEqual([hit_window('k', 3, 60, now=10) for _ in range(4)], [0, 0, 0, 50])
+        # Five sixths of the previous window still overlap: 2.5 + 1 is too many.
+        self.assertEqual(hit_window('k', 3, 60, now=70), 10)
+        self.assertEqual(hit_window('k', 3, 60, now=80), 0)
+
+    def test_concurrent_requests_never_share_the_last_slot(self):
+        barrier = threading.Barrier(20)
+
+        def hit(_):
+            barrier.wait()
+            return hit_window('race', 5, 60)
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            outcomes = list(pool.map(hit, range(20)))
+        self.assertEqual(outcomes.count(0), 5)
+
+    def test_rate_limited_post_gets_429(self):
+        url = reverse('login')
+        limit = settings.RATE_LIMITS['login']['ip'][0]
+        for _ in range(limit):
+            self.assertNotEqual(self.client.post(url, {}).status_code, 429)
+        response = self.client.post(url, {})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_rsvp_books_only_on_post(self):
+        # GET is neither rate limited nor CSRF checked.
+        event = make_event()
+        self.client.force_login(make_user("guest"))
+
+        response = self.client.get(reverse('rsvp_event', args=[event.pk]))
+
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(Attendance.objects.filter(event=event).exists())
+
+    def test_streaming_response_holds_its_slot_until_closed(self):
+        middleware = AdmissionControlMiddleware(lambda request: StreamingHttpResponse(iter([b"row"])))
+        middleware.in_flight = InFlight(1)
+        request = RequestFactory().get('/')
+
+        streaming = middleware(request)
+        self.assertEqual(middleware(request).status_code, 503)
+        self.assertEqual(b''.join(streaming.streaming_content), b"row")
+        streaming.close()
+        self.assertEqual(middleware(request).status_code, 200)
+
+
+# ----------------------------------------
+# Bulk import
+# ----------------------------------------
+class ImportTests(TestCase):
+    def setUp(self):
+        Category.objects.create(name='CASUAL')
+        Category.objects.create(name='WEDDING')
+
+    def test_csv_rows_import_or_report_their_line(self):
+        csv_file = StringIO(
+            "Name,Date,Time,Location,Category,Capacity\r\n"
+            "Beach cleanup,2030-05-01,09:00,Cox's Bazar,,\r\n"
+            "Bad date,2030-02-30,09:00,Dhaka,,\r\n"
+            "Mystery,2030-05-02,10:00,Dhaka,Funeral,\r\n"
+            "Reception,2030-05-03,19:30,Dhaka,wedding party,120\r\n"
+        )
+        result = import_events(parse_csv(csv_file), chunk_size=1)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([line for line, _ in result.errors], [3, 4])
+        self.assertIn("date:", result.errors[0][1])
+        self.assertIn('unknown category "Funeral"', result.errors[1][1])
+
+        reception = Event.objects.get(name="Reception")
+        self.assertEqual((reception.category.name, reception.capacity), ('WEDDING', 120))
+        self.assertEqual(reception.starts_at, Event.combine_starts_at(date(2030, 5, 3), time(19, 30)))
+        # bulk_create skips the signals; the importer indexes the rows itself.
+        self.assertEqual(list(filter_events(Event.objects.all(), {'q': 'cleanup'})), [Event.objects.get(name="Beach cleanup")])
+
+    def test_ics_folding_escapes_and_utc_times(self):
+        ics_file = StringIO(
+            "BEGIN:VCALENDAR\r\n"
+            "BEGIN:VEVENT\r\n"
+            "SUMMARY:Potluck\\, dessert\r\n"
+            " s welcome\r\n"
+            "DTSTART:20300601T120000Z\r\n"
+            "LOCATION:Dhaka\r\n"
+            "END:VEVENT\r\n"
+            "END:VCALENDAR\r\n"
+        )
+        result = import_events(parse_ics(ics_file))
+
+        self.assertEqual((result.created, result.errors), (1, []))
+        event = Event.objects.get()
+        self.assertEqual(event.name, "Potluck, desserts welcome")
+        self.assertEqual(event.starts_at, datetime(2030, 6, 1, 12, 0, tzinfo=dt_timezone.utc))
+
+
+# ----------------------------------------
+# Attendee export
+# ----------------------------------------
+class ExportTests(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        self.organizer = make_user("organizer")
+        Group.objects.get_or_create(name='Organizer')[0].user_set.add(self.organizer)
+        self.event = make_event(created_by=self.organizer)
+        self.url = reverse('export_attendees', args=[self.event.pk])
+
+    def download(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-store')
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_rsvps_and_participants_in_rsvp_order(self):
+        self.event.rsvps.add(make_user("ayesha", first_name="Ayesha", last_name="Khan"))
+        participant = Participant.objects.create(name="=HYPERLINK(\"x\")", email="walkin@example.com")
+        Attendance.objects.create(event=self.event, participant=participant)
+        self.client.force_login(self.organizer)
+
+        self.assertEqual(self.download().splitlines(), [
+            "source,name,email,username",
+            "rsvp,Ayesha Khan,ayesha@example.com,ayesha",
+            'participant,"=HYPERLINK(""x"")",walkin@example.com,',
+        ])
+        excel = self.download(format='excel')
+        self.assertTrue(excel.startswith('\ufeff'))
+        self.assertIn('"\'=HYPERLINK(""x"")"', excel)
+
+    def test_only_the_organizer_or_an_admin_may_export(self):
+        other = make_user("other")
+        Group.objects.get(name='Organizer').user_set.add(other)
+        self.client.force_login(other)
+        self.assertRedirects(self.client.get(self.url), reverse('dashboard_redirect'), fetch_redirect_response=False)
+
+        self.client.force_login(make_user("admin", is_superuser=True))
+        self.assertTrue(self.download().startswith("source,"))
+
+
+# ----------------------------------------
+# Calendar feeds
+# ----------------------------------------
+class CalendarFeedTests(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("guest")
+        self.event = make_event("Harbour walk")
+        self.url = reverse('calendar_feed_attending', args=[calendar_token(self.user)])
+
+    def poll(self, **headers):
+        return self.client.get(self.url, headers=headers)
+
+    def test_feed_is_cached_revalidated_and_dropped_on_rsvp(self):
+        response = self.poll(host='mirror.example.net')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "Harbour walk")
+        self.assertEqual(self.poll(**{'If-None-Match': response['ETag']}).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.rsvps.add(self.user)
+        response = self.poll()
+        self.assertContains(response, "SUMMARY:Harbour walk")
+        # Links point at the site, not at whichever host the first poll used.
+        self.assertContains(response, f"URL:{settings.FRONTEND_URL.rstrip('/')}/events/event/{self.event.pk}/")
+        self.assertNotContains(response, "mirror.example.net")
+
+    def test_gzipped_feed_revalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                make_event(f"Gathering {i}").rsvps.add(self.user)
+        response = self.poll(**{'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        # GZipMiddleware weakens the ETag; the client sends back what it got.
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertEqual(self.poll(**{'Accept-Encoding': 'gzip', 'If-None-Match': response['ETag']}).status_code, 304)
+
+    def test_deactivated_or_deleted_users_lose_their_feed(self):
+        self.assertEqual(self.poll().status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.poll().status_code, 404)
+
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.poll().status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_user_action('deactivate', User.objects.filter(pk=self.user.pk), make_user("admin"))
+        self.assertEqual(self.poll().status_code, 404)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.assertEqual(self.poll().status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(self.poll().status_code, 404)
+
+
+# ----------------------------------------
+# Event calendar
+# ----------------------------------------
+class CalendarViewTests(ViewTestCase):
+    def test_month_grid_lists_and_counts_events(self):
+        music = Category.objects.create(name='MUSIC')
+        event = make_event("Jazz night", category=music, days=0)
+        response = self.client.get(reverse('events_calendar'), {'category': music.pk})
+        self.assertContains(response, "Jazz night")
+        self.assertContains(response, f'<option value="{music.pk}" selected>', html=False)
+        self.assertEqual(response.context['anchor'], event.date)
+
+    def test_out_of_range_anchors_are_clamped(self):
+        for kind in ('month', 'week'):
+            for day, anchor in [('9999-12-31', date(9999, 11, 30)), ('0001-01-01', date(1, 2, 1))]:
+                response = self.client.get(reverse('events_calendar'), {'view': kind, 'date': day})
+                self.assertEqual(response.status_code, 200, (kind, day))
+                self.assertEqual(response.context['anchor'], anchor)
+
+        response = self.client.get(reverse('events_calendar'), {'category': '99999999999999999999'})
+        self.assertEqual(response.status_code, 200)
+
+
+# ----------------------------------------
+# Events near a place
+# ----------------------------------------
+class NearbyTests(ViewTestCase):
+    def test_radius_falls_back_on_non_finite_values(self):
+        for value in ('nan', 'inf', '-inf', 'km'):
+            self.assertEqual(search_radius({'radius': value}), DEFAULT_RADIUS_KM, value)
+        self.assertEqual(search_radius({'radius': '100000'}), MAX_RADIUS_KM)
+
+        make_event("Old Dhaka walk", location="Dhaka", latitude=23.71, longitude=90.41)
+        make_event("Tea garden tour", location="Sylhet", latitude=24.89, longitude=91.87)
+        response = self.client.get(reverse('all_events'), {'near': 'Dhaka', 'radius': 'nan'})
+        self.assertContains(response, "Old Dhaka walk")
+        self.assertNotContains(response, "Tea garden tour")
+
+    def edit(self, event, **changes):
+        data = {
+            'name': event.name, 'date': event.date, 'time': event.time, 'location': event.location,
+            'latitude': event.latitude, 'longitude': event.longitude, 'category': event.category_id,
+            **changes,
+        }
+        form = EventModelForm(data={key: '' if value is None else value for key, value in data.items()}, instance=event)
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.save()
+
+    def test_moving_an_event_relocates_or_unplaces_it(self):
+        event = make_event(location="Dhaka")
+        self.assertEqual((event.latitude, event.longitude), (None, None))
+        event = self.edit(event)
+        self.assertAlmostEqual(event.latitude, 23.8103)
+
+        event = self.edit(event, location="Sylhet")
+        self.assertAlmostEqual(event.longitude, 91.8687)
+        event = self.edit(event, location="Nowhere in particular")
+        self.assertEqual((event.latitude, event.longitude, event.geo_cell), (None, None, None))
+        # Coordinates typed in along with the move are kept.
+        event = self.edit(event, location="A field", latitude=22.5, longitude=91.0)
+        self.assertEqual((event.latitude, event.longitude), (22.5, 91.0))
+
+
+# ----------------------------------------
+# Attendance
+# ----------------------------------------
+class AttendanceTests(TestCase):
+    def test_rows_follow_the_event_date_and_order_attended_events(self):
+        user = make_user("guest")
+        later, sooner = make_event("Later", days=20), make_event("Sooner", days=2)
+        later.rsvps.add(user)
+        sooner.rsvps.add(user)
+        self.assertEqual(list(Event.objects.attended_by(user)), [later, sooner])
+
+        sooner.date = date.today() + timedelta(days=30)
+        sooner.save()
+        self.assertEqual(Attendance.objects.get(event=sooner).event_date, sooner.date)
+        self.assertEqual(list(Event.objects.attended_by(user)), [sooner, later])
+
+    def test_a_row_is_one_user_or_one_participant(self):
+        event = make_event()
+        participant = Participant.objects.create(name="Walk-in", email="walkin@example.com")
+        for fields in [{}, {'user': make_user("both"), 'participant': participant}]:
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                Attendance.objects.create(event=event, **fields)
+        Attendance.objects.create(event=event, participant=participant)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Attendance.objects.create(event=event, participant=participant)
+
+
+class AttendanceMigrationTests(TransactionTestCase):
+    before = [('events', '0010_event_geo')]
+    after = [('events', '0013_attendance_through')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def test_both_link_tables_merge_into_attendance(self):
+        self.addCleanup(self.migrate, MigrationExecutor(connection).loader.graph.leaf_nodes())
+        apps = self.migrate(self.before)
+        OldEvent, OldParticipant = apps.get_model('events', 'Event'), apps.get_model('events', 'Participant')
+        OldUser = apps.get_model('users', 'CustomUser')
+
+        category = apps.get_model('events', 'Category').objects.create(name='CASUAL')
+        day = date(2030, 1, 15)
+        event = OldEvent.objects.create(
+            name="Reunion", date=day, time=time(18, 0), location="Dhaka", category=category,
+            starts_at=Event.combine_starts_at(day, time(18, 0)),
+        )
+        users = [OldUser.objects.create(username=f"guest{i}") for i in range(3)]
+        event.rsvps.add(*users)
+        participant = OldParticipant.objects.create(name="Walk-in", email="walkin@example.com")
+        participant.events.add(event)
+
+        apps = self.migrate(self.after)
+        rows = apps.get_model('events', 'Attendance').objects.filter(event_id=event.pk)
+        self.assertCountEqual(
+            rows.values_list('user_id', 'participant_id', 'event_date'),
+            [(user.pk, None, day) for user in users] + [(None, participant.pk, day)],
+        )
+
+
+# ----------------------------------------
+# Search
+# ----------------------------------------
+class SearchTests(TestCase):
+    def test_filtered_search_keeps_low_ranked_matches(self):
+        casual = Category.objects.create(name='CASUAL')
+        wedding = Category.objects.create(name='WEDDING')
+        starts_at = Event.combine_starts_at(date(2026, 1, 1), time(18, 0))
+        strong = Event.objects.bulk_create(
+            Event(name=f"Jazz night {i}", category=casual, date=date(2026, 1, 1), time=time(18, 0),
+                  location="Dhaka", starts_at=starts_at)
+            for i in range(501)
+        )
+        get_search_backend().index_events(strong)
+        # Only the description mentions jazz: it ranks below all 501 above.
+        weak = make_event("Reception", category=wedding, description="Live jazz band")
+
+        results = filter_events(Event.objects.all(), {'q': 'jazz', 'category': str(wedding.pk)})
+        self.assertEqual(list(results), [weak])
+        self.assertEqual(filter_events(Event.objects.all(), {'q': 'jazz'}).count(), 502)
+
+    def test_search_results_page_by_rank(self):
+        for i in range(7):
+            make_event(f"Jazz {i}", description="jazz " * i)
+        results = filter_events(Event.objects.all(), {'q': 'jazz'})
+        paginator = KeysetPaginator(results, per_page=3, ordering=event_ordering(results, {'q': 'jazz'}))
+
+        seen, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            seen += [event.pk for event in page]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, list(results.order_by('search_rank', 'id').values_list('pk', flat=True)))
+        self.assertEqual(len(seen), 7)
+
+
+# ----------------------------------------
+# Static and media delivery
+# ----------------------------------------
+# First visit to the home page, third-party scripts aside: compressed HTML,
+# CSS and the images it references.
+HOME_PAGE_BUDGET = 300 * 1024
+
+STATIC_URL_RE = re.compile(r'/static/[^"\'()\s]+')
+
+
+class DeliveryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, root)
+        settings_override = override_settings(
+            STATIC_ROOT=os.path.join(root, 'static'),
+            MEDIA_ROOT=os.path.join(root, 'media'),
+        )
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def fetch(self, url, **headers):
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate, br', **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_home_page_bytes(self):
+        response, body = self.fetch('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        html = gzip.decompress(body).decode()
+        transferred = {'/': len(body)}
+
+        assets = set(STATIC_URL_RE.findall(html))
+        self.assertTrue(assets)
+        for url in assets:
+            response, body = self.fetch(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertIn('immutable', response['Cache-Control'], url)
+            if url.endswith('.css'):
+                self.assertEqual(response['Content-Encoding'], 'br', url)
+            transferred[url] = len(body)
+
+        total = sum(transferred.values())
+        self.assertLessEqual(total, HOME_PAGE_BUDGET, transferred)
+
+    def test_uploaded_media(self):
+        name = default_storage.save('event_images/photo.jpg', SimpleUploadedFile('photo.jpg', b'\xff\xd8' + bytes(998)))
+        self.assertTrue(is_fingerprinted(name))
+
+        response, body = self.fetch(f'/media/{name}', HTTP_RANGE='bytes=0-99')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 0-99/1000')
+        self.assertEqual(len(body), 100)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertNotIn('Content-Encoding', response)
+
+        response, _ = self.fetch(f'/media/{name}', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,122 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# ----------------------------------------
+# Rate limiting (sliding windows in the cache)
+# ----------------------------------------
+# Every (URL name, scope, client) pair may make ``limit`` requests in any
+# ``period`` seconds, refused with 429 past that. Requests are counted per
+# fixed window of ``period`` seconds with cache.add() + cache.incr(), which
+# are atomic in Redis and the local-memory cache, so concurrent requests
+# each get a distinct count and never share the last slot. The window ending
+# now is estimated from the current count plus the previous window's, weighted
+# by how much of it still overlaps. Counters live in the shared cache, so the
+# limit holds across workers.
+
+# URL name -> {scope: (limit, period in seconds)}; scope is "ip" or "user".
+RATE_LIMITS = getattr(settings, 'RATE_LIMITS', {})
+RATE_LIMITED_METHODS = getattr(settings, 'RATE_LIMITED_METHODS', {'POST'})
+# Behind a reverse proxy REMOTE_ADDR is the proxy; name the header it sets,
+# e.g. "HTTP_X_FORWARDED_FOR".
+RATE_LIMIT_CLIENT_IP_HEADER = getattr(settings, 'RATE_LIMIT_CLIENT_IP_HEADER', '')
+
+THROTTLE_STATS_KEY = 'throttle:stats:{name}'
+
+
+def client_ip(request):
+    if RATE_LIMIT_CLIENT_IP_HEADER:
+        forwarded = request.META.get(RATE_LIMIT_CLIENT_IP_HEADER, '')
+        # The proxy appends the address it saw; earlier entries are whatever
+        # the client chose to send.
+        addresses = [address.strip() for address in forwarded.split(',') if address.strip()]
+        if addresses:
+            return addresses[-1]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def hit_window(key, limit, period, now=None):
+    """Count a request against ``key``; returns 0 if allowed, else seconds until it would be."""
+    now = time.time() if now is None else now
+    window, elapsed = divmod(now, period)
+    current_key, previous_key = f'{key}:{int(window)}', f'{key}:{int(window) - 1}'
+    # Kept for two periods: the next window still weighs this one.
+    cache.add(current_key, 0, timeout=math.ceil(2 * period))
+    current = cache.incr(current_key)
+    previous = cache.get(previous_key, 0)
+    overlap = 1 - elapsed / period
+    if current + previous * overlap <= limit:
+        return 0
+    # Refused requests don't count, or a client retrying early would never get in.
+    cache.decr(current_key)
+    if current > limit:
+        # This window alone is full: wait for the next one.
+        wait = period - elapsed
+    else:
+        # The previous window's share still has to drain.
+        wait = (current + previous * overlap - limit) * period / previous
+    return max(math.ceil(wait), 1)
+
+
+def check_rate_limits(url_name, ip, user_id=None):
+    """Seconds to wait before ``url_name`` may be requested again, or 0."""
+    limits = RATE_LIMITS.get(url_name)
+    if not limits:
+        return 0
+    idents = {'ip': ip, 'user': user_id}
+    for scope, (limit, period) in limits.items():
+        ident = idents.get(scope)
+        if ident in (None, ''):
+            continue
+        retry_after = hit_window(f'throttle:{url_name}:{scope}:{ident}', limit, period)
+        if retry_after:
+            record_rejection(f'{url_name}:{scope}')
+            return retry_after
+    return 0
+
+
+# ----------------------------------------
+# Admission control (per process)
+# ----------------------------------------
+# Past MAX_CONCURRENT_REQUESTS in-flight requests a worker sheds new ones with
+# 503 instead of queueing them for a database connection that won't come.
+
+MAX_CONCURRENT_REQUESTS = getattr(settings, 'MAX_CONCURRENT_REQUESTS', 0)
+
+
+class InFlight:
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            if self.limit and self.count >= self.limit:
+                return False
+            self.count += 1
+            return True
+
+    def leave(self):
+        with self.lock:
+            self.count -= 1
+
+
+# - - - - - - - - - - #
+#      Counters       #
+# - - - - - - - - - - #
+def record_rejection(name):
+    key = THROTTLE_STATS_KEY.format(name=name)
+    cache.add(key, 0, timeout=None)
+    cache.incr(key)
+
+
+def throttle_stats():
+    names = [f'{url_name}:{scope}' for url_name, limits in RATE_LIMITS.items() for scope in limits]
+    names.append('shed')
+    values = cache.get_many([THROTTLE_STATS_KEY.format(name=name) for name in names])
+    return {name: values.get(THROTTLE_STATS_KEY.format(name=name), 0) for name in names}
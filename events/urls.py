@@ -1,15 +1,24 @@
+from django.conf import settings
 from django.urls import path, reverse_lazy
 from django.contrib.auth import views as auth_views
+from . import async_views
+from .api import events_api
+from .feeds import ATTENDING, ORGANIZING
 from .views import (
     home,
     DashboardView,
     AllEventsView,
+    calendar_view,
     AddEventView,
     redirect_dashboard,
     EventDetailView,
     EditEventView,
     delete_event,
     rsvp_event,
+    import_events_view,
+    export_attendees,
+    calendar_feeds_view,
+    calendar_feed,
     users_control_view,
     events_control_view,
     categories_control_view,
@@ -20,26 +29,46 @@ from .views import (
     CustomPasswordResetView
 )
 
+# Read-heavy pages: native async views under ASGI, the sync ones under WSGI
+# (where an async view would need an event loop per request).
+if settings.ASYNC_READ_VIEWS:
+    home_view = async_views.home
+    all_events_view = async_views.all_events
+    event_detail_view = async_views.event_detail
+    attended_events_view = async_views.attended_events
+else:
+    home_view = home
+    all_events_view = AllEventsView.as_view()
+    event_detail_view = EventDetailView.as_view()
+    attended_events_view = attended_events
+
 urlpatterns = [
-    path('home/', home, name='home'),
+    path('home/', home_view, name='home'),
 
-    path('all_events/', AllEventsView.as_view(), name='all_events'),
+    path('all_events/', all_events_view, name='all_events'),
+    path('calendar/', calendar_view, name='events_calendar'),
+    path('api/events/', events_api, name='events_api'),
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
 
     path('dashboard/profile/', profile_view, name='profile'),
     path('dashboard/profile/edit/', edit_profile, name='edit_profile'),
 
-    path('event/<int:event_id>/', EventDetailView.as_view(), name='event_detail'),
+    path('event/<int:event_id>/', event_detail_view, name='event_detail'),
     path('event/<int:event_id>/rsvp/', rsvp_event, name='rsvp_event'),
+    path('dashboard/<int:event_id>/attendees.csv', export_attendees, name='export_attendees'),
 
     path('dashboard/users/', users_control_view, name='users_control'),
     path('dashboard/events/control/', events_control_view, name='events_control'),
     path('dashboard/add_event/', AddEventView.as_view(), name='add_event'),
+    path('dashboard/import-events/', import_events_view, name='import_events'),
     path('dashboard/<int:event_id>/edit/', EditEventView.as_view(), name='edit_event'),
     path('dashboard/<int:event_id>/delete/', delete_event, name='delete_event'),
     path('dashboard/categories/control/', categories_control_view, name='categories_control'),
 
-    path('dashboard/attended-events/', attended_events, name='attended_events'),
+    path('dashboard/attended-events/', attended_events_view, name='attended_events'),
+    path('dashboard/calendar/', calendar_feeds_view, name='calendar_feeds'),
+    path('calendar/<str:token>/attending.ics', calendar_feed, {'kind': ATTENDING}, name='calendar_feed_attending'),
+    path('calendar/<str:token>/organizing.ics', calendar_feed, {'kind': ORGANIZING}, name='calendar_feed_organizing'),
     path('dashboard/redirect/', redirect_dashboard, name='dashboard_redirect'),
 
 
@@ -1,22 +1,54 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+import calendar
 from datetime import date
+from itertools import islice
+from django.utils import timezone
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import Group
-from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
 from django.views.generic import TemplateView, ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET, require_POST
+from django.utils.decorators import method_decorator
 from django.contrib.auth.views import PasswordChangeView
 from django.contrib.auth.views import PasswordResetView
 
+from .calendar_grid import FIRST_WEEKDAY, build_weeks, clamp_anchor, shift
+from .booking import ALREADY_BOOKED, FULL, book_seat
+from .exports import attendee_rows, csv_chunks, streaming_csv_response
+from .feeds import cached_feed, calendar_token, invalidate_feeds, reset_calendar_token
 from .forms import EventModelForm
-from .models import Event, Participant, Category
+from .importer import CSV_COLUMNS, detect_format, import_events, parse_csv, parse_ics, text_stream
+from .models import Event, Category
+from .pagination import KeysetPaginator
+from .filters import InvalidFilter, filter_events, filter_context, event_ordering, parse_category, upcoming_cutoff
+from .roles import get_roles, invalidate_roles
+from .page_cache import cache_anonymous_page
+from .conditional import conditional_page, event_last_modified, events_last_modified
+from .outbox import queue_mail
+from .stats import dashboard_stats, record_group_members, record_user_activity, total_attendance
+
+EVENTS_PER_PAGE = 25
+USERS_PER_PAGE = 50
+USER_ACTION_BATCH_SIZE = 500
+IMPORT_ERRORS_SHOWN = 200
+
+# action -> past-tense message, shown as "<n> user(s): <message>."
+USER_BULK_ACTIONS = {
+    'activate': 'activated',
+    'deactivate': 'deactivated',
+    'change_role': 'role changed to {role}',
+    'delete': 'deleted',
+}
 
 # Try to import OrganizerProfile if it exists (optional profile model)
 try:
@@ -29,12 +61,7 @@ except Exception:
 # ----------------------------------------
 def group_required(*group_names):
     def in_groups(u):
-        if u.is_authenticated:
-            if u.is_superuser:
-                return True
-            if u.groups.filter(name__in=group_names).exists():
-                return True
-        return False
+        return u.is_authenticated and get_roles(u).in_groups(group_names)
     return user_passes_test(in_groups)
 
 # ----------------------------------------
@@ -44,10 +71,7 @@ class GroupRequiredMixin(UserPassesTestMixin):
     group_names = []
 
     def test_func(self):
-        user = self.request.user
-        if user.is_superuser:
-            return True
-        return user.groups.filter(name__in=self.group_names).exists()
+        return get_roles(self.request.user).in_groups(self.group_names)
 
     def handle_no_permission(self):
         messages.error(self.request, "You do not have permission to access this page.")
@@ -63,70 +87,67 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
-        is_admin = user.is_superuser or user.groups.filter(name='Admin').exists()
-        is_organizer = user.groups.filter(name='Organizer').exists()
-        is_participant = not (is_admin or is_organizer)
+        roles = get_roles(user)
 
         context.update({
             "user": user,
-            "is_admin": is_admin,
-            "is_organizer": is_organizer,
-            "is_participant": is_participant,
-            "can_add_event": is_admin or is_organizer,
             "show_profile_edit": True,
         })
 
-        if is_admin:
-            context["users"] = User.objects.all()
-            context["total_events"] = Event.objects.count()
-        elif is_organizer:
-            context["events"] = Event.objects.filter(created_by=user).order_by('-date')
+        if roles.is_admin:
+            context["stats"] = dashboard_stats()
+        elif roles.is_organizer:
+            context["events"] = Event.objects.organized_by(user)
         else:
-            context["events"] = Event.objects.filter(rsvps=user).order_by('-date')
+            context["events"] = Event.objects.attended_by(user)
 
         return context
 
 
+@method_decorator(conditional_page(events_last_modified), name='dispatch')
+@method_decorator(cache_anonymous_page('all_events', 'events', 'categories', vary_on=upcoming_cutoff), name='dispatch')
 class AllEventsView(ListView):
     model = Event
     template_name = "events/all_events.html"
     context_object_name = 'events'
+    paginate_by = EVENTS_PER_PAGE
 
     def get_queryset(self):
-        queryset = super().get_queryset().select_related('category').prefetch_related('rsvps').order_by('-date')
-        search_query = self.request.GET.get('q', '')
-        category_id = self.request.GET.get('category')
-        start_date = self.request.GET.get('start_date')
-        end_date = self.request.GET.get('end_date')
-
-        filters = Q()
-        if search_query:
-            filters &= Q(name__icontains=search_query) | Q(location__icontains=search_query)
-        if category_id:
-            filters &= Q(category__id=category_id)
-        if start_date and end_date:
-            filters &= Q(date__range=[start_date, end_date])
-
-        return queryset.filter(filters)
+        queryset = super().get_queryset().select_related('category').only(
+            'id', 'name', 'date', 'time', 'starts_at', 'location', 'rsvp_count', 'category__id', 'category__name',
+        )
+        return filter_events(queryset, self.request.GET)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, ordering=event_ordering(queryset, self.request.GET))
+        page = paginator.page_or_first(self.request.GET.get('cursor'))
+        return (None, page, page.object_list, page.has_other_pages())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context.update(filter_context(self.request.GET))
         context.update({
-            'query': self.request.GET.get('q', ''),
             'categories': Category.objects.all(),
-            'total_participants': Participant.objects.count(),
-            'selected_category': self.request.GET.get('category'),
-            'start_date': self.request.GET.get('start_date'),
-            'end_date': self.request.GET.get('end_date'),
+            'total_attendees': total_attendance(),
         })
         return context
 
 
+@method_decorator(conditional_page(event_last_modified), name='dispatch')
+@method_decorator(cache_anonymous_page('event_detail', 'categories', 'event:{event_id}'), name='dispatch')
 class EventDetailView(DetailView):
     model = Event
     template_name = "events/event_detail.html"
     context_object_name = "event"
     pk_url_kwarg = 'event_id'
+    queryset = Event.objects.select_related('category')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        # One EXISTS instead of loading every attendee to test membership.
+        context['has_rsvp'] = user.is_authenticated and self.object.rsvps.filter(pk=user.pk).exists()
+        return context
 
 
 class AddEventView(LoginRequiredMixin, GroupRequiredMixin, CreateView):
@@ -150,11 +171,7 @@ class AddEventView(LoginRequiredMixin, GroupRequiredMixin, CreateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        context["user"] = user
-        context["is_admin"] = user.is_superuser or user.groups.filter(name='Admin').exists()
-        context["is_organizer"] = user.groups.filter(name='Organizer').exists()
-        context["is_participant"] = not (context["is_admin"] or context["is_organizer"])
+        context["user"] = self.request.user
         return context
 
 
@@ -167,7 +184,7 @@ class EditEventView(LoginRequiredMixin, GroupRequiredMixin, UpdateView):
     group_names = ['Organizer', 'Admin']
 
     def dispatch(self, request, *args, **kwargs):
-        if request.user.groups.filter(name='Organizer').exists():
+        if get_roles(request.user).is_organizer:
             event = self.get_object()
             if hasattr(event, 'created_by') and event.created_by != request.user:
                 messages.error(request, "You are not allowed to edit this event.")
@@ -188,20 +205,51 @@ class EditEventView(LoginRequiredMixin, GroupRequiredMixin, UpdateView):
 # FBVs for the rest (keep same, but pass role flags)
 # ----------------------------------------
 
+@cache_anonymous_page('home')
 def index(request):
     return render(request, "events/home.html")
 
 
+@cache_anonymous_page('home')
 def home(request):
     return render(request, "events/home.html")
 
 
+def calendar_view(request):
+    kind = 'week' if request.GET.get('view') == 'week' else 'month'
+    try:
+        anchor = clamp_anchor(date.fromisoformat(request.GET.get('date', '')))
+    except ValueError:
+        anchor = timezone.localdate()
+    try:
+        category_id = parse_category(request.GET)
+    except InvalidFilter:
+        category_id = None
+
+    categories = list(Category.objects.all())
+    labels = {category.pk: category.get_name_display() for category in categories}
+    weeks = build_weeks(kind, anchor, category_id, labels)
+    return render(request, "events/calendar.html", {
+        'weeks': weeks,
+        'kind': kind,
+        'anchor': anchor,
+        'window_start': weeks[0][0]['date'],
+        'window_end': weeks[-1][-1]['date'],
+        'previous': shift(kind, anchor, -1),
+        'next': shift(kind, anchor, 1),
+        'today': timezone.localdate(),
+        'categories': categories,
+        'selected_category': str(category_id) if category_id else None,
+        'weekdays': [calendar.day_abbr[(FIRST_WEEKDAY + n) % 7] for n in range(7)],
+    })
+
+
 @login_required
 def redirect_dashboard(request):
-    user = request.user
-    if user.is_superuser or user.groups.filter(name='Admin').exists():
+    roles = get_roles(request.user)
+    if roles.is_admin:
         return redirect('dashboard')          # admin dashboard
-    elif user.groups.filter(name='Organizer').exists():
+    elif roles.is_organizer:
         return redirect('dashboard')          # organizer dashboard
     else:
         return redirect('edit_profile')       # participant
@@ -212,7 +260,7 @@ def redirect_dashboard(request):
 def delete_event(request, event_id):
     event = get_object_or_404(Event, pk=event_id)
 
-    if request.user.groups.filter(name='Organizer').exists():
+    if get_roles(request.user).is_organizer:
         if hasattr(event, 'created_by') and event.created_by != request.user:
             messages.error(request, "You are not allowed to delete this event.")
             return redirect('dashboard_redirect')
@@ -222,100 +270,145 @@ def delete_event(request, event_id):
         messages.success(request, "Event deleted successfully!")
         return redirect('dashboard_redirect')
 
-    # Pass role flags to template
-    user = request.user
-    is_admin = user.is_superuser or user.groups.filter(name='Admin').exists()
-    is_organizer = user.groups.filter(name='Organizer').exists()
-    is_participant = not (is_admin or is_organizer)
-
     return render(request, "events/delete_confirm.html", {
         "event": event,
-        "is_admin": is_admin,
-        "is_organizer": is_organizer,
-        "is_participant": is_participant,
     })
 
 
 @login_required
+@require_POST
 def rsvp_event(request, event_id):
     event = get_object_or_404(Event, pk=event_id)
 
-    if event.rsvps.filter(id=request.user.id).exists():
+    outcome = book_seat(event.pk, request.user.pk)
+    if outcome == ALREADY_BOOKED:
         messages.warning(request, "You have already attended this event.")
+    elif outcome == FULL:
+        messages.error(request, "Sorry, this event is full.")
     else:
-        event.rsvps.add(request.user)
         messages.success(request, "You have successfully attended the event.")
 
-        try:
-            send_mail(
-                subject=f"Renova's Event Alert for {event.name}",
-                message=(
-                    f"Hello {request.user.first_name or request.user.username},\n\n"
-                    f"You have successfully attended the event '{event.name}' on {event.date}.\n\nThanks!"
-                ),
-                from_email=getattr(settings, 'EMAIL_HOST_USER', None),
-                recipient_list=[request.user.email],
-                fail_silently=True,
-            )
-        except Exception:
-            pass
+        queue_mail(
+            subject=f"Renova's Event Alert for {event.name}",
+            message=(
+                f"Hello {request.user.first_name or request.user.username},\n\n"
+                f"You have successfully attended the event '{event.name}' on {event.date}.\n\nThanks!"
+            ),
+            from_email=getattr(settings, 'EMAIL_HOST_USER', None),
+            recipient_list=[request.user.email],
+        )
 
     return redirect('event_detail', event_id=event.id)
 
 
+def filter_users(queryset, search_query):
+    if search_query:
+        queryset = queryset.filter(
+            Q(username__icontains=search_query) | Q(email__icontains=search_query)
+            | Q(first_name__icontains=search_query) | Q(last_name__icontains=search_query)
+        )
+    return queryset
+
+
+def bulk_user_action(action, targets, acting_user, new_role=None):
+    """
+    Apply ``action`` to every user in ``targets`` with set-based queries;
+    returns how many users were changed. Superusers and the acting admin
+    are left out of anything that could lock them out.
+    """
+    protected = targets.exclude(Q(is_superuser=True) | Q(pk=acting_user.pk))
+
+    # update() and the raw through-table delete skip the signals that keep
+    # the admin stats rollups current, so they are recorded here.
+    if action == 'activate':
+        count = targets.filter(is_active=False).update(is_active=True)
+        record_user_activity(activated=count)
+        return count
+
+    if action == 'deactivate':
+        # update() sends no post_save; a cached feed is served without a lookup.
+        invalidate_feeds(user_ids=protected.filter(is_active=True))
+        count = protected.filter(is_active=True).update(is_active=False)
+        record_user_activity(deactivated=count)
+        return count
+
+    if action == 'change_role':
+        group = Group.objects.get_or_create(name=new_role)[0]
+        # Other memberships go in one DELETE, the selection as a subquery
+        # rather than thousands of bound ids.
+        leaving = User.groups.through.objects.filter(customuser__in=protected).exclude(group=group)
+        record_group_members(
+            dict(leaving.values('group__name').annotate(n=Count('pk')).values_list('group__name', 'n')), sign=-1,
+        )
+        leaving.delete()
+        # add() inserts the missing rows and fires m2m_changed; the role cache
+        # is keyed by user, so ids are needed here, a bounded batch at a time.
+        count = 0
+        user_ids = protected.values_list('pk', flat=True).iterator(chunk_size=USER_ACTION_BATCH_SIZE)
+        while batch := list(islice(user_ids, USER_ACTION_BATCH_SIZE)):
+            group.user_set.add(*batch)
+            invalidate_roles(batch)
+            count += len(batch)
+        return count
+
+    if action == 'delete':
+        count = protected.count()
+        protected.delete()
+        return count
+
+    raise ValueError(action)
+
+
 @login_required
 @group_required('Admin')
 def users_control_view(request):
-    users = User.objects.all().order_by('username')
     groups = ['Participant', 'Organizer', 'Admin']
+    search_query = request.GET.get('q', '').strip()
 
     if request.method == "POST":
-        user_id = request.POST.get('user_id')
         action = request.POST.get('action')
-        user = get_object_or_404(User, pk=user_id)
+        new_role = request.POST.get('new_role')
 
-        if action == 'delete':
-            if user.is_superuser:
-                messages.error(request, "Cannot delete superuser.")
-            else:
-                user.delete()
-                messages.success(request, f"User {user.username} deleted.")
-
-        elif action == 'toggle_active':
-            user.is_active = not user.is_active
-            user.save()
-            messages.success(request, f"User {user.username} active status changed.")
-
-        elif action == 'change_role':
-            new_role = request.POST.get('new_role')
-            if new_role in groups and not user.is_superuser:
-                user.groups.clear()
-                group_obj, _ = Group.objects.get_or_create(name=new_role)
-                user.groups.add(group_obj)
-                messages.success(request, f"User {user.username}'s role changed to {new_role}.")
-            else:
-                messages.error(request, "Invalid role selected.")
+        if request.POST.get('scope') == 'all':
+            # "Select all matching": the search itself is the target set.
+            targets = filter_users(User.objects.all(), request.POST.get('q', '').strip())
+        else:
+            user_ids = [value for value in request.POST.getlist('user_ids') if value.isdigit()]
+            targets = User.objects.filter(pk__in=user_ids)
 
-        return redirect('users_control')
+        if action not in USER_BULK_ACTIONS:
+            messages.error(request, "Invalid action selected.")
+        elif action == 'change_role' and new_role not in groups:
+            messages.error(request, "Invalid role selected.")
+        else:
+            with transaction.atomic():
+                count = bulk_user_action(action, targets, request.user, new_role)
+            messages.success(request, f"{count} user(s): {USER_BULK_ACTIONS[action].format(role=new_role)}.")
 
-    user = request.user
-    is_admin = user.is_superuser or user.groups.filter(name='Admin').exists()
-    is_organizer = user.groups.filter(name='Organizer').exists()
-    is_participant = not (is_admin or is_organizer)
+        return redirect(request.get_full_path())
+
+    users = filter_users(User.objects.all(), search_query).only(
+        'id', 'username', 'email', 'is_active', 'is_superuser',
+    ).prefetch_related(Prefetch('groups', queryset=Group.objects.only('id', 'name').order_by('id')))
+    page = KeysetPaginator(users, USERS_PER_PAGE, ordering=('username', 'id')).page_or_first(request.GET.get('cursor'))
+    for user in page:
+        user.role = next((group.name for group in user.groups.all()), None)
 
     return render(request, 'events/users_control.html', {
-        'users': users,
+        'users': page.object_list,
+        'page_obj': page,
         'groups': groups,
-        'is_admin': is_admin,
-        'is_organizer': is_organizer,
-        'is_participant': is_participant,
+        'query': search_query,
+        'matching_count': filter_users(User.objects.all(), search_query).count() if search_query else None,
     })
 
 
 @login_required
 @group_required('Organizer', 'Admin')
 def events_control_view(request):
-    events = Event.objects.all().order_by('-date')
+    events = Event.objects.select_related('category').only(
+        'id', 'name', 'date', 'rsvp_count', 'category__id', 'category__name',
+    )
 
     if request.method == "POST":
         event_id = request.POST.get('event_id')
@@ -326,16 +419,48 @@ def events_control_view(request):
             messages.success(request, f'Event "{event.name}" deleted.')
             return redirect('events_control')
 
-    user = request.user
-    is_admin = user.is_superuser or user.groups.filter(name='Admin').exists()
-    is_organizer = user.groups.filter(name='Organizer').exists()
-    is_participant = not (is_admin or is_organizer)
+    page = KeysetPaginator(events, EVENTS_PER_PAGE).page_or_first(request.GET.get('cursor'))
 
     return render(request, 'events/events_control.html', {
-        'events': events,
-        'is_admin': is_admin,
-        'is_organizer': is_organizer,
-        'is_participant': is_participant,
+        'events': page.object_list,
+        'page_obj': page,
+    })
+
+
+@login_required
+@group_required('Organizer', 'Admin')
+def export_attendees(request, event_id):
+    event = get_object_or_404(Event.objects.only('id', 'name', 'created_by'), pk=event_id)
+    if not get_roles(request.user).is_admin and event.created_by_id != request.user.pk:
+        messages.error(request, "You are not allowed to export this event's attendees.")
+        return redirect('dashboard_redirect')
+
+    excel = request.GET.get('format') == 'excel'
+    chunks = csv_chunks(attendee_rows(event.pk), excel=excel)
+    return streaming_csv_response(request, chunks, f"attendees-{event.pk}{'-excel' if excel else ''}.csv")
+
+
+@login_required
+@group_required('Organizer', 'Admin')
+def import_events_view(request):
+    result = None
+    if request.method == "POST":
+        upload = request.FILES.get('file')
+        if not upload:
+            messages.error(request, "Choose a CSV or .ics file to import.")
+        else:
+            lines = text_stream(upload.file)
+            parse = parse_ics if detect_format(upload.name) == 'ics' else parse_csv
+            result = import_events(parse(lines), created_by=request.user)
+            if result.created:
+                messages.success(request, f"Imported {result.created} events.")
+            if result.errors:
+                messages.warning(request, f"{len(result.errors)} rows were skipped.")
+
+    return render(request, 'events/import_events.html', {
+        'result': result,
+        'errors': result.errors[:IMPORT_ERRORS_SHOWN] if result else [],
+        'columns': CSV_COLUMNS,
     })
 
 
@@ -361,40 +486,23 @@ def categories_control_view(request):
             messages.success(request, f'Category "{category.name}" deleted.')
         return redirect('categories_control')
 
-    user = request.user
-    is_admin = user.is_superuser or user.groups.filter(name='Admin').exists()
-    is_organizer = user.groups.filter(name='Organizer').exists()
-    is_participant = not (is_admin or is_organizer)
-
     return render(request, 'events/categories_control.html', {
         'categories': categories,
-        'is_admin': is_admin,
-        'is_organizer': is_organizer,
-        'is_participant': is_participant,
     })
 
 
 @login_required
 def profile_view(request):
     user = request.user
-    is_admin = user.is_superuser or user.groups.filter(name='Admin').exists()
-    is_organizer = user.groups.filter(name='Organizer').exists()
-    is_participant = not (is_admin or is_organizer)
 
     return render(request, "events/profile.html", {
         "user": user,
-        "is_admin": is_admin,
-        "is_organizer": is_organizer,
-        "is_participant": is_participant,
     })
 
 
 @login_required
 def edit_profile(request):
     user = request.user
-    is_admin = user.is_superuser or user.groups.filter(name='Admin').exists()
-    is_organizer = user.groups.filter(name='Organizer').exists()
-    is_participant = not (is_admin or is_organizer)
 
     if request.method == "POST":
         user.first_name = request.POST.get("first_name", "").strip()
@@ -411,32 +519,51 @@ def edit_profile(request):
 
     return render(request, "events/edit_profile.html", {
         "user": user,
-        "is_admin": is_admin,
-        "is_organizer": is_organizer,
-        "is_participant": is_participant,
     })
 
 
 @login_required
 def attended_events(request):
-    events = Event.objects.filter(rsvps=request.user).order_by('-date')
-
-    user = request.user
-    is_admin = user.is_superuser or user.groups.filter(name='Admin').exists()
-    is_organizer = user.groups.filter(name='Organizer').exists()
-    is_participant = not (is_admin or is_organizer)
-
-    can_add_event = is_admin or is_organizer
+    events = Event.objects.attended_by(request.user)
 
     return render(request, "events/attended_events.html", {
         "events": events,
-        "can_add_event": can_add_event,
-        "is_admin": is_admin,
-        "is_organizer": is_organizer,
-        "is_participant": is_participant,
     })
 
 
+@login_required
+def calendar_feeds_view(request):
+    if request.method == "POST" and request.POST.get('action') == 'reset':
+        reset_calendar_token(request.user)
+        messages.success(request, "New calendar links created. The old ones no longer work.")
+        return redirect('calendar_feeds')
+
+    token = calendar_token(request.user)
+    feeds = [("Events I'm attending", reverse('calendar_feed_attending', args=[token]))]
+    if get_roles(request.user).can_add_event:
+        feeds.append(("Events I'm organizing", reverse('calendar_feed_organizing', args=[token])))
+    return render(request, "events/calendar_feeds.html", {
+        "feeds": [(title, request.build_absolute_uri(path)) for title, path in feeds],
+    })
+
+
+@require_GET
+def calendar_feed(request, token, kind):
+    entry = cached_feed(token, kind)
+    if entry is None:
+        raise Http404("Unknown calendar feed")
+
+    etag, body = entry
+    # Weak comparison: GZipMiddleware hands the client W/"..." for this ETag.
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="{kind}.ics"'
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 class CustomPasswordChangeView(LoginRequiredMixin, PasswordChangeView):
     template_name = 'events/change_password.html'
     success_url = reverse_lazy('password_change_done')
@@ -444,16 +571,9 @@ class CustomPasswordChangeView(LoginRequiredMixin, PasswordChangeView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
-        is_admin = user.is_superuser or user.groups.filter(name='Admin').exists()
-        is_organizer = user.groups.filter(name='Organizer').exists()
-        is_participant = not (is_admin or is_organizer)
 
         context.update({
             "user": user,
-            "is_admin": is_admin,
-            "is_organizer": is_organizer,
-            "is_participant": is_participant,
-            "can_add_event": is_admin or is_organizer,
             "show_profile_edit": True,
         })
         return context
@@ -469,19 +589,8 @@ class CustomPasswordResetView(PasswordResetView):
         context = super().get_context_data(**kwargs)
         user = self.request.user if self.request.user.is_authenticated else None
 
-        if user:
-            is_admin = user.is_superuser or user.groups.filter(name='Admin').exists()
-            is_organizer = user.groups.filter(name='Organizer').exists()
-            is_participant = not (is_admin or is_organizer)
-        else:
-            is_admin = is_organizer = is_participant = False
-
         context.update({
             "user": user,
-            "is_admin": is_admin,
-            "is_organizer": is_organizer,
-            "is_participant": is_participant,
-            "can_add_event": is_admin or is_organizer,
             "show_profile_edit": user is not None,
         })
         return context
\ No newline at end of file
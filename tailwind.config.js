@@ -1,8 +1,11 @@
 /** @type {import('tailwindcss').Config} */
 module.exports = {
+  // Only classes found in these files end up in output.css. Widget classes
+  // are set in forms.py; './**/templates' would also crawl node_modules.
   content: [
     './templates/**/*.html',
-    './**/templates/**/*.html',
+    './*/templates/**/*.html',
+    './*/forms.py',
     './static/src/**/*.{js,ts}',
   ],
   theme: {
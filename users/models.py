@@ -20,6 +20,9 @@ class CustomUser(AbstractUser):
         blank=True,
         help_text="Optional profile photo."
     )
+    # Secret in the user's calendar feed URLs (events.feeds); issued on first
+    # use, replaced to revoke old subscriptions.
+    calendar_token = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.username
\ No newline at end of file
@@ -3,6 +3,7 @@ from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.contrib import messages
 from django.utils.http import urlsafe_base64_decode
 from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
 from .forms import CustomUserCreationForm
 
 User = get_user_model()  # Always use this for custom user models
@@ -17,7 +18,8 @@ def signup_view(request):
         if form.is_valid():
             user = form.save(commit=False)
             user.is_active = False  # Require email confirmation
-            user.save()
+            with transaction.atomic():  # the activation email is queued in the same transaction
+                user.save()
             messages.success(request, "A confirmation mail was sent. Please check your email.")
             return redirect('login')
         else: